@@ -0,0 +1,190 @@
+from scenarios import SyntheticScenario
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "Optimizer"))
+sys.path.insert(0, os.path.join(REPO_DIR, "SituationGenerator"))
+
+CASE_KEYS = ["nodes", "services", "requests", "rp_density", "sp_density", "seed", "aggregate"]
+
+def run_case(case: "dict[str, int|float|bool]") -> "dict[str, int|float|bool|str]":
+    result = dict(case)
+    start = time.perf_counter()
+    from optimizer import MistPlatformOptimizer
+    from sol2kube import SolutionToKubernetes
+    from situationgen import UnstableSituationGenerator
+    MistPlatformOptimizer({}, {}, {}, [], [])
+    result["startup_time"] = time.perf_counter() - start
+    start = time.perf_counter()
+    scenario = SyntheticScenario(case["nodes"], case["services"], case["rp_density"], case["sp_density"], case["seed"])
+    requests = UnstableSituationGenerator(scenario.services, scenario.nodes, case["seed"]).generate_requests(case["requests"])
+    result["generate_time"] = time.perf_counter() - start
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        optimizer = MistPlatformOptimizer(scenario.nodes, scenario.services, requests, scenario.resource_policies, scenario.service_policies, aggregate_requests=case["aggregate"])
+        optimizer.objective_average()
+        result["build_time"] = time.perf_counter() - start
+        model_stats = optimizer.get_model_stats()
+        result["variables"] = model_stats["columns"]
+        result["constraints"] = model_stats["rows"]
+        result["nonzeros"] = model_stats["nonzeros"]
+        optimizer.set_verbose(0)
+        start = time.perf_counter()
+        optimization_ok = optimizer.optimize(case["max_seconds"])
+        result["solve_time"] = time.perf_counter() - start
+        result["status"] = optimizer.get_status()
+        if optimization_ok:
+            result["objective"] = optimizer.get_objective_value()
+            start = time.perf_counter()
+            sol_df = optimizer.get_solution_dataframe()
+            result["extract_time"] = time.perf_counter() - start
+            with tempfile.TemporaryDirectory() as out_dir:
+                start = time.perf_counter()
+                SolutionToKubernetes(sol_df, scenario.container_specs, scenario.service_ports).convert(os.path.join(out_dir, "solution.yaml"))
+                result["emit_time"] = time.perf_counter() - start
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+class CommandUI:
+
+    PRESETS = {
+        "small": {"nodes": [5, 10, 25], "services": [3, 6], "requests": [100, 300, 1000]},
+        "medium": {"nodes": [25, 50, 100], "services": [6, 12], "requests": [1000, 5000, 10000]},
+        "large": {"nodes": [100, 250, 500], "services": [12, 24], "requests": [10000, 50000, 100000]}
+    }
+
+    ARGUMENTS = {
+        "--preset": {
+            "required": False,
+            "choices": list(PRESETS),
+            "default": "small",
+            "help": "Scenario grid used for every dimension not given explicitly"
+        },
+        "--nodes": {
+            "required": False,
+            "type": int,
+            "nargs": "+",
+            "help": "Node counts to benchmark"
+        },
+        "--services": {
+            "required": False,
+            "type": int,
+            "nargs": "+",
+            "help": "Service counts to benchmark"
+        },
+        "--requests": {
+            "required": False,
+            "type": int,
+            "nargs": "+",
+            "help": "Request counts to benchmark"
+        },
+        "--rp-density": {
+            "required": False,
+            "type": float,
+            "nargs": "+",
+            "default": [0.5],
+            "help": "Fraction of nodes with a resource policy"
+        },
+        "--sp-density": {
+            "required": False,
+            "type": float,
+            "nargs": "+",
+            "default": [0.3],
+            "help": "Fraction of services with a service policy"
+        },
+        "--seeds": {
+            "required": False,
+            "type": int,
+            "nargs": "+",
+            "default": [0],
+            "help": "Seeds for the scenario and request generators"
+        },
+        "--aggregate": {
+            "required": False,
+            "action": "store_true",
+            "help": "Build the models with aggregated request classes"
+        },
+        "--max-seconds": {
+            "required": False,
+            "type": float,
+            "metavar": "seconds",
+            "help": "Solver time limit per case"
+        },
+        "--compare": {
+            "required": False,
+            "metavar": "JSON results",
+            "help": "Previous results file to compare against"
+        },
+        "-o": {
+            "required": True,
+            "metavar": "Output JSON",
+            "help": "Output benchmark results in JSON format"
+        }
+    }
+
+    COMPARED_METRICS = ["startup_time", "build_time", "solve_time", "emit_time", "peak_rss_kb", "variables", "constraints"]
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Scalability benchmark for the Mist Platform Optimizer pipeline", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def _commit(self) -> "str|None":
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _cases(self, ui_args: argparse.Namespace) -> "list[dict[str, int|float|bool]]":
+        preset = self.PRESETS[ui_args.preset]
+        grid = itertools.product(ui_args.nodes or preset["nodes"], ui_args.services or preset["services"], ui_args.requests or preset["requests"], ui_args.rp_density, ui_args.sp_density, ui_args.seeds)
+        return [dict(zip(CASE_KEYS, values + (ui_args.aggregate,)), max_seconds=ui_args.max_seconds) for values in grid]
+
+    def _compare(self, results: "list[dict[str, int|float|bool|str]]", previous_path: str) -> None:
+        with open(previous_path, 'r') as in_json:
+            previous = {tuple(case[k] for k in CASE_KEYS): case for case in json.load(in_json)["cases"]}
+        for case in results:
+            old_case = previous.get(tuple(case[k] for k in CASE_KEYS))
+            if old_case is None:
+                continue
+            changes = [f'{metric} x{case[metric]/old_case[metric]:.2f}' for metric in self.COMPARED_METRICS if case.get(metric) and old_case.get(metric)]
+            print(f'{case["nodes"]}n {case["services"]}s {case["requests"]}r seed {case["seed"]}: {", ".join(changes)}')
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        results = []
+        for case in self._cases(ui_args):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_case, case).result()
+            print(f'{result["nodes"]}n {result["services"]}s {result["requests"]}r seed {result["seed"]}: {result["status"]} build {result["build_time"]:.3f} s solve {result["solve_time"]:.3f} s peak RSS {result["peak_rss_kb"]} kB')
+            results.append(result)
+        report = {
+            "commit": self._commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cases": results
+        }
+        with open(ui_args.o, 'w') as out_json:
+            json.dump(report, out_json, indent=2)
+        if ui_args.compare:
+            self._compare(results, ui_args.compare)
+
+if __name__ == '__main__':
+    CommandUI().launch()
@@ -0,0 +1,183 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "Optimizer"))
+sys.path.insert(0, os.path.join(REPO_DIR, "SituationGenerator"))
+sys.path.insert(0, os.path.join(REPO_DIR, "MistScenario"))
+
+from decomposition import ComponentDecomposition
+from heuristic import GreedyPlacementEngine
+from optimizer import MistPlatformOptimizer
+from rounding import RelaxationRoundingEngine
+from scenarios import SyntheticScenario
+from scenario import load_nodes, load_services, load_requests, load_resource_policies
+from situationgen import UnstableSituationGenerator
+
+TOLERANCE = 1e-6
+
+OBJECTIVES = [MistPlatformOptimizer.AVERAGE_OBJ, MistPlatformOptimizer.MIN_MAX_OBJ]
+
+CASES = {
+    "BasicExample": {"nodes": "Optimizer/BasicExample/nodes.yaml", "services": "Optimizer/BasicExample/services.yaml", "requests": "Optimizer/BasicExample/requests.yaml", "resource_policies": "Optimizer/BasicExample/resource_policies.yaml"},
+    "TestingBaseline": {"nodes": "kubernetes_delegation/nodes.yaml", "services": "TestingBaseline/services.yaml", "generated_requests": 60},
+    "TestingBaseline-mid": {"nodes": "kubernetes_delegation/nodes.yaml", "services": "TestingBaseline/services.yaml", "generated_requests": 60, "request_services": ["grav", "jellyfin"], "resource_policies": "TestingBaseline/mid_resource_policies_25n.yaml"},
+    "TestingBaseline-restrictive": {"nodes": "kubernetes_delegation/nodes.yaml", "services": "TestingBaseline/services.yaml", "generated_requests": 60, "request_services": ["grav", "jellyfin"], "resource_policies": "TestingBaseline/restrictive_resource_policies_25n.yaml"},
+    "Synthetic-limits": {"synthetic": [5, 15, 1.0, 0.0, 7], "generated_requests": 40, "binding_limits": True},
+    "Synthetic-minmax": {"synthetic": [6, 4, 1.0, 1.0, 4], "generated_requests": 12, "service_demands": {"ram": 0.5, "cpu": 0.01, "storage": 0.5}}
+}
+
+LIMITS = ["max_ram", "max_cpu"]
+
+def load_case(case: "dict[str, str|int|bool|list]") -> "tuple":
+    if "synthetic" in case:
+        scenario = SyntheticScenario(*case["synthetic"])
+        for s in scenario.services:
+            scenario.services[s].update(case.get("service_demands", {}))
+        requests = UnstableSituationGenerator(scenario.services, scenario.nodes, 0).generate_requests(case["generated_requests"])
+        return scenario.nodes, scenario.services, requests, scenario.resource_policies, scenario.service_policies
+    nodes = load_nodes(os.path.join(REPO_DIR, case["nodes"]))
+    services = load_services(os.path.join(REPO_DIR, case["services"]))
+    if "generated_requests" in case:
+        requested_services = {s: services[s] for s in case.get("request_services", services)}
+        requests = UnstableSituationGenerator(requested_services, nodes, 0).generate_requests(case["generated_requests"])
+    else:
+        requests = load_requests(os.path.join(REPO_DIR, case["requests"]))
+    resource_policies = load_resource_policies(os.path.join(REPO_DIR, case["resource_policies"])) if "resource_policies" in case else []
+    return nodes, services, requests, resource_policies, []
+
+def build(inputs: tuple, objective: str = MistPlatformOptimizer.AVERAGE_OBJ, aggregate: bool = False) -> MistPlatformOptimizer:
+    optimizer = MistPlatformOptimizer(*inputs, aggregate_requests=aggregate)
+    optimizer.set_verbose(0)
+    if objective == MistPlatformOptimizer.AVERAGE_OBJ:
+        optimizer.objective_average()
+    else:
+        optimizer.objective_min_max()
+    return optimizer
+
+def fixed_objective(inputs: tuple, assignment: "dict[str, dict[str, int]]") -> "float|None":
+    optimizer = build(inputs)
+    if not optimizer.fix_assignment(assignment):
+        return None
+    return optimizer.get_objective_value() if optimizer.optimize() else None
+
+def mip(inputs: tuple, objective: str, aggregate: bool = False) -> "float|None":
+    optimizer = build(inputs, objective, aggregate)
+    return optimizer.get_objective_value() if optimizer.optimize() else None
+
+def decompose(inputs: tuple) -> "float|None":
+    decomposition = ComponentDecomposition(build(inputs))
+    return decomposition.get_objective_value() if decomposition.optimize(1) else None
+
+def hybrid(inputs: tuple) -> "float|None":
+    optimizer = build(inputs)
+    engine = GreedyPlacementEngine(optimizer)
+    if engine.place():
+        optimizer.warm_start(engine.get_assignment())
+    return optimizer.get_objective_value() if optimizer.optimize() else None
+
+def placement(inputs: tuple, engine_class: type) -> "tuple[float|None, float|None]":
+    engine = engine_class(build(inputs))
+    if not engine.place():
+        return None, None
+    return engine.get_objective_value(), fixed_objective(inputs, engine.get_assignment())
+
+def same(value: "float|None", expected: "float|None") -> bool:
+    if value is None or expected is None:
+        return value is expected
+    return abs(value - expected) <= TOLERANCE*max(1, abs(expected))
+
+def unlimited(inputs: tuple) -> tuple:
+    nodes, services, requests, resource_policies, service_policies = inputs
+    return nodes, services, requests, [{key: value for key, value in policy.items() if key not in LIMITS} for policy in resource_policies], service_policies
+
+def run_case(case: "dict[str, str|int|bool|list]", expected: "dict[str, float|None]") -> "tuple[dict[str, float|None], list[str]]":
+    inputs = load_case(case)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {objective: mip(inputs, objective) for objective in OBJECTIVES}
+        checks = {f'aggregate {objective}': (mip(inputs, objective, True), results[objective]) for objective in OBJECTIVES}
+        checks["decompose"] = (decompose(inputs), results[MistPlatformOptimizer.AVERAGE_OBJ])
+        checks["hybrid"] = (hybrid(inputs), results[MistPlatformOptimizer.AVERAGE_OBJ])
+        bounded = {"heuristic": placement(inputs, GreedyPlacementEngine), "lp": placement(inputs, RelaxationRoundingEngine)}
+        unlimited_value = mip(unlimited(inputs), MistPlatformOptimizer.AVERAGE_OBJ) if case.get("binding_limits", False) else None
+    failures = [f'mip {objective} {results[objective]} != baseline {expected[objective]}' for objective in OBJECTIVES if objective in expected and not same(results[objective], expected[objective])]
+    for check, (value, reference) in checks.items():
+        if not same(value, reference):
+            failures.append(f'{check} {value} != mip {reference}')
+        results[check] = value
+    for engine, (value, fixed_value) in bounded.items():
+        if value is None:
+            continue
+        if not same(fixed_value, value):
+            failures.append(f'{engine} {value} != its placement re-solved in the mip {fixed_value}')
+        elif results[MistPlatformOptimizer.AVERAGE_OBJ] is None or value > results[MistPlatformOptimizer.AVERAGE_OBJ] + TOLERANCE*max(1, abs(value)):
+            failures.append(f'{engine} {value} exceeds mip {results[MistPlatformOptimizer.AVERAGE_OBJ]}')
+        results[engine] = value
+    if case.get("binding_limits", False):
+        if same(unlimited_value, results[MistPlatformOptimizer.AVERAGE_OBJ]):
+            failures.append(f'mip without {"/".join(LIMITS)} {unlimited_value} == mip {results[MistPlatformOptimizer.AVERAGE_OBJ]}, limits do not bind')
+        results["unlimited"] = unlimited_value
+    return results, failures
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "--cases": {
+            "required": False,
+            "nargs": "+",
+            "choices": list(CASES),
+            "default": list(CASES),
+            "help": "Baseline cases to check"
+        },
+        "--expected": {
+            "required": False,
+            "metavar": "JSON objectives",
+            "default": os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression_expected.json"),
+            "help": "Baseline MIP objectives of every case"
+        },
+        "--update": {
+            "required": False,
+            "action": "store_true",
+            "help": "Store the current MIP objectives as the new baseline instead of checking against it"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Regression check of the Mist Platform Optimizer model against its baseline objectives", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        expected = {}
+        if os.path.isfile(ui_args.expected):
+            with open(ui_args.expected, 'r') as in_json:
+                expected = json.load(in_json)
+        failed = False
+        # A collection triggered inside cffi would finalize a dropped CBC model under cffi's own lock and deadlock
+        gc.disable()
+        for name in ui_args.cases:
+            gc.collect()
+            results, failures = run_case(CASES[name], {} if ui_args.update else expected.get(name, {}))
+            print(f'{name}: ' + ' '.join(f'{engine} {value:.6f}' if value is not None else f'{engine} none' for engine, value in results.items()))
+            for failure in failures:
+                print(f'  FAILED {failure}')
+            failed = failed or bool(failures)
+            expected[name] = {objective: results[objective] for objective in OBJECTIVES}
+        if ui_args.update:
+            with open(ui_args.expected, 'w') as out_json:
+                json.dump(expected, out_json, indent=2)
+        if failed:
+            sys.exit(1)
+        print('No regressions found!')
+
+if __name__ == '__main__':
+    CommandUI().launch()
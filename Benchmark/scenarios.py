@@ -0,0 +1,91 @@
+import math
+import random
+
+
+class SyntheticScenario:
+
+    CONTENTS = ["Blog", "AI", "Media", "Storage", "Game"]
+
+    def __init__(self, num_nodes: int, num_services: int, rp_density: float = 0.5, sp_density: float = 0.3, rng_seed: int = 0):
+        self._rng = random.Random(rng_seed)
+        self.owners = [f'User{i}' for i in range(max(1, num_nodes // 5))]
+        self.developers = [f'Developer{j}' for j in range(max(1, num_services // 3))]
+        self.nodes = self._generate_nodes(num_nodes)
+        self.services = self._generate_services(num_services)
+        self.resource_policies = self._generate_resource_policies(rp_density)
+        self.service_policies = self._generate_service_policies(sp_density)
+        self.container_specs = {s: [{"name": f'{s}-container', "image": f'{s}:latest', "imagePullPolicy": "IfNotPresent", "ports": [{"containerPort": 8000 + j}]}] for j, s in enumerate(self.services)}
+        self.service_ports = {s: 8000 + j for j, s in enumerate(self.services)}
+
+    def _generate_nodes(self, num_nodes: int) -> "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]":
+        names = [f'node{i}' for i in range(num_nodes)]
+        coordinates = {n: (self._rng.uniform(0, 1000), self._rng.uniform(0, 1000)) for n in names}
+        nodes = {}
+        for i, n in enumerate(names):
+            distances = {m: round(math.dist(coordinates[n], coordinates[m]), 4) for m in names if m != n}
+            nodes[n] = {
+                "owner": self.owners[i % len(self.owners)],
+                "cpu": self._rng.choice([1, 2, 4, 8]),
+                "ram": self._rng.choice([2048, 4096, 8192, 16384]),
+                "storage": self._rng.choice([65536, 131072, 262144]),
+                "location": distances,
+                "latency": {m: round(distances[m]/100, 4) for m in distances},
+                "metadata": {"tier": self._rng.randint(1, 5)}
+            }
+        return nodes
+
+    def _generate_services(self, num_services: int) -> "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]":
+        services = {}
+        for j in range(num_services):
+            services[f'service{j}'] = {
+                "developer": self.developers[j % len(self.developers)],
+                "ram": round(self._rng.uniform(64, 512), 1),
+                "cpu": round(self._rng.uniform(0.05, 1), 3),
+                "storage": self._rng.randint(128, 2048),
+                "metadata": {"content": self._rng.choice(self.CONTENTS), "level": self._rng.randint(1, 5)}
+            }
+        return services
+
+    def _sample(self, population: "list[str]", keep: str) -> "list[str]":
+        sample = self._rng.sample(population, max(1, math.ceil(0.75*len(population))))
+        return sample if keep in sample else sample + [keep]
+
+    def _generate_resource_policies(self, density: float) -> "list[dict[str, str|int|float|list[str]|dict[str, int|float|str]]]":
+        policies = []
+        for n in self.nodes:
+            if self._rng.random() >= density:
+                continue
+            policy = {"user": self.nodes[n]["owner"], "node": n}
+            if self._rng.random() < 0.5:
+                policy["max_ram"] = self._rng.choice([60, 80, 100])
+            if self._rng.random() < 0.5:
+                policy["max_cpu"] = self._rng.choice([60, 80, 100])
+            if self._rng.random() < 0.5:
+                policy["allowed_users"] = self._sample(self.owners, self.nodes[n]["owner"])
+            if self._rng.random() < 0.3:
+                policy["allowed_developers"] = self._sample(self.developers, self.developers[0])
+            if self._rng.random() < 0.3:
+                policy["max_distance"] = round(self._rng.uniform(750, 1500), 4)
+            if self._rng.random() < 0.3:
+                policy["max_latency"] = round(self._rng.uniform(7.5, 15), 4)
+            if self._rng.random() < 0.3:
+                policy["upper_bound_metadata"] = {"level": self._rng.choice([4, 5])}
+            if self._rng.random() < 0.3:
+                policy["lower_bound_metadata"] = {"level": self._rng.choice([1, 2])}
+            policies.append(policy)
+        return policies
+
+    def _generate_service_policies(self, density: float) -> "list[dict[str, str|list[str]|dict[str, int|float|str]]]":
+        policies = []
+        for s in self.services:
+            if self._rng.random() >= density:
+                continue
+            policy = {"developer": self.services[s]["developer"], "service": s}
+            if self._rng.random() < 0.5:
+                policy["allowed_owners"] = self._sample(self.owners, self.owners[0])
+            if self._rng.random() < 0.3:
+                policy["upper_bound_metadata"] = {"tier": self._rng.choice([4, 5])}
+            if self._rng.random() < 0.3:
+                policy["lower_bound_metadata"] = {"tier": self._rng.choice([1, 2])}
+            policies.append(policy)
+        return policies
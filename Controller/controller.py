@@ -0,0 +1,207 @@
+from typing import Any, Union
+import csv
+import os
+import subprocess
+import sys
+import time
+
+for _component in ["MistScenario", "Optimizer", "RequestKube", "SituationGenerator", "kubernetes_delegation"]:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, _component))
+
+from inventory import NodeInventoryCollector
+from optimizer import MistPlatformOptimizer
+from req2kube import RequestsToKubernetes
+from scenario import dump_yaml
+from situationgen import UnstableSituationGenerator, StreamingSituationGenerator
+from sol2kube import SolutionToKubernetes
+
+
+class KubectlClient:
+
+    def get_nodes(self) -> "dict[str, Any]":
+        return NodeInventoryCollector.kubectl_nodes()
+
+    def apply(self, manifest: str, selector: str) -> None:
+        subprocess.run(["kubectl", "apply", "--prune", "-l", selector, "-f", manifest], check=True)
+
+    def apply_changes(self, manifest: "Union[str, None]", removed: "list[str]") -> None:
+        if manifest is not None:
+            subprocess.run(["kubectl", "apply", "-f", manifest], check=True)
+        if removed:
+            subprocess.run(["kubectl", "delete", "--ignore-not-found"] + removed, check=True)
+
+    def get_pods(self) -> str:
+        return subprocess.run(["kubectl", "get", "pods", "-o", "wide"], capture_output=True, text=True, check=True).stdout
+
+
+class DryRunKubectl(KubectlClient):
+
+    def __init__(self, kube_nodes: "Union[dict[str, Any], None]" = None):
+        self._kube_nodes = kube_nodes
+        self._applied = []
+        self._deleted = []
+
+    def get_nodes(self) -> "dict[str, Any]":
+        if self._kube_nodes is None:
+            raise ValueError("A dry run needs the kubectl nodes JSON or a static nodes config")
+        return self._kube_nodes
+
+    def apply(self, manifest: str, selector: str) -> None:
+        self._applied.append((manifest, selector))
+
+    def apply_changes(self, manifest: "Union[str, None]", removed: "list[str]") -> None:
+        if manifest is not None:
+            self._applied.append((manifest, None))
+        self._deleted += removed
+
+    def get_pods(self) -> str:
+        return ''
+
+    def get_applied(self) -> "list[tuple[str, Union[str, None]]]":
+        return self._applied
+
+    def get_deleted(self) -> "list[str]":
+        return self._deleted
+
+
+class PlatformController:
+
+    MIP_ENGINE = 'mip'
+    HEURISTIC_ENGINE = 'heuristic'
+    LP_ENGINE = 'lp'
+
+    STAGES = ["Inventory", "Optimization", "Service manifests", "Service apply", "Request manifests", "Request apply", "Situation"]
+    TIMING_COLUMNS = ["Iteration", "Date tag", "Start time", "End time", "Time taken (s)"] + [f'{stage} (s)' for stage in STAGES]
+
+    def __init__(self, kubectl: KubectlClient, usg: "Union[UnstableSituationGenerator, StreamingSituationGenerator]", services: "dict[str, dict[str, Any]]", container_specs: "dict[str, list[dict[str, Any]]]", service_ports: "dict[str, int]", request_specs: "dict[str, list[dict[str, Any]]]", results_dir: str, num_requests: int, collector: "Union[NodeInventoryCollector, None]" = None, nodes: "Union[dict[str, dict[str, Any]], None]" = None, resource_policies: "Union[list[dict[str, Any]], None]" = None, service_policies: "Union[list[dict[str, Any]], None]" = None, engine: str = MIP_ENGINE, max_seconds: float = None):
+        if collector is None and nodes is None:
+            raise ValueError("Either a node inventory collector or a static nodes config must be given")
+        self._kubectl = kubectl
+        self._usg = usg
+        self._services = services
+        self._container_specs = container_specs
+        self._service_ports = service_ports
+        self._request_specs = request_specs
+        self._results_dir = results_dir
+        self._num_requests = num_requests
+        self._collector = collector
+        self._nodes = nodes
+        self._resource_policies = resource_policies if resource_policies is not None else []
+        self._service_policies = service_policies if service_policies is not None else []
+        self._engine = engine
+        self._max_seconds = max_seconds
+        self._timing_report = os.path.join(results_dir, f'PlatformTimingReport-{time.strftime("%y-%m-%d-%H-%M-%S")}.csv')
+        self._iteration = 0
+        self._service_manifest = None
+        self._request_hashes = os.path.join(results_dir, "request-hashes.txt")
+        os.makedirs(results_dir, exist_ok=True)
+        self._requests = self._usg.generate_requests(self._num_requests)
+
+    def _result_path(self, name: str, date_tag: str, extension: str) -> str:
+        return os.path.join(self._results_dir, f'{name}-{date_tag}.{extension}')
+
+    def collect_inventory(self, date_tag: str) -> "dict[str, dict[str, Any]]":
+        nodes = self._nodes if self._collector is None else self._collector.collect(self._kubectl.get_nodes())
+        dump_yaml(nodes, self._result_path("nodes", date_tag, "yaml"))
+        return nodes
+
+    def optimize(self, nodes: "dict[str, dict[str, Any]]", date_tag: str) -> "Union[pd.DataFrame, None]":
+        optimizer = MistPlatformOptimizer(nodes, self._services, self._requests, self._resource_policies, self._service_policies)
+        optimizer.set_verbose(0)
+        optimizer.objective_average()
+        if self._engine == self.MIP_ENGINE:
+            optimization_ok = optimizer.optimize(self._max_seconds)
+        else:
+            if self._engine == self.LP_ENGINE:
+                from rounding import RelaxationRoundingEngine
+                engine = RelaxationRoundingEngine(optimizer)
+            else:
+                from heuristic import GreedyPlacementEngine
+                engine = GreedyPlacementEngine(optimizer)
+            optimization_ok = engine.place(self._max_seconds)
+            if optimization_ok:
+                optimizer.accept_assignment(engine.get_assignment())
+        if not optimization_ok:
+            return None
+        sol_df = optimizer.get_solution_dataframe()
+        sol_df.to_csv(self._result_path("solution-df", date_tag, "csv"), index=False)
+        return sol_df
+
+    def service_manifests(self, sol_df: "pd.DataFrame", date_tag: str) -> "tuple[str, Union[str, None], dict[str, list[str]]]":
+        manifest = self._result_path("testing-autogen-serv-kubeconf", date_tag, "yaml")
+        changed_manifest = self._result_path("testing-autogen-serv-changed-kubeconf", date_tag, "yaml") if self._service_manifest is not None else None
+        changes = SolutionToKubernetes(sol_df, self._container_specs, self._service_ports).convert(manifest, self._service_manifest, changed_manifest)
+        return manifest, changed_manifest, changes
+
+    def request_manifests(self, date_tag: str) -> "tuple[str, Union[str, None], dict[str, list[str]]]":
+        manifest = self._result_path("testing-autogen-cli-kubeconf", date_tag, "yaml")
+        changed_manifest = self._result_path("testing-autogen-cli-changed-kubeconf", date_tag, "yaml") if os.path.isfile(self._request_hashes) else None
+        changes = RequestsToKubernetes(self._requests, self._request_specs).convert(manifest, self._request_hashes, changed_manifest)
+        return manifest, changed_manifest, changes
+
+    def advance_situation(self, date_tag: str) -> None:
+        self._requests = self._usg.generate_requests(self._num_requests)
+        dump_yaml(self._requests, self._result_path("usg-requests", date_tag, "yaml"))
+
+    def _record(self, row: "dict[str, Any]") -> None:
+        new_report = not os.path.isfile(self._timing_report)
+        with open(self._timing_report, 'a', newline='') as out_csv:
+            writer = csv.DictWriter(out_csv, fieldnames=self.TIMING_COLUMNS)
+            if new_report:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def run_iteration(self) -> "dict[str, Any]":
+        date_tag = f'{time.strftime("%y-%m-%d-%H-%M-%S")}-{self._iteration}'
+        row = {"Iteration": self._iteration, "Date tag": date_tag, "Start time": time.time()}
+        iter_start = time.perf_counter()
+        stage_start = iter_start
+        def stage_done(stage: str):
+            nonlocal stage_start
+            stage_end = time.perf_counter()
+            row[f'{stage} (s)'] = stage_end - stage_start
+            stage_start = stage_end
+        nodes = self.collect_inventory(date_tag)
+        stage_done("Inventory")
+        sol_df = self.optimize(nodes, date_tag)
+        stage_done("Optimization")
+        if sol_df is not None:
+            service_manifest, changed_manifest, changes = self.service_manifests(sol_df, date_tag)
+            stage_done("Service manifests")
+            if changed_manifest is None:
+                self._kubectl.apply(service_manifest, 'mist-type=service')
+            elif changes["changed"] or changes["removed"]:
+                self._kubectl.apply_changes(changed_manifest if changes["changed"] else None, changes["removed"])
+            self._service_manifest = service_manifest
+            stage_done("Service apply")
+        else:
+            print(f'Iteration {self._iteration}: no placement found, keeping the deployed services')
+        request_manifest, changed_manifest, changes = self.request_manifests(date_tag)
+        stage_done("Request manifests")
+        if changed_manifest is None or changes["removed"]:
+            self._kubectl.apply(request_manifest, 'mist-type=request')
+        elif changes["changed"]:
+            self._kubectl.apply_changes(changed_manifest, [])
+        RequestsToKubernetes.commit_hashes(self._request_hashes)
+        stage_done("Request apply")
+        row["End time"] = time.time()
+        row["Time taken (s)"] = time.perf_counter() - iter_start
+        self.advance_situation(date_tag)
+        stage_done("Situation")
+        self._record(row)
+        pods = self._kubectl.get_pods()
+        if pods:
+            with open(self._result_path("PodPlacement", date_tag, "csv"), 'w') as out_csv:
+                out_csv.writelines(','.join(line.split()) + '\n' for line in pods.splitlines())
+        self._iteration += 1
+        return row
+
+    def run(self, total_seconds: float, min_iteration_seconds: float = 0, max_iterations: int = None) -> None:
+        start = time.perf_counter()
+        while time.perf_counter() - start <= total_seconds and (max_iterations is None or self._iteration < max_iterations):
+            iter_start = time.perf_counter()
+            row = self.run_iteration()
+            print(f'Iteration {row["Iteration"]}: {row["Time taken (s)"]:.3f} s')
+            iter_left = min_iteration_seconds - (time.perf_counter() - iter_start)
+            if iter_left > 0:
+                time.sleep(iter_left)
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class CommandUI:
+
+    MIP_ENGINE = 'mip'
+    HEURISTIC_ENGINE = 'heuristic'
+    LP_ENGINE = 'lp'
+
+    ENGINES = [MIP_ENGINE, HEURISTIC_ENGINE, LP_ENGINE]
+
+    ARGUMENTS = {
+        "-s": {
+            "required": True,
+            "metavar": "Services config",
+            "help": "Case study services config in YAML or Mist scenario (.mist) format"
+        },
+        "-cs": {
+            "required": True,
+            "metavar": "YAML container specs",
+            "help": "Service container specs YAML configuration"
+        },
+        "-p": {
+            "required": True,
+            "metavar": "YAML service ports",
+            "help": "Service ports YAML configuration"
+        },
+        "-rs": {
+            "required": True,
+            "metavar": "YAML request container specs",
+            "help": "Request container specs YAML configuration"
+        },
+        "-r": {
+            "required": True,
+            "type": int,
+            "metavar": "number of requests",
+            "help": "Number of requests generated by the Unstable Situation Generator every iteration"
+        },
+        "-rp": {
+            "required": False,
+            "metavar": "Resource policies",
+            "help": "Resource policies in YAML or Mist scenario (.mist) format"
+        },
+        "-sp": {
+            "required": False,
+            "metavar": "Service policies",
+            "help": "Service policies in YAML or Mist scenario (.mist) format"
+        },
+        "-n": {
+            "required": False,
+            "metavar": "Nodes config",
+            "help": "Static nodes config in YAML or Mist scenario (.mist) format. The node inventory is collected from the cluster every iteration if not given"
+        },
+        "--owners": {
+            "required": False,
+            "metavar": "Owner CSV",
+            "default": os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "kubernetes_delegation", "owner.csv"),
+            "help": "CSV mapping node names to owners"
+        },
+        "--locations": {
+            "required": False,
+            "metavar": "Location CSV",
+            "default": os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "kubernetes_delegation", "location.csv"),
+            "help": "CSV mapping node names to latitude and longitude"
+        },
+        "--kube-json": {
+            "required": False,
+            "metavar": "JSON nodes",
+            "help": "Output of kubectl get nodes -o json served by the dry run instead of the cluster"
+        },
+        "--engine": {
+            "required": False,
+            "help": "Placement engine",
+            "choices": ENGINES,
+            "default": MIP_ENGINE
+        },
+        "--max-seconds": {
+            "required": False,
+            "type": float,
+            "metavar": "seconds",
+            "help": "Placement time limit per iteration"
+        },
+        "--rng-seed": {
+            "required": False,
+            "type": int,
+            "default": 0,
+            "metavar": "seed",
+            "help": "Seed of the Unstable Situation Generator"
+        },
+        "--streaming": {
+            "required": False,
+            "action": "store_true",
+            "help": "Draw requests with the numpy Unstable Situation Generator"
+        },
+        "--duration": {
+            "required": False,
+            "type": float,
+            "default": 1800,
+            "metavar": "seconds",
+            "help": "Total test length. No iteration is started after it"
+        },
+        "--min-iteration": {
+            "required": False,
+            "type": float,
+            "default": 240,
+            "metavar": "seconds",
+            "help": "Minimum iteration length. Faster iterations sleep for the remaining time"
+        },
+        "--iterations": {
+            "required": False,
+            "type": int,
+            "metavar": "iterations",
+            "help": "Maximum number of iterations"
+        },
+        "--dry-run": {
+            "required": False,
+            "action": "store_true",
+            "help": "Do not call kubectl. Manifests are generated but not applied, so the loop can be benchmarked without a cluster"
+        },
+        "-o": {
+            "required": False,
+            "metavar": "Results directory",
+            "default": "TestResultInfo",
+            "help": "Directory for the timing report and the nodes, solutions, manifests and requests of every iteration"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Control loop of the Mist Platform", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        if ui_args.dry_run and not (ui_args.n or ui_args.kube_json):
+            raise ValueError("A dry run needs a static nodes config or a kubectl nodes JSON")
+        from controller import PlatformController, KubectlClient, DryRunKubectl
+        from inventory import NodeInventoryCollector
+        from scenario import load_yaml, load_nodes, load_services, load_resource_policies, load_service_policies
+        from situationgen import UnstableSituationGenerator, StreamingSituationGenerator
+        kube_nodes = None
+        if ui_args.kube_json:
+            with open(ui_args.kube_json, 'r') as in_json:
+                kube_nodes = json.load(in_json)
+        kubectl = DryRunKubectl(kube_nodes) if ui_args.dry_run else KubectlClient()
+        collector = NodeInventoryCollector(ui_args.owners, ui_args.locations) if not ui_args.n else None
+        nodes = load_nodes(ui_args.n) if ui_args.n else collector.collect(kubectl.get_nodes())
+        services = load_services(ui_args.s)
+        if ui_args.streaming:
+            usg = StreamingSituationGenerator(services, nodes, ui_args.rng_seed)
+        else:
+            usg = UnstableSituationGenerator(services, nodes, ui_args.rng_seed)
+        controller = PlatformController(kubectl, usg, services, load_yaml(ui_args.cs), load_yaml(ui_args.p), load_yaml(ui_args.rs), ui_args.o, ui_args.r, collector=collector, nodes=nodes if ui_args.n else None, resource_policies=load_resource_policies(ui_args.rp) if ui_args.rp else [], service_policies=load_service_policies(ui_args.sp) if ui_args.sp else [], engine=ui_args.engine, max_seconds=ui_args.max_seconds)
+        try:
+            controller.run(ui_args.duration, ui_args.min_iteration, ui_args.iterations)
+        except KeyboardInterrupt:
+            print('Control loop interrupted')
+
+if __name__ == '__main__':
+    CommandUI().launch()
@@ -0,0 +1,110 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import itertools
+import json
+import threading
+import time
+
+
+class StubPipelineHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status: int, body: bytes, content_type: str = 'text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.gets += 1
+        parts = self.path.strip('/').split('/')
+        if parts == ['pipelines']:
+            if time.monotonic() < server.ready_at:
+                self._send(503, b'Not ready')
+            else:
+                self._send(200, b'[]', 'application/json')
+        elif len(parts) == 5 and parts[4] == 'status' and parts[3] in server.started:
+            start_time = server.started[parts[3]]
+            elapsed_time = time.time() - start_time
+            if elapsed_time >= server.pipeline_seconds:
+                status = {"state": 'COMPLETED', "start_time": start_time, "elapsed_time": server.pipeline_seconds}
+            else:
+                status = {"state": 'RUNNING', "start_time": start_time, "elapsed_time": elapsed_time}
+            self._send(200, json.dumps(status).encode(), 'application/json')
+        else:
+            self._send(404, b'Not found')
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.strip('/').split('/')[1:] != ['object_detection', 'person_vehicle_bike']:
+            self._send(404, b'Not found')
+            return
+        request_num = str(next(server.request_nums))
+        server.started[request_num] = time.time()
+        self._send(200, f'{request_num}\n'.encode())
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+class StubPipelineServer(ThreadingHTTPServer):
+
+    def __init__(self, address: "tuple[str, int]", pipeline_seconds: float, ready_seconds: float = 0):
+        super().__init__(address, StubPipelineHandler)
+        self.pipeline_seconds = pipeline_seconds
+        self.ready_at = time.monotonic() + ready_seconds
+        self.started = {}
+        self.request_nums = itertools.count(1)
+        self.gets = 0
+        self.lock = threading.Lock()
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "--port": {
+            "required": False,
+            "type": int,
+            "default": 8080,
+            "metavar": "port",
+            "help": "Listening port"
+        },
+        "--pipeline-seconds": {
+            "required": False,
+            "type": float,
+            "default": 2,
+            "metavar": "seconds",
+            "help": "Time until a started pipeline reports COMPLETED"
+        },
+        "--ready-seconds": {
+            "required": False,
+            "type": float,
+            "default": 0,
+            "metavar": "seconds",
+            "help": "Time until the pipelines endpoint reports ready"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Local stub of the Intel video analytics pipelines API for testing the IntelTester", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        server = StubPipelineServer(('127.0.0.1', ui_args.port), ui_args.pipeline_seconds, ui_args.ready_seconds)
+        print(f'Stub pipelines API listening on http://127.0.0.1:{ui_args.port}/pipelines', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+
+if __name__ == '__main__':
+    CommandUI().launch()
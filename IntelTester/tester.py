@@ -1,40 +1,21 @@
-import requests
-import pandas as pd
-import time
+from typing import Any, TextIO
+import argparse
+import asyncio
+import csv
 import datetime
-import sys
-
-date_id = datetime.datetime.now().strftime("%y-%m-%d-%H-%M-%S")
-
-wait_ready_url = "http://intelai-service.default.svc.cluster.local:8080/pipelines"
-
-time_report_data = []
-
-print("Waiting until the system is ready...")
-sys.stdout.flush()
-sys.stderr.flush()
-system_ready = False
-while not system_ready:
-    try:
-        response = requests.get(wait_ready_url)
-        if response.status_code == 200:
-            system_ready = True
-    except Exception:
-        pass
+import itertools
+import os
+import random
+import time
+import httpx
 
-print(f"System is ready")
-sys.stdout.flush()
-sys.stderr.flush()
 
-iter_counter = 0
-while True:
-    url = wait_ready_url+"/object_detection/person_vehicle_bike"
+class IntelTester:
 
-    headers = {
-        "Content-Type": "application/json"
-    }
+    PIPELINE_PATH = "/object_detection/person_vehicle_bike"
+    RESULT_COLUMNS = ["Iteration", "Start time", "End time", "Time taken (s)", "Pipeline"]
 
-    data = {
+    PIPELINE_REQUEST = {
         "source": {
             "uri": "https://github.com/intel-iot-devkit/sample-videos/blob/master/person-bicycle-car-detection.mp4?raw=true",
             "type": "uri"
@@ -51,52 +32,150 @@ while True:
         }
     }
 
-    print(f"Sending request")
-    sys.stdout.flush()
-    sys.stderr.flush()
-
-    start_time = time.perf_counter()
-
-    response = requests.post(url, json=data, headers=headers)
-
-    if response.status_code == 200:
-        print("Pipeline request was successful.")
-        print("Pipeline request ID:", response.content)
-        sys.stdout.flush()
-        sys.stderr.flush()
-    else:
-        print("Request failed with status code:", response.status_code)
-        print("Response content:", response.content)
-        sys.stdout.flush()
-        sys.stderr.flush()
-        raise ValueError(f"Request failed with status code {response.status_code}")
-
-    request_num = response.content
-
-    check_url = url+f"/{request_num.decode()[:-1]}/status"
-
-    request_over = False
-
-    print("Waiting until the pipeline finishes...")
-    sys.stdout.flush()
-    sys.stderr.flush()
-    while not request_over:
-        response = requests.get(check_url)
-        if response.status_code == 200:
-            json_response = response.json()
-            state = json_response["state"]
-            if state == "COMPLETED":
-                end_time = time.perf_counter()
-                request_over = True
-                print("Pipeline finished")
-                sys.stdout.flush()
-                sys.stderr.flush()
-                time_report_data.append({"Iteration": iter_counter, "Start time": start_time, "End time": end_time, "Time taken (s)": end_time-start_time})
-        else:
-            print("Checking request failed with status code:", response.status_code)
-            print("Response content:", response.content)
-            sys.stdout.flush()
-            sys.stderr.flush()
+    def __init__(self, base_url: str, out_csv: str, pipelines: int = 1, min_poll: float = 0.1, max_poll: float = 0.25, timeout: float = 60):
+        self._base_url = base_url
+        self._out_csv = out_csv
+        self._pipelines = pipelines
+        self._min_poll = min_poll
+        self._max_poll = max_poll
+        self._timeout = timeout
+        self._iterations = itertools.count()
+
+    async def _backoff(self, attempt: int, max_poll: float):
+        delay = min(max_poll, self._min_poll*2**attempt)
+        await asyncio.sleep(delay*random.uniform(0.5, 1))
+
+    async def wait_ready(self, client: httpx.AsyncClient):
+        print("Waiting until the system is ready...", flush=True)
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(self._base_url)
+                if response.status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await self._backoff(attempt, 5*self._max_poll)
+            attempt += 1
+        print("System is ready", flush=True)
+
+    @staticmethod
+    def _completion_time(status: "dict[str, Any]", start_time: float, poll_time: float) -> float:
+        if "start_time" not in status or "elapsed_time" not in status:
+            return poll_time
+        completion_time = status["start_time"] + status["elapsed_time"]
+        return completion_time if start_time <= completion_time <= poll_time else poll_time
+
+    async def run_pipeline(self, client: httpx.AsyncClient) -> "tuple[float, float]":
+        url = self._base_url + self.PIPELINE_PATH
+        start_time = time.time()
+        response = await client.post(url, json=self.PIPELINE_REQUEST)
+        if response.status_code != 200:
+            print("Request failed with status code:", response.status_code, flush=True)
+            print("Response content:", response.content, flush=True)
             raise ValueError(f"Request failed with status code {response.status_code}")
-    pd.DataFrame(time_report_data).to_csv(f"/persistent/IntelAIQoS-{date_id}.csv", index=False) # Refresh on disk
-    iter_counter += 1
\ No newline at end of file
+        request_num = response.text.strip()
+        print("Pipeline request ID:", request_num, flush=True)
+        check_url = f'{url}/{request_num}/status'
+        attempt = 0
+        while True:
+            response = await client.get(check_url)
+            if response.status_code != 200:
+                print("Checking request failed with status code:", response.status_code, flush=True)
+                print("Response content:", response.content, flush=True)
+                raise ValueError(f"Request failed with status code {response.status_code}")
+            status = response.json()
+            if status["state"] == "COMPLETED":
+                return start_time, self._completion_time(status, start_time, time.time())
+            await self._backoff(attempt, self._max_poll)
+            attempt += 1
+
+    async def _pipeline_loop(self, client: httpx.AsyncClient, pipeline: int, writer: "csv.DictWriter", out_file: "TextIO", max_iterations: int = None):
+        while True:
+            iteration = next(self._iterations)
+            if max_iterations is not None and iteration >= max_iterations:
+                return
+            start_time, end_time = await self.run_pipeline(client)
+            print(f"Pipeline {pipeline} finished iteration {iteration}", flush=True)
+            writer.writerow({"Iteration": iteration, "Start time": start_time, "End time": end_time, "Time taken (s)": end_time - start_time, "Pipeline": pipeline})
+            out_file.flush()
+
+    async def run(self, max_iterations: int = None):
+        limits = httpx.Limits(max_connections=self._pipelines, max_keepalive_connections=self._pipelines)
+        async with httpx.AsyncClient(limits=limits, timeout=self._timeout, headers={"Content-Type": "application/json"}) as client:
+            await self.wait_ready(client)
+            new_report = not os.path.isfile(self._out_csv)
+            with open(self._out_csv, 'a', newline='') as out_file:
+                writer = csv.DictWriter(out_file, fieldnames=self.RESULT_COLUMNS)
+                if new_report:
+                    writer.writeheader()
+                    out_file.flush()
+                await asyncio.gather(*[self._pipeline_loop(client, pipeline, writer, out_file, max_iterations) for pipeline in range(self._pipelines)])
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "--url": {
+            "required": False,
+            "metavar": "pipelines URL",
+            "default": os.environ.get("INTELAI_URL", "http://intelai-service.default.svc.cluster.local:8080/pipelines"),
+            "help": "Pipelines endpoint of the Intel video analytics service"
+        },
+        "--pipelines": {
+            "required": False,
+            "type": int,
+            "default": int(os.environ.get("INTELAI_PIPELINES", 1)),
+            "metavar": "pipelines",
+            "help": "Number of pipelines kept running concurrently"
+        },
+        "--min-poll": {
+            "required": False,
+            "type": float,
+            "default": 0.1,
+            "metavar": "seconds",
+            "help": "First status polling interval. It doubles with jitter on every poll"
+        },
+        "--max-poll": {
+            "required": False,
+            "type": float,
+            "default": 0.25,
+            "metavar": "seconds",
+            "help": "Maximum status polling interval. End times come from the completion time reported by the service, and only fall back to the polling time, late by up to this interval, when it is not reported"
+        },
+        "--timeout": {
+            "required": False,
+            "type": float,
+            "default": 60,
+            "metavar": "seconds",
+            "help": "HTTP request timeout"
+        },
+        "--iterations": {
+            "required": False,
+            "type": int,
+            "metavar": "iterations",
+            "help": "Number of pipelines to run before exiting. Runs forever if not given"
+        },
+        "-o": {
+            "required": False,
+            "metavar": "Output directory",
+            "default": "/persistent",
+            "help": "Directory of the IntelAIQoS CSV. Results are appended as every pipeline finishes"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="QoS tester for the Intel video analytics service", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        date_id = datetime.datetime.now().strftime("%y-%m-%d-%H-%M-%S")
+        tester = IntelTester(ui_args.url, os.path.join(ui_args.o, f"IntelAIQoS-{date_id}.csv"), ui_args.pipelines, ui_args.min_poll, ui_args.max_poll, ui_args.timeout)
+        asyncio.run(tester.run(ui_args.iterations))
+
+if __name__ == '__main__':
+    CommandUI().launch()
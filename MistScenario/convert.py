@@ -0,0 +1,58 @@
+from scenario import MistScenario, load_yaml
+import argparse
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "-n": {
+            "required": False,
+            "metavar": "YAML node config",
+            "help": "Case study nodes config in YAML format"
+        },
+        "-s": {
+            "required": False,
+            "metavar": "YAML services config",
+            "help": "Case study services config in YAML format"
+        },
+        "-r": {
+            "required": False,
+            "metavar": "YAML requests config",
+            "help": "Case study requests config in YAML format"
+        },
+        "-rp": {
+            "required": False,
+            "metavar": "YAML resource policies",
+            "help": "Case study resource policies in YAML format"
+        },
+        "-sp": {
+            "required": False,
+            "metavar": "YAML service policies",
+            "help": "Case study service policies in YAML format"
+        },
+        "-o": {
+            "required": True,
+            "metavar": "Output scenario",
+            "help": "Output scenario directory in the columnar Mist format (.mist)"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="CLI for converting YAML case studies to the columnar Mist scenario format", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        if not any([ui_args.n, ui_args.s, ui_args.r, ui_args.rp, ui_args.sp]):
+            raise TypeError("Must specify at least one YAML configuration to convert")
+        sections = {}
+        for section, path in [("nodes", ui_args.n), ("services", ui_args.s), ("requests", ui_args.r), ("resource_policies", ui_args.rp), ("service_policies", ui_args.sp)]:
+            if path:
+                sections[section] = load_yaml(path)
+        MistScenario.from_dicts(**sections).save(ui_args.o)
+
+if __name__ == '__main__':
+    CommandUI().launch()
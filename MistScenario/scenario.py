@@ -0,0 +1,271 @@
+from typing import Any, Union
+import json
+import os
+import numpy as np
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+
+SCENARIO_SUFFIX = '.mist'
+
+def load_yaml(path: str) -> "Any":
+    with open(path, 'r') as in_yaml:
+        return yaml.load(in_yaml, Loader=SafeLoader)
+
+def dump_yaml(data: "Any", path: str):
+    with open(path, 'w') as out_yaml:
+        yaml.dump(data, out_yaml, Dumper=SafeDumper)
+
+def is_scenario(path: str) -> bool:
+    return path.endswith(SCENARIO_SUFFIX) or os.path.isfile(os.path.join(path, MistScenario.META_FILE))
+
+
+class MistScenario:
+
+    FORMAT_VERSION = 1
+    META_FILE = 'meta.json'
+    RESOURCES = ["ram", "cpu", "storage"]
+    NODE_FIELDS = RESOURCES + ["owner", "location", "latency"]
+    SERVICE_FIELDS = RESOURCES + ["developer"]
+    REQUEST_FIELDS = ["node", "service", "id"]
+
+    @staticmethod
+    def _is_integer(value: "Any") -> bool:
+        return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+    @staticmethod
+    def _restore_integers(values: "list[float]", integer: "Union[np.ndarray, None]") -> "list[Union[int, float]]":
+        if integer is None:
+            return values
+        return [int(value) if is_integer else value for value, is_integer in zip(values, integer.tolist())]
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "MistScenario":
+        with open(os.path.join(path, MistScenario.META_FILE), 'r') as in_meta:
+            meta = json.load(in_meta)
+        if meta["version"] > MistScenario.FORMAT_VERSION:
+            raise ValueError(f'Unsupported scenario format version {meta["version"]}')
+        arrays = {}
+        for array_name in meta["arrays"]:
+            arrays[array_name] = np.load(os.path.join(path, f'{array_name}.npy'), mmap_mode='r' if mmap else None)
+        return MistScenario(meta, arrays)
+
+    @staticmethod
+    def from_dicts(nodes: "dict[str, dict[str, Any]]" = None, services: "dict[str, dict[str, Any]]" = None, requests: "dict[str, dict[str, str]]" = None, resource_policies: "list[dict[str, Any]]" = None, service_policies: "list[dict[str, Any]]" = None) -> "MistScenario":
+        meta = {"version": MistScenario.FORMAT_VERSION, "node_ids": [], "service_ids": [], "arrays": []}
+        arrays = {}
+        def add_integer_mask(array_name: str, integer: np.ndarray):
+            if integer.any():
+                arrays[f'{array_name}_integer'] = integer
+        node_index, service_index = {}, {}
+        def intern_node(node_id: str) -> int:
+            if node_id not in node_index:
+                node_index[node_id] = len(meta["node_ids"])
+                meta["node_ids"].append(node_id)
+            return node_index[node_id]
+        def intern_service(service_id: str) -> int:
+            if service_id not in service_index:
+                service_index[service_id] = len(meta["service_ids"])
+                meta["service_ids"].append(service_id)
+            return service_index[service_id]
+        if nodes is not None:
+            for n in nodes:
+                intern_node(n)
+            for n in nodes:
+                for field in ["location", "latency"]:
+                    for other in nodes[n].get(field, {}):
+                        intern_node(other)
+            meta["num_nodes"] = len(nodes)
+            meta["owner_ids"] = sorted({nodes[n]["owner"] for n in nodes})
+            owner_index = {owner: ndx for ndx, owner in enumerate(meta["owner_ids"])}
+            arrays["node_capacity"] = np.array([[nodes[n][resource] for resource in MistScenario.RESOURCES] for n in nodes], dtype=np.float64).reshape(len(nodes), len(MistScenario.RESOURCES))
+            add_integer_mask("node_capacity", np.array([[MistScenario._is_integer(nodes[n][resource]) for resource in MistScenario.RESOURCES] for n in nodes], dtype=bool).reshape(len(nodes), len(MistScenario.RESOURCES)))
+            arrays["node_owner"] = np.array([owner_index[nodes[n]["owner"]] for n in nodes], dtype=np.int32)
+            for field in ["location", "latency"]:
+                matrix = np.full((len(nodes), len(meta["node_ids"])), np.nan)
+                integer = np.zeros(matrix.shape, dtype=bool)
+                for ndx, n in enumerate(nodes):
+                    values = nodes[n].get(field, {})
+                    if len(values) > 0:
+                        matrix[ndx, [node_index[other] for other in values]] = list(values.values())
+                        integer[ndx, [node_index[other] for other in values]] = [MistScenario._is_integer(value) for value in values.values()]
+                arrays[field] = matrix
+                add_integer_mask(field, integer)
+            meta["node_extra"] = {n: {k: v for k, v in nodes[n].items() if k not in MistScenario.NODE_FIELDS + ["id"]} for n in nodes}
+        if services is not None:
+            for s in services:
+                intern_service(s)
+            meta["num_services"] = len(services)
+            meta["developer_ids"] = sorted({services[s]["developer"] for s in services})
+            developer_index = {developer: ndx for ndx, developer in enumerate(meta["developer_ids"])}
+            arrays["service_resources"] = np.array([[services[s][resource] for resource in MistScenario.RESOURCES] for s in services], dtype=np.float64).reshape(len(services), len(MistScenario.RESOURCES))
+            add_integer_mask("service_resources", np.array([[MistScenario._is_integer(services[s][resource]) for resource in MistScenario.RESOURCES] for s in services], dtype=bool).reshape(len(services), len(MistScenario.RESOURCES)))
+            arrays["service_developer"] = np.array([developer_index[services[s]["developer"]] for s in services], dtype=np.int32)
+            meta["service_extra"] = {s: {k: v for k, v in services[s].items() if k not in MistScenario.SERVICE_FIELDS + ["id"]} for s in services}
+        if requests is not None:
+            arrays["request_ids"] = np.array(list(requests), dtype=str)
+            arrays["request_node"] = np.array([intern_node(requests[r]["node"]) for r in requests], dtype=np.int32)
+            arrays["request_service"] = np.array([intern_service(requests[r]["service"]) for r in requests], dtype=np.int32)
+            meta["request_extra"] = {r: {k: v for k, v in requests[r].items() if k not in MistScenario.REQUEST_FIELDS} for r in requests if len(requests[r].keys() - MistScenario.REQUEST_FIELDS) > 0}
+        if resource_policies is not None:
+            meta["resource_policies"] = resource_policies
+        if service_policies is not None:
+            meta["service_policies"] = service_policies
+        meta["arrays"] = list(arrays)
+        return MistScenario(meta, arrays)
+
+    @staticmethod
+    def from_request_arrays(request_ids: np.ndarray, request_node: np.ndarray, request_service: np.ndarray, node_ids: "list[str]", service_ids: "list[str]") -> "MistScenario":
+        meta = {"version": MistScenario.FORMAT_VERSION, "node_ids": list(node_ids), "service_ids": list(service_ids), "request_extra": {}, "arrays": ["request_ids", "request_node", "request_service"]}
+        return MistScenario(meta, {"request_ids": request_ids, "request_node": request_node.astype(np.int32), "request_service": request_service.astype(np.int32)})
+
+    def __init__(self, meta: "dict[str, Any]", arrays: "dict[str, np.ndarray]"):
+        self._meta = meta
+        self._arrays = arrays
+
+    def with_request_arrays(self, request_ids: np.ndarray, request_node: np.ndarray, request_service: np.ndarray, node_ids: "list[str]", service_ids: "list[str]", request_extra: "dict[str, dict[str, Any]]" = None) -> "MistScenario":
+        meta = dict(self._meta, node_ids=list(self._meta["node_ids"]), service_ids=list(self._meta["service_ids"]), request_extra=request_extra if request_extra is not None else {})
+        indexes = []
+        for ids, scenario_ids in [(node_ids, meta["node_ids"]), (service_ids, meta["service_ids"])]:
+            scenario_index = {scenario_id: ndx for ndx, scenario_id in enumerate(scenario_ids)}
+            for new_id in ids:
+                if new_id not in scenario_index:
+                    scenario_index[new_id] = len(scenario_ids)
+                    scenario_ids.append(new_id)
+            indexes.append(np.array([scenario_index[new_id] for new_id in ids], dtype=np.int32))
+        node_index, service_index = indexes
+        arrays = dict(self._arrays, request_ids=request_ids, request_node=node_index[request_node], request_service=service_index[request_service])
+        meta["arrays"] = list(arrays)
+        return MistScenario(meta, arrays)
+
+    def with_requests(self, requests: "dict[str, dict[str, str]]") -> "MistScenario":
+        request_scenario = MistScenario.from_dicts(requests=requests)
+        return self.with_request_arrays(request_scenario._arrays["request_ids"], request_scenario._arrays["request_node"], request_scenario._arrays["request_service"], request_scenario._meta["node_ids"], request_scenario._meta["service_ids"], request_scenario._meta["request_extra"])
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        for array_name in self._arrays:
+            np.save(os.path.join(path, f'{array_name}.npy'), self._arrays[array_name])
+        with open(os.path.join(path, self.META_FILE), 'w') as out_meta:
+            json.dump(self._meta, out_meta)
+
+    def has_nodes(self) -> bool:
+        return "num_nodes" in self._meta
+
+    def has_services(self) -> bool:
+        return "num_services" in self._meta
+
+    def has_requests(self) -> bool:
+        return "request_ids" in self._arrays
+
+    def node_ids(self) -> "list[str]":
+        return self._meta["node_ids"][:self._meta.get("num_nodes", 0)]
+
+    def service_ids(self) -> "list[str]":
+        return self._meta["service_ids"][:self._meta.get("num_services", 0)]
+
+    def node_capacity(self) -> np.ndarray:
+        return self._arrays["node_capacity"]
+
+    def distance_matrix(self) -> np.ndarray:
+        return self._arrays["location"]
+
+    def latency_matrix(self) -> np.ndarray:
+        return self._arrays["latency"]
+
+    def _require(self, available: bool, section: str):
+        if not available:
+            raise ValueError(f'Scenario has no {section}')
+
+    def _matrix_row(self, field: str, ndx: int) -> "dict[str, Union[int, float]]":
+        matrix = self._arrays[field]
+        present = np.flatnonzero(~np.isnan(matrix[ndx]))
+        integer = self._arrays.get(f'{field}_integer')
+        values = self._restore_integers(matrix[ndx, present].tolist(), integer[ndx, present] if integer is not None else None)
+        return dict(zip([self._meta["node_ids"][other] for other in present], values))
+
+    def nodes(self) -> "dict[str, dict[str, Any]]":
+        self._require(self.has_nodes(), "nodes")
+        capacity = np.asarray(self._arrays["node_capacity"]).tolist()
+        integer = self._arrays.get("node_capacity_integer")
+        owners = np.asarray(self._arrays["node_owner"]).tolist()
+        nodes = {}
+        for ndx, n in enumerate(self.node_ids()):
+            nodes[n] = dict(zip(self.RESOURCES, self._restore_integers(capacity[ndx], integer[ndx] if integer is not None else None)))
+            nodes[n]["owner"] = self._meta["owner_ids"][owners[ndx]]
+            nodes[n]["location"] = self._matrix_row("location", ndx)
+            nodes[n]["latency"] = self._matrix_row("latency", ndx)
+            nodes[n].update(self._meta["node_extra"][n])
+        return nodes
+
+    def services(self) -> "dict[str, dict[str, Any]]":
+        self._require(self.has_services(), "services")
+        resources = np.asarray(self._arrays["service_resources"]).tolist()
+        integer = self._arrays.get("service_resources_integer")
+        developers = np.asarray(self._arrays["service_developer"]).tolist()
+        services = {}
+        for ndx, s in enumerate(self.service_ids()):
+            services[s] = dict(zip(self.RESOURCES, self._restore_integers(resources[ndx], integer[ndx] if integer is not None else None)))
+            services[s]["developer"] = self._meta["developer_ids"][developers[ndx]]
+            services[s].update(self._meta["service_extra"][s])
+        return services
+
+    def requests(self) -> "dict[str, dict[str, str]]":
+        self._require(self.has_requests(), "requests")
+        node_ids = self._meta["node_ids"]
+        service_ids = self._meta["service_ids"]
+        request_extra = self._meta["request_extra"]
+        requests = {r: {"node": node_ids[n], "service": service_ids[s]} for r, n, s in zip(self._arrays["request_ids"].tolist(), self._arrays["request_node"].tolist(), self._arrays["request_service"].tolist())}
+        for r in request_extra:
+            requests[r].update(request_extra[r])
+        return requests
+
+    def resource_policies(self) -> "list[dict[str, Any]]":
+        self._require("resource_policies" in self._meta, "resource policies")
+        return self._meta["resource_policies"]
+
+    def service_policies(self) -> "list[dict[str, Any]]":
+        self._require("service_policies" in self._meta, "service policies")
+        return self._meta["service_policies"]
+
+
+def _load_section(path: str, section: str) -> "Any":
+    if is_scenario(path):
+        return getattr(MistScenario.load(path), section)()
+    return load_yaml(path)
+
+def load_nodes(path: str) -> "dict[str, dict[str, Any]]":
+    return _load_section(path, "nodes")
+
+def load_services(path: str) -> "dict[str, dict[str, Any]]":
+    return _load_section(path, "services")
+
+def load_requests(path: str) -> "dict[str, dict[str, str]]":
+    return _load_section(path, "requests")
+
+def load_resource_policies(path: str) -> "list[dict[str, Any]]":
+    return _load_section(path, "resource_policies")
+
+def load_service_policies(path: str) -> "list[dict[str, Any]]":
+    return _load_section(path, "service_policies")
+
+def _existing_scenario(path: str) -> "Union[MistScenario, None]":
+    return MistScenario.load(path, mmap=False) if os.path.isfile(os.path.join(path, MistScenario.META_FILE)) else None
+
+def save_requests(requests: "dict[str, dict[str, str]]", path: str):
+    if is_scenario(path):
+        scenario = _existing_scenario(path)
+        (scenario.with_requests(requests) if scenario is not None else MistScenario.from_dicts(requests=requests)).save(path)
+    else:
+        dump_yaml(requests, path)
+
+def save_request_arrays(request_ids: np.ndarray, request_node: np.ndarray, request_service: np.ndarray, node_ids: "list[str]", service_ids: "list[str]", path: str):
+    scenario = _existing_scenario(path)
+    if scenario is not None:
+        scenario.with_request_arrays(request_ids, request_node, request_service, node_ids, service_ids).save(path)
+    else:
+        MistScenario.from_request_arrays(request_ids, request_node, request_service, node_ids, service_ids).save(path)
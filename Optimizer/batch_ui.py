@@ -0,0 +1,259 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Union
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
+
+RESULT_COLUMNS = ["Case", "Nodes", "Requests", "Resource policies", "Service policies", "Objective", "Status", "Objective value", "Objective bound", "Gap", "Build time", "Solve time", "Placed requests", "Peak RSS (kB)", "Error"]
+
+def _limit_memory(max_bytes: "Union[int, None]"):
+    if max_bytes is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+def _case_columns(case: "dict[str, Any]") -> "dict[str, Any]":
+    return {"Case": case["id"], "Nodes": case["nodes"], "Requests": case["requests"], "Resource policies": case.get("resource_policies"), "Service policies": case.get("service_policies"), "Objective": case["objective"]}
+
+def solve_case(case: "dict[str, Any]") -> "tuple[dict[str, Any], list[dict[str, str]]]":
+    from optimizer import MistPlatformOptimizer
+    from scenario import load_nodes, load_services, load_requests, load_resource_policies, load_service_policies
+    result = _case_columns(case)
+    solution = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            optimizer = MistPlatformOptimizer(load_nodes(case["nodes"]), load_services(case["services"]), load_requests(case["requests"]), load_resource_policies(case["resource_policies"]) if case.get("resource_policies") else [], load_service_policies(case["service_policies"]) if case.get("service_policies") else [], aggregate_requests=case["aggregate"], solver=case["solver"])
+            optimizer.configure_solver(case["threads"], case["max_gap"])
+            optimizer.set_verbose(0)
+            if case["objective"] == MistPlatformOptimizer.MIN_MAX_OBJ:
+                optimizer.objective_min_max()
+            else:
+                optimizer.objective_average()
+            result["Build time"] = time.perf_counter() - start
+            optimization_ok = optimizer.optimize(case["max_seconds"])
+        solve_stats = optimizer.get_solve_stats()
+        result.update({"Status": solve_stats["status"], "Objective value": solve_stats["objective_value"], "Objective bound": solve_stats["objective_bound"], "Gap": solve_stats["gap"], "Solve time": solve_stats["time"]})
+        if optimization_ok:
+            sol_df = optimizer.get_solution_dataframe()
+            sol_df.insert(0, "Case", case["id"])
+            solution = sol_df.to_dict(orient="records")
+            result["Placed requests"] = len(solution)
+    except MemoryError:
+        result.update({"Status": "ERROR", "Error": "MemoryError: worker memory limit exceeded"})
+    except Exception as e:
+        result.update({"Status": "ERROR", "Error": f'{type(e).__name__}: {e}'})
+    result["Peak RSS (kB)"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, solution
+
+
+class CommandUI:
+
+    AVERAGE_OBJ = 'avg'
+    MIN_MAX_OBJ = 'minmax'
+
+    OBJECTIVES = [AVERAGE_OBJ, MIN_MAX_OBJ]
+
+    SOLVERS = ['cbc', 'highs']
+
+    ARGUMENTS = {
+        "-m": {
+            "required": True,
+            "metavar": "YAML batch manifest",
+            "help": "List of cases, each with nodes and requests paths and optional services, resource_policies, service_policies, objective and id. Relative paths are resolved against the manifest directory"
+        },
+        "-s": {
+            "required": False,
+            "metavar": "Services config",
+            "help": "Services config in YAML or Mist scenario (.mist) format used by cases that do not specify one"
+        },
+        "--obj": {
+            "required": False,
+            "help": "Optimization objective used by cases that do not specify one",
+            "choices": OBJECTIVES,
+            "default": AVERAGE_OBJ
+        },
+        "--aggregate": {
+            "required": False,
+            "action": "store_true",
+            "help": "Group interchangeable requests (same requestor and service) into integer count variables"
+        },
+        "--solver": {
+            "required": False,
+            "help": "MIP solver backend. highs requires the highspy package",
+            "choices": SOLVERS,
+            "default": 'cbc'
+        },
+        "--threads": {
+            "required": False,
+            "type": int,
+            "metavar": "threads",
+            "help": "Number of solver threads per case"
+        },
+        "--max-seconds": {
+            "required": False,
+            "type": float,
+            "metavar": "seconds",
+            "help": "Solver time limit per case"
+        },
+        "--max-gap": {
+            "required": False,
+            "type": float,
+            "metavar": "gap",
+            "help": "Relative optimality gap at which the solver stops"
+        },
+        "--workers": {
+            "required": False,
+            "type": int,
+            "metavar": "processes",
+            "help": "Number of worker processes. Defaults to the number of cores"
+        },
+        "--max-memory": {
+            "required": False,
+            "type": float,
+            "metavar": "MiB",
+            "help": "Address space limit of every worker process. Cases exceeding it are recorded as errors"
+        },
+        "--tasks-per-worker": {
+            "required": False,
+            "type": int,
+            "default": 1,
+            "metavar": "cases",
+            "help": "Cases solved by a worker process before it is replaced, releasing its memory"
+        },
+        "-o": {
+            "required": True,
+            "metavar": "Output CSV",
+            "help": "Result table with the status, objective, bound, gap and timings of every case. Cases already present are skipped, so an interrupted batch resumes where it stopped"
+        },
+        "--dfo": {
+            "required": False,
+            "metavar": "Output CSV",
+            "help": "Solution dataframe of every case in CSV format, with a leading Case column"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Batch solver for the Mist Platform Optimizer", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def _cases(self, ui_args: argparse.Namespace) -> "list[dict[str, Any]]":
+        import yaml
+        with open(ui_args.m, 'r') as in_yaml:
+            entries = yaml.safe_load(in_yaml)
+        base_dir = os.path.dirname(os.path.abspath(ui_args.m))
+        cases = []
+        for entry in entries:
+            case = {"services": os.path.abspath(ui_args.s) if ui_args.s else None, "objective": ui_args.obj}
+            case.update(entry)
+            if not case.get("services"):
+                raise ValueError(f'Services must be specified for case {entry}')
+            if case["objective"] not in self.OBJECTIVES:
+                raise ValueError(f'Unsupported objective {case["objective"]} for case {entry}. Choose one of {", ".join(self.OBJECTIVES)}')
+            for field in ["nodes", "services", "requests", "resource_policies", "service_policies"]:
+                if case.get(field):
+                    case[field] = os.path.join(base_dir, case[field])
+            case.update(aggregate=ui_args.aggregate, solver=ui_args.solver, threads=ui_args.threads, max_seconds=ui_args.max_seconds, max_gap=ui_args.max_gap)
+            case["id"] = str(case["id"]) if "id" in case else hashlib.blake2b(json.dumps(case, sort_keys=True).encode(), digest_size=8).hexdigest()
+            cases.append(case)
+        return cases
+
+    def _done_cases(self, ui_args: argparse.Namespace) -> "set[str]":
+        if not os.path.isfile(ui_args.o):
+            return set()
+        with open(ui_args.o, 'r', newline='') as in_csv:
+            rows = list(csv.DictReader(in_csv))
+        solved = [row for row in rows if row["Status"] != "ERROR"]
+        if len(solved) < len(rows):
+            with open(ui_args.o, 'w', newline='') as out_csv:
+                writer = csv.DictWriter(out_csv, fieldnames=RESULT_COLUMNS)
+                writer.writeheader()
+                writer.writerows(solved)
+        done = {row["Case"] for row in solved}
+        if ui_args.dfo and os.path.isfile(ui_args.dfo):
+            import pandas as pd
+            solutions = pd.read_csv(ui_args.dfo, dtype=str)
+            solutions[solutions["Case"].isin(done)].to_csv(ui_args.dfo, index=False)
+        return done
+
+    def _record(self, ui_args: argparse.Namespace, result: "dict[str, Any]", solution: "list[dict[str, str]]") -> None:
+        if ui_args.dfo and len(solution) > 0:
+            import pandas as pd
+            pd.DataFrame(solution).to_csv(ui_args.dfo, mode='a', header=not os.path.isfile(ui_args.dfo), index=False)
+        new_table = not os.path.isfile(ui_args.o)
+        with open(ui_args.o, 'a', newline='') as out_csv:
+            writer = csv.DictWriter(out_csv, fieldnames=RESULT_COLUMNS)
+            if new_table:
+                writer.writeheader()
+            writer.writerow(result)
+        print(f'{result["Case"]}: {result["Status"]}' + (f' objective {result["Objective value"]}' if result.get("Objective value") is not None else '') + (f' ({result["Error"]})' if result.get("Error") else ''))
+
+    def _executor(self, ui_args: argparse.Namespace, max_workers: "Union[int, None]" = None) -> ProcessPoolExecutor:
+        max_bytes = int(ui_args.max_memory*2**20) if ui_args.max_memory else None
+        return ProcessPoolExecutor(max_workers=max_workers or ui_args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_limit_memory, initargs=(max_bytes,), max_tasks_per_child=ui_args.tasks_per_worker)
+
+    def _solve_alone(self, ui_args: argparse.Namespace, case: "dict[str, Any]") -> "tuple[dict[str, Any], list[dict[str, str]]]":
+        executor = self._executor(ui_args, 1)
+        try:
+            return executor.submit(solve_case, case).result()
+        except BrokenProcessPool as e:
+            return dict(_case_columns(case), Status="ERROR", Error=f'Worker process died: {e}'), []
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        cases = self._cases(ui_args)
+        done = self._done_cases(ui_args)
+        pending = [case for case in cases if case["id"] not in done]
+        print(f'{len(done)} cases already solved, {len(pending)} pending')
+        pending.reverse()
+        max_in_flight = ui_args.workers or os.cpu_count()
+        executor = self._executor(ui_args)
+        in_flight = {}
+        broken_pools = {}
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < max_in_flight:
+                    case = pending.pop()
+                    in_flight[executor.submit(solve_case, case)] = case
+                finished, __ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = []
+                for future in finished:
+                    case = in_flight.pop(future)
+                    try:
+                        result, solution = future.result()
+                    except BrokenProcessPool:
+                        broken.append(case)
+                        continue
+                    self._record(ui_args, result, solution)
+                if broken:
+                    broken += in_flight.values()
+                    in_flight = {}
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = self._executor(ui_args)
+                    for case in broken:
+                        broken_pools[case["id"]] = broken_pools.get(case["id"], 0) + 1
+                        if broken_pools[case["id"]] == 1:
+                            pending.append(case)
+                        else:
+                            self._record(ui_args, *self._solve_alone(ui_args, case))
+        except KeyboardInterrupt:
+            print('Batch interrupted. Run it again with the same -o to resume')
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == '__main__':
+    CommandUI().launch()
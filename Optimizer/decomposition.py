@@ -0,0 +1,101 @@
+from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+from optimizer import MistPlatformOptimizer
+from mip.constants import OptimizationStatus
+import contextlib
+import io
+import time
+
+_shared_inputs = {}
+
+def _init_worker(inputs: "dict[str, Union[dict, list, bool, str]]", objective_scales: "dict[str, dict[str, Union[int, float]]]", solver_settings: "dict[str, Union[int, float, str]]"):
+  _shared_inputs.update(inputs=inputs, objective_scales=objective_scales, solver_settings=solver_settings)
+
+def _solve_component(requests: "dict[str, dict[str, str]]", max_seconds: float = None) -> "tuple[bool, bool, Union[float, None], dict]":
+  inputs = _shared_inputs["inputs"]
+  optimizer = MistPlatformOptimizer(inputs["nodes"], inputs["services"], requests, inputs["resource_policies"], inputs["service_policies"], aggregate_requests=inputs["aggregate_requests"], solver=inputs["solver"], objective_scales=_shared_inputs["objective_scales"])
+  optimizer.configure_solver(**_shared_inputs["solver_settings"])
+  optimizer.set_verbose(0)
+  optimizer.objective_average()
+  with contextlib.redirect_stdout(io.StringIO()):
+    optimization_ok = optimizer.optimize(max_seconds)
+  if not optimization_ok:
+    return False, False, None, {}
+  return True, optimizer.get_status() == OptimizationStatus.OPTIMAL.name, optimizer.get_objective_value(), optimizer.get_assignment()
+
+class ComponentDecomposition:
+
+  def __init__(self, optimizer: MistPlatformOptimizer):
+    self._optimizer = optimizer
+    self._objective_value = None
+
+  def components(self) -> "list[list[Union[str, tuple[str, str]]]]":
+    request_classes = self._optimizer.get_request_classes()
+    candidate_nodes = {k: self._optimizer.get_candidate_nodes(k) for k in request_classes}
+    node_classes = {}
+    for k in request_classes:
+      for n in candidate_nodes[k]:
+        node_classes.setdefault(n, []).append(k)
+    seen_classes, seen_nodes = set(), set()
+    components = []
+    for k in request_classes:
+      if k in seen_classes:
+        continue
+      seen_classes.add(k)
+      component, pending = [], [k]
+      while pending:
+        c = pending.pop()
+        component.append(c)
+        for n in candidate_nodes[c]:
+          if n not in seen_nodes:
+            seen_nodes.add(n)
+            for neighbour in node_classes[n]:
+              if neighbour not in seen_classes:
+                seen_classes.add(neighbour)
+                pending.append(neighbour)
+      components.append(component)
+    class_order = {k: ndx for ndx, k in enumerate(request_classes)}
+    return sorted([sorted(component, key=class_order.get) for component in components], key=len, reverse=True)
+
+  def _component_requests(self, component: "list[Union[str, tuple[str, str]]]") -> "dict[str, dict[str, str]]":
+    return {r: request for k in component for r, request in self._optimizer.get_class_requests(k).items()}
+
+  def optimize(self, max_workers: int = None, max_seconds: float = None) -> bool:
+    start = time.perf_counter()
+    if self._optimizer.get_objective() != MistPlatformOptimizer.AVERAGE_OBJ:
+      raise ValueError("Decomposition only supports the average objective")
+    components = self.components()
+    if len(components) <= 1:
+      optimization_ok = self._optimizer.optimize(max_seconds)
+      self._objective_value = self._optimizer.get_objective_value() if optimization_ok else None
+      return optimization_ok
+    if any(len(self._optimizer.get_candidate_nodes(k)) == 0 for component in components for k in component):
+      print('Infeasible model!')
+      self._optimizer.record_placement(self._optimizer.get_solver(), 'INFEASIBLE', time.perf_counter() - start, max_seconds=max_seconds)
+      return False
+    shared_inputs = (self._optimizer.get_inputs(), self._optimizer.get_objective_scales(), self._optimizer.get_solver_settings())
+    if max_workers == 1:
+      _init_worker(*shared_inputs)
+      results = [_solve_component(self._component_requests(component), max_seconds) for component in components]
+    else:
+      with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=shared_inputs) as executor:
+        futures = [executor.submit(_solve_component, self._component_requests(component), max_seconds) for component in components]
+        results = [future.result() for future in futures]
+    if not all(optimization_ok for optimization_ok, __, __, __ in results):
+      print('Infeasible model!')
+      self._optimizer.record_placement(self._optimizer.get_solver(), 'INFEASIBLE', time.perf_counter() - start, max_seconds=max_seconds)
+      return False
+    optimal = all(optimal for __, optimal, __, __ in results)
+    if optimal:
+      print('Optimal solution found!')
+    node_objective_const = sum(self._optimizer.get_node_objective_const(n) for n in self._optimizer.get_nodes())
+    self._objective_value = sum(objective_value for __, __, objective_value, __ in results) - (len(results) - 1)*node_objective_const
+    assignment = {}
+    for __, __, __, component_assignment in results:
+      assignment.update(component_assignment)
+    self._optimizer.accept_assignment(assignment)
+    self._optimizer.record_placement(self._optimizer.get_solver(), 'OPTIMAL' if optimal else 'FEASIBLE', time.perf_counter() - start, self._objective_value, max_seconds=max_seconds)
+    return True
+
+  def get_objective_value(self) -> "Union[float, None]":
+    return self._objective_value
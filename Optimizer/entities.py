@@ -0,0 +1,111 @@
+from typing import Union
+import numpy as np
+
+class RequestRecord:
+
+  __slots__ = ["node", "service"]
+
+  def __init__(self, node: int, service: int):
+    self.node = node
+    self.service = service
+
+class EntityStore:
+
+  RESOURCES = ["ram", "cpu", "storage"]
+
+  def __init__(self, nodes: "dict[str, dict[str, Union[str, int, float, dict[str, Union[int, float]]]]]", services: "dict[str, dict[str, Union[str, int, float, dict[str, Union[str, int, float]]]]]", requests: "dict[str, dict[str, str]]"):
+    self.node_ids = list(nodes)
+    self.node_index = {n: ndx for ndx, n in enumerate(self.node_ids)}
+    self.num_nodes = len(self.node_ids)
+    self.service_ids = list(services)
+    self.service_index = {s: ndx for ndx, s in enumerate(self.service_ids)}
+    self.owner_ids = sorted({nodes[n]["owner"] for n in nodes})
+    owner_index = {owner: ndx for ndx, owner in enumerate(self.owner_ids)}
+    self.node_owner = np.array([owner_index[nodes[n]["owner"]] for n in nodes], dtype=np.int32)
+    self.node_metadata = [nodes[n].get("metadata", {}) for n in nodes]
+    self.service_metadata = [services[s].get("metadata", {}) for s in services]
+    self.capacity = np.array([[nodes[n][resource] for resource in self.RESOURCES] for n in nodes], dtype=np.float64).reshape(len(nodes), len(self.RESOURCES))
+    self.demand = np.array([[services[s][resource] for resource in self.RESOURCES] for s in services], dtype=np.float64).reshape(len(services), len(self.RESOURCES))
+    self.distance = self._node_matrix(nodes, "location")
+    self.latency = self._node_matrix(nodes, "latency")
+    self._nodes = nodes
+    self._refresh_capacity()
+    self.requests = {}
+    for r, request in requests.items():
+      self.add_request(r, request)
+
+  def _node_matrix(self, nodes: "dict[str, dict[str, Union[str, int, float, dict[str, Union[int, float]]]]]", field: str) -> np.ndarray:
+    matrix = np.zeros((len(nodes), len(nodes)), dtype=np.float64)
+    for ndx, n in enumerate(nodes):
+      values = {other: value for other, value in nodes[n].get(field, {}).items() if other in self.node_index}
+      if len(values) > 0:
+        matrix[ndx, [self.node_index[other] for other in values]] = list(values.values())
+    return matrix
+
+  def _refresh_capacity(self):
+    self._capacities = self.capacity.tolist()
+    self._demands = self.demand.tolist()
+    with np.errstate(divide='ignore', invalid='ignore'):
+      usage_ratios = self.demand[np.newaxis, :, :]/self.capacity[:, np.newaxis, :]
+    self._usage_ratios = usage_ratios.tolist()
+    self._open_costs = usage_ratios.sum(axis=2).tolist()
+
+  def _intern_node(self, n: str) -> int:
+    if n not in self.node_index:
+      self.node_index[n] = len(self.node_ids)
+      self.node_ids.append(n)
+    return self.node_index[n]
+
+  def add_request(self, r: str, request: "dict[str, str]") -> RequestRecord:
+    self.requests[r] = RequestRecord(self._intern_node(request["node"]), self.service_index[request["service"]])
+    return self.requests[r]
+
+  def remove_request(self, r: str):
+    del self.requests[r]
+
+  def request_node(self, r: str) -> str:
+    return self.node_ids[self.requests[r].node]
+
+  def request_service(self, r: str) -> str:
+    return self.service_ids[self.requests[r].service]
+
+  def request_dict(self, r: str) -> "dict[str, str]":
+    return {"node": self.request_node(r), "service": self.request_service(r)}
+
+  def set_capacity(self, n: str, resource: str, capacity: float):
+    self.capacity[self.node_index[n], self.RESOURCES.index(resource)] = capacity
+    self._refresh_capacity()
+
+  def node_capacity(self, n: str, resource: str) -> float:
+    return self._capacities[self.node_index[n]][self.RESOURCES.index(resource)]
+
+  def service_demand(self, s: str, resource: str) -> float:
+    return self._demands[self.service_index[s]][self.RESOURCES.index(resource)]
+
+  def usage_ratio(self, n: str, s: str, resource: str) -> float:
+    return self._usage_ratios[self.node_index[n]][self.service_index[s]][self.RESOURCES.index(resource)]
+
+  def open_cost(self, n: str, s: str) -> float:
+    return self._open_costs[self.node_index[n]][self.service_index[s]]
+
+  def node_owner_id(self, n: str) -> str:
+    return self.owner_ids[self.node_owner[self.node_index[n]]]
+
+  def node_metadata_of(self, n: str) -> "dict[str, Union[str, int, float]]":
+    return self.node_metadata[self.node_index[n]]
+
+  def service_metadata_of(self, s: str) -> "dict[str, Union[str, int, float]]":
+    return self.service_metadata[self.service_index[s]]
+
+  def _pair_value(self, matrix: np.ndarray, n: str, requestor: str) -> float:
+    requestor_ndx = self.node_index.get(requestor, self.num_nodes)
+    return float(matrix[self.node_index[n], requestor_ndx]) if requestor_ndx < self.num_nodes else 0
+
+  def distance_between(self, n: str, requestor: str) -> float:
+    return self._pair_value(self.distance, n, requestor)
+
+  def latency_between(self, n: str, requestor: str) -> float:
+    return self._pair_value(self.latency, n, requestor)
+
+  def node_dicts(self) -> "dict[str, dict[str, Union[str, int, float, dict[str, Union[int, float]]]]]":
+    return {n: dict(self._nodes[n], **dict(zip(self.RESOURCES, self._capacities[ndx]))) for ndx, n in enumerate(self.node_ids[:self.num_nodes])}
@@ -0,0 +1,118 @@
+from typing import Union
+from optimizer import MistPlatformOptimizer
+import time
+
+class GreedyPlacementEngine:
+
+  TOLERANCE = 1e-9
+
+  def __init__(self, optimizer: MistPlatformOptimizer):
+    self._optimizer = optimizer
+    self._candidate_nodes = {k: optimizer.get_candidate_nodes(k) for k in optimizer.get_request_classes()}
+    self._classes = sorted(self._candidate_nodes, key=lambda k: (len(self._candidate_nodes[k]), -optimizer.get_class_size(k)))
+    self._sizes = {k: optimizer.get_class_size(k) for k in self._classes}
+    self._class_services = {k: optimizer.get_class_service(k) for k in self._classes}
+    self._unit_gains = {k: optimizer.get_placement_gains(k) for k in self._classes}
+    self._open_gains = {}
+    self._demands = {s: {resource: optimizer.get_service_demand(s, resource) for resource in optimizer.RESOURCES} for s in set(self._class_services.values())}
+    self._capacities = {n: {resource: optimizer.get_resource_capacity(n, resource) for resource in optimizer.RESOURCES} for n in optimizer.get_nodes()}
+    self._usage = {n: {resource: 0 for resource in optimizer.RESOURCES} for n in self._capacities}
+    self._group_sizes = {}
+    self._placement = {}
+    self._objective_value = None
+
+  def _open_gain(self, n: str, s: str) -> float:
+    if (n, s) not in self._open_gains:
+      self._open_gains[(n, s)] = self._optimizer.get_open_gain(n, s)
+    return self._open_gains[(n, s)]
+
+  def _fits(self, n: str, s: str) -> bool:
+    return all(self._capacities[n][resource] is None or self._usage[n][resource] + self._demands[s][resource] <= self._capacities[n][resource] + self.TOLERANCE for resource in self._usage[n])
+
+  def _insert_gain(self, k: "Union[str, tuple[str, str]]", n: str) -> "Union[float, None]":
+    s = self._class_services[k]
+    if self._group_sizes.get((n, s), 0) > 0:
+      return self._sizes[k]*self._unit_gains[k][n]
+    if not self._fits(n, s):
+      return None
+    return self._sizes[k]*self._unit_gains[k][n] + self._open_gain(n, s)
+
+  def _removal_gain(self, k: "Union[str, tuple[str, str]]") -> float:
+    n = self._placement[k]
+    s = self._class_services[k]
+    return -self._sizes[k]*self._unit_gains[k][n] - (self._open_gain(n, s) if self._group_sizes[(n, s)] == 1 else 0)
+
+  def _best_node(self, k: "Union[str, tuple[str, str]]", excluded: str = None) -> "tuple[Union[str, None], float]":
+    best_node, best_gain = None, None
+    for n in self._candidate_nodes[k]:
+      if n != excluded:
+        gain = self._insert_gain(k, n)
+        if gain is not None and (best_gain is None or gain > best_gain):
+          best_node, best_gain = n, gain
+    return best_node, best_gain
+
+  def _place(self, k: "Union[str, tuple[str, str]]", n: str):
+    s = self._class_services[k]
+    if self._group_sizes.get((n, s), 0) == 0:
+      for resource in self._usage[n]:
+        self._usage[n][resource] += self._demands[s][resource]
+    self._group_sizes[(n, s)] = self._group_sizes.get((n, s), 0) + 1
+    self._placement[k] = n
+
+  def _unplace(self, k: "Union[str, tuple[str, str]]"):
+    n = self._placement.pop(k)
+    s = self._class_services[k]
+    self._group_sizes[(n, s)] -= 1
+    if self._group_sizes[(n, s)] == 0:
+      for resource in self._usage[n]:
+        self._usage[n][resource] -= self._demands[s][resource]
+
+  def _greedy(self) -> bool:
+    for k in self._classes:
+      n, __ = self._best_node(k)
+      if n is None:
+        return False
+      self._place(k, n)
+    return True
+
+  def _local_search(self, deadline: float):
+    improved = True
+    while improved:
+      improved = False
+      for k in self._classes:
+        if time.perf_counter() > deadline:
+          return
+        current = self._placement[k]
+        removal_gain = self._removal_gain(k)
+        self._unplace(k)
+        n, gain = self._best_node(k, current)
+        if n is not None and removal_gain + gain > self.TOLERANCE:
+          self._place(k, n)
+          improved = True
+        else:
+          self._place(k, current)
+
+  def _score(self) -> float:
+    score = self._optimizer.get_average_objective_const()
+    score += sum(self._sizes[k]*self._unit_gains[k][self._placement[k]] for k in self._placement)
+    score += sum(self._open_gain(n, s) for n, s in self._group_sizes if self._group_sizes[(n, s)] > 0)
+    return score
+
+  def place(self, max_seconds: float = None) -> bool:
+    start = time.perf_counter()
+    deadline = start + (max_seconds if max_seconds is not None else float('inf'))
+    if not self._greedy():
+      print('No heuristic placement found!')
+      self._optimizer.record_placement('heuristic', 'NO_SOLUTION_FOUND', time.perf_counter() - start, max_seconds=max_seconds)
+      return False
+    self._local_search(deadline)
+    self._objective_value = self._score()
+    print('Heuristic placement found!')
+    self._optimizer.record_placement('heuristic', 'FEASIBLE', time.perf_counter() - start, self._objective_value, max_seconds=max_seconds)
+    return True
+
+  def get_objective_value(self) -> "Union[float, None]":
+    return self._objective_value
+
+  def get_assignment(self) -> "dict[Union[str, tuple[str, str]], dict[str, int]]":
+    return {k: {self._placement[k]: self._sizes[k]} for k in self._placement}
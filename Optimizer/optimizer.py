@@ -1,387 +1,1006 @@
 from typing import Union
 from mip.model import *
 from mip.constants import OptimizationStatus
+from entities import EntityStore
 import numpy as np
-import pandas as pd
+import time
 
 class MistPlatformOptimizer:
 
-  def __init__(self, nodes: "dict[str, dict[str, Union[str, int, float, dict[str, Union[int, float]]]]]", services: "dict[str, dict[str, Union[str, int, float, dict[str, Union[str, int, float]]]]]", requests: "dict[str, dict[str, str]]", resource_policies: "list[dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]]", service_policies: "list[dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]]"):
-      self._model = Model("MistPlatformOpt")
+  RESOURCES = ["ram", "cpu", "storage"]
+
+  AVERAGE_OBJ = 'avg'
+  MIN_MAX_OBJ = 'minmax'
+
+  CBC_SOLVER = 'cbc'
+  HIGHS_SOLVER = 'highs'
+
+  SOLVERS = {CBC_SOLVER: mip.CBC, HIGHS_SOLVER: mip.HIGHS}
+  EMPHASES = {'default': mip.SearchEmphasis.DEFAULT, 'feasibility': mip.SearchEmphasis.FEASIBILITY, 'optimality': mip.SearchEmphasis.OPTIMALITY}
+
+  def __init__(self, nodes: "dict[str, dict[str, Union[str, int, float, dict[str, Union[int, float]]]]]", services: "dict[str, dict[str, Union[str, int, float, dict[str, Union[str, int, float]]]]]", requests: "dict[str, dict[str, str]]", resource_policies: "list[dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]]", service_policies: "list[dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]]", aggregate_requests: bool = False, profile: bool = False, variable_names: bool = False, solver: str = CBC_SOLVER, objective_scales: "dict[str, dict[str, Union[int, float]]]" = None):
+      start = time.perf_counter()
+      self._model = Model("MistPlatformOpt", solver_name=self.SOLVERS[solver])
+      self._solver = solver
+      self._solver_settings = {}
+      self._solve_stats = None
+      self._profile = {"families": {"model": {"calls": 1, "time": time.perf_counter() - start, "columns": 0, "rows": 0, "nonzeros": 0}}, "solves": []} if profile else None
       self._nodes = nodes if nodes is not None else {}
-      for node_id in self._nodes:
-          self._nodes[node_id]["id"] = node_id
       self._services = services if services is not None else {}
-      for service_id in self._services:
-          self._services[service_id]["id"] = service_id
-      self._requests = requests if requests is not None else {}
-      for request_id in self._requests:
-        self._requests[request_id]["id"] = request_id
-      self._resource_policies = resource_policies if resource_policies is not None else []
-      for policy in resource_policies if resource_policies is not None else []:
-        if policy["user"] != self._nodes[policy["node"]]["owner"]:
-          self._resource_policies.remove(policy)
-      self._service_policies = service_policies if service_policies is not None else []
-      for policy in service_policies if service_policies is not None else []:
-        if policy["developer"] != self._services[policy["service"]]["developer"]:
-          self._service_policies.remove(policy)
-      self._z_vars = self._create_z_vars()
-      self._max_z_subvars = self._create_max_z_subvars()
+      self._store = EntityStore(self._nodes, self._services, requests if requests is not None else {})
+      self._requests = self._store.requests
+      self._variable_names = variable_names
+      self._resource_policies = [policy for policy in (resource_policies if resource_policies is not None else []) if self._owns_resource_policy(policy)]
+      self._service_policies = [policy for policy in (service_policies if service_policies is not None else []) if self._owns_service_policy(policy)]
+      self._aggregate_requests = aggregate_requests
+      self._create_indexes()
+      self._profiled("presolve", self._presolve)
+      self._objective_scales = objective_scales if objective_scales is not None else self._compute_objective_scales()
+      self._pair_terms_cache = {}
+      self._scores = None
+      self._indicator_vars = {}
+      self._objective_vars = []
+      self._objective_constrs = []
+      self._objective = None
+      self._z_vars = self._profiled("z_vars", self._create_z_vars)
+      self._max_z_subvars = self._profiled("max_z_subvars", self._create_max_z_subvars)
       self._create_constraints()
       self._objective_locked = False
       self._optimized = False
-
-  def _create_z_vars(self) -> "dict[str, dict[str, mip.Var]]":
-    return {r: {n: self._model.add_var(name=f'z_{r}_{n}', var_type=mip.BINARY) for n in self._nodes} for r in self._requests}
-
-  def _create_max_z_subvars(self) -> "dict[str, dict[str, mip.Var]]":
-    max_z_subvars = {n: {s: self._model.add_var(name=f'max_z_{n}_{s}', var_type=mip.BINARY) for s in self._services} for n in self._nodes}
-    for n in self._nodes:
-      for s in self._services:
-        n_var_collect = []
-        for r in self._z_vars:
-          if s == self._requests[r]["service"]:
-            n_var_collect.append(self._z_vars[r][n])
-        self._model.add_constr(max_z_subvars[n][s] <= xsum(n_var_collect), name=f'max_subvar_sum_{n}_{s}')
-        for ndx, var in enumerate(n_var_collect):
-          self._model.add_constr(max_z_subvars[n][s] >= var, name=f'max_subvar_{n}_{s}_{ndx}')
-    return max_z_subvars
-
-  def _create_constraints(self):
-    self._request_fulfillment_constraint()
-    self._ram_limit_constraint()
-    self._cpu_limit_constraint()
-    self._storage_limit_constraint()
-    self._allowed_developers_constraint()
-    self._allowed_requestors_constraint()
-    self._maximum_distance_constraint()
-    self._maximum_latency_constraint()
-    self._forced_metadata_resource_constraint()
-    self._upper_bound_metadata_resource_constraint()
-    self._lower_bound_metadata_resource_constraint()
-    self._forced_metadata_service_constraint()
-    self._upper_bound_metadata_service_constraint()
-    self._lower_bound_metadata_service_constraint()
-    self._allowed_owners_constraint()
-
-  def _request_fulfillment_constraint(self):
+      self._last_assignment = {}
+      self._relaxation_bound = None
+      self._relaxation_values = {}
+      self._dirty_classes = set()
+      self._dirty_nodes = set()
+      self._policies_changed = False
+
+  def _owns_resource_policy(self, policy: "dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]") -> bool:
+    return policy["user"] == self._nodes[policy["node"]]["owner"]
+
+  def _owns_service_policy(self, policy: "dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]") -> bool:
+    return policy["developer"] == self._services[policy["service"]]["developer"]
+
+  def _create_indexes(self):
+    self._service_request_counts = {s: 0 for s in self._services}
+    self._request_classes = {}
+    self._service_classes = {s: {} for s in self._services}
+    self._requestor_classes = {}
     for r in self._requests:
-      self._model.add_constr(xsum(self._z_vars[r][n] for n in self._nodes) == 1, name=f'request_fulfillment_{r}')
+      self._index_request(r)
+    self._create_policy_indexes()
+
+  def _request_class_key(self, r: str) -> "Union[str, tuple[str, str]]":
+    return (self._store.request_node(r), self._store.request_service(r)) if self._aggregate_requests else r
+
+  def _index_request(self, r: str) -> "Union[str, tuple[str, str]]":
+    k = self._request_class_key(r)
+    requestor, s = self._store.request_node(r), self._store.request_service(r)
+    self._service_request_counts[s] += 1
+    if k not in self._request_classes:
+      self._request_classes[k] = []
+      self._service_classes[s][k] = None
+      self._requestor_classes.setdefault(requestor, {})[k] = None
+    self._request_classes[k].append(r)
+    return k
+
+  def _unindex_request(self, r: str) -> "Union[str, tuple[str, str]]":
+    k = self._request_class_key(r)
+    requestor, s = self._store.request_node(r), self._store.request_service(r)
+    self._service_request_counts[s] -= 1
+    self._request_classes[k].remove(r)
+    if len(self._request_classes[k]) == 0:
+      del self._request_classes[k]
+      del self._service_classes[s][k]
+      del self._requestor_classes[requestor][k]
+      if len(self._requestor_classes[requestor]) == 0:
+        del self._requestor_classes[requestor]
+    return k
+
+  def _create_policy_indexes(self):
+    self._node_resource_policies = {n: [] for n in self._nodes}
+    self._resource_policies_by_type = {}
+    self._node_resource_policies_by_type = {n: {} for n in self._nodes}
+    for rp in self._resource_policies:
+      self._node_resource_policies[rp["node"]].append(rp)
+      for policy_type in rp:
+        self._resource_policies_by_type.setdefault(policy_type, []).append(rp)
+        self._node_resource_policies_by_type[rp["node"]].setdefault(policy_type, []).append(rp)
+    self._service_policies_by_type = {}
+    self._service_service_policies_by_type = {s: {} for s in self._services}
+    for sp in self._service_policies:
+      for policy_type in sp:
+        self._service_policies_by_type.setdefault(policy_type, []).append(sp)
+        self._service_service_policies_by_type[sp["service"]].setdefault(policy_type, []).append(sp)
+
+  def _class_requestor(self, k: "Union[str, tuple[str, str]]") -> str:
+    return self._store.request_node(self._request_classes[k][0])
+
+  def _class_service(self, k: "Union[str, tuple[str, str]]") -> str:
+    return self._store.request_service(self._request_classes[k][0])
+
+  def _class_size(self, k: "Union[str, tuple[str, str]]") -> int:
+    return len(self._request_classes[k])
+
+  def _class_name(self, k: "Union[str, tuple[str, str]]") -> str:
+    return k if isinstance(k, str) else f'{k[0]}-{k[1]}'
+
+  def _resource_policies_of_type(self, policy_type: str) -> "list[dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]]":
+    return self._resource_policies_by_type.get(policy_type, [])
+
+  def _service_policies_of_type(self, policy_type: str) -> "list[dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]]":
+    return self._service_policies_by_type.get(policy_type, [])
+
+  def _node_resource_policies_of_type(self, n: str, policy_type: str) -> "list[dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]]":
+    return self._node_resource_policies_by_type[n].get(policy_type, [])
+
+  def _service_service_policies_of_type(self, s: str, policy_type: str) -> "list[dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]]":
+    return self._service_service_policies_by_type[s].get(policy_type, [])
+
+  def _presolve(self):
+    self._compute_placement_masks()
+    self._candidate_nodes = {}
+    self._placed_class_services = {}
+    self._node_service_classes = {n: {} for n in self._nodes}
+    for k in self._request_classes:
+      self._place_class(k)
+
+  def _compute_placement_masks(self):
+    self._node_service_allowed = {n: {s: True for s in self._services} for n in self._nodes}
+    self._profiled("allowed_developers_presolve", self._allowed_developers_presolve)
+    self._profiled("forced_metadata_resource_presolve", self._forced_metadata_resource_presolve)
+    self._profiled("upper_bound_metadata_resource_presolve", self._upper_bound_metadata_resource_presolve)
+    self._profiled("lower_bound_metadata_resource_presolve", self._lower_bound_metadata_resource_presolve)
+    self._profiled("forced_metadata_service_presolve", self._forced_metadata_service_presolve)
+    self._profiled("upper_bound_metadata_service_presolve", self._upper_bound_metadata_service_presolve)
+    self._profiled("lower_bound_metadata_service_presolve", self._lower_bound_metadata_service_presolve)
+    self._profiled("allowed_owners_presolve", self._allowed_owners_presolve)
+    self._requestor_node_allowed = {}
+    self._compute_requestor_masks(list(self._requestor_classes))
+
+  def _compute_requestor_masks(self, requestors: "list[str]"):
+    for requestor in requestors:
+      self._requestor_node_allowed[requestor] = {n: True for n in self._nodes}
+    self._profiled("allowed_requestors_presolve", self._allowed_requestors_presolve, requestors)
+    self._profiled("maximum_distance_presolve", self._maximum_distance_presolve, requestors)
+    self._profiled("maximum_latency_presolve", self._maximum_latency_presolve, requestors)
+
+  def _place_class(self, k: "Union[str, tuple[str, str]]"):
+    s = self._class_service(k)
+    requestor_allowed = self._requestor_node_allowed[self._class_requestor(k)]
+    self._candidate_nodes[k] = [n for n in self._nodes if self._node_service_allowed[n][s] and requestor_allowed[n]]
+    self._placed_class_services[k] = s
+    for n in self._candidate_nodes[k]:
+      self._node_service_classes[n].setdefault(s, {})[k] = None
+
+  def _unplace_class(self, k: "Union[str, tuple[str, str]]") -> str:
+    s = self._placed_class_services.pop(k)
+    for n in self._candidate_nodes.pop(k):
+      del self._node_service_classes[n][s][k]
+    return s
+
+  def _allowed_developers_presolve(self):
+    for rp in self._resource_policies_of_type("allowed_developers"):
+      for s in self._services:
+        if self._services[s]["developer"] not in rp["allowed_developers"]:
+          self._node_service_allowed[rp["node"]][s] = False
+
+  def _allowed_requestors_presolve(self, requestors: "list[str]"):
+    for rp in self._resource_policies_of_type("allowed_users"):
+      for requestor in requestors:
+        if self._store.node_owner_id(requestor) not in rp["allowed_users"]:
+          self._requestor_node_allowed[requestor][rp["node"]] = False
+
+  def _maximum_distance_presolve(self, requestors: "list[str]"):
+    for rp in self._resource_policies_of_type("max_distance"):
+      for requestor in requestors:
+        if self._store.distance_between(rp["node"], requestor) > rp["max_distance"]:
+          self._requestor_node_allowed[requestor][rp["node"]] = False
+
+  def _maximum_latency_presolve(self, requestors: "list[str]"):
+    for rp in self._resource_policies_of_type("max_latency"):
+      for requestor in requestors:
+        if self._store.latency_between(rp["node"], requestor) > rp["max_latency"]:
+          self._requestor_node_allowed[requestor][rp["node"]] = False
+
+  def _forced_metadata_resource_presolve(self):
+    for rp in self._resource_policies_of_type("forced_metadata"):
+      for s in self._services:
+        if not all([rp["forced_metadata"][k] == self._store.service_metadata_of(s).get(k) for k in rp["forced_metadata"]]):
+          self._node_service_allowed[rp["node"]][s] = False
 
-  def _ram_limit_constraint(self):
-    for n in self._nodes:
-      consumed_ram = xsum(self._services[s]["ram"]*self._max_z_subvars[n][s] for s in self._services)
-      relevant_rp = list(filter(lambda rp: rp["node"] == n in rp, self._resource_policies))
-      if len(relevant_rp) > 0:
-        min_ram = min([rp.get("max_ram", 100) for rp in (relevant_rp if len(relevant_rp) > 0 else [{}])])/100
-        self._model.add_constr(consumed_ram <= min_ram*self._nodes[n]["ram"], name=f'ram_limit_{n}')
+  def _upper_bound_metadata_resource_presolve(self):
+    for rp in self._resource_policies_of_type("upper_bound_metadata"):
+      for s in self._services:
+        if not all([rp["upper_bound_metadata"][k] >= self._store.service_metadata_of(s).get(k) for k in rp["upper_bound_metadata"]]):
+          self._node_service_allowed[rp["node"]][s] = False
 
-  def _cpu_limit_constraint(self):
-    for n in self._nodes:
-      consumed_cpu = xsum(self._services[s]["cpu"]*self._max_z_subvars[n][s] for s in self._services)
-      relevant_rp = list(filter(lambda rp: rp["node"] == n in rp, self._resource_policies))
-      if len(relevant_rp) > 0:
-        min_cpu = min([rp.get("max_cpu", 100) for rp in (relevant_rp if len(relevant_rp) > 0 else [{}])])/100
-        self._model.add_constr(consumed_cpu <= min_cpu*self._nodes[n]["cpu"], name=f'cpu_limit_{n}')
+  def _lower_bound_metadata_resource_presolve(self):
+    for rp in self._resource_policies_of_type("lower_bound_metadata"):
+      for s in self._services:
+        if not all([rp["lower_bound_metadata"][k] <= self._store.service_metadata_of(s).get(k) for k in rp["lower_bound_metadata"]]):
+          self._node_service_allowed[rp["node"]][s] = False
+
+  def _forced_metadata_service_presolve(self):
+    for sp in self._service_policies_of_type("forced_metadata"):
+      for n in self._nodes:
+        if not all([sp["forced_metadata"][k] == self._store.node_metadata_of(n).get(k) for k in sp["forced_metadata"]]):
+          self._node_service_allowed[n][sp["service"]] = False
+
+  def _upper_bound_metadata_service_presolve(self):
+    for sp in self._service_policies_of_type("upper_bound_metadata"):
+      for n in self._nodes:
+        if not all([sp["upper_bound_metadata"][k] >= self._store.node_metadata_of(n).get(k) for k in sp["upper_bound_metadata"]]):
+          self._node_service_allowed[n][sp["service"]] = False
+
+  def _lower_bound_metadata_service_presolve(self):
+    for sp in self._service_policies_of_type("lower_bound_metadata"):
+      for n in self._nodes:
+        if not all([sp["lower_bound_metadata"][k] <= self._store.node_metadata_of(n).get(k) for k in sp["lower_bound_metadata"]]):
+          self._node_service_allowed[n][sp["service"]] = False
+
+  def _allowed_owners_presolve(self):
+    for sp in self._service_policies_of_type("allowed_owners"):
+      for n in self._nodes:
+        if self._store.node_owner_id(n) not in sp["allowed_owners"]:
+          self._node_service_allowed[n][sp["service"]] = False
+
+  def _z_var_name(self, k: "Union[str, tuple[str, str]]", n: str) -> str:
+    return f'z_{self._class_name(k)}_{n}'
+
+  def _max_z_var_name(self, n: str, s: str) -> str:
+    return f'max_z_{n}_{s}'
+
+  def _create_z_var(self, k: "Union[str, tuple[str, str]]", n: str, obj: float = 0, column: "mip.Column" = None) -> "mip.Var":
+    name = self._z_var_name(k, n) if self._variable_names else ''
+    if self._aggregate_requests:
+      return self._model.add_var(name=name, var_type=mip.INTEGER, ub=self._class_size(k), obj=obj, column=column)
+    return self._model.add_var(name=name, var_type=mip.BINARY, obj=obj, column=column)
+
+  def _create_z_vars(self) -> "dict[Union[str, tuple[str, str]], dict[str, mip.Var]]":
+    return {k: {n: self._create_z_var(k, n) for n in self._candidate_nodes[k]} for k in self._request_classes}
 
-  def _storage_limit_constraint(self):
+  def _create_max_z_subvars(self) -> "dict[str, dict[str, mip.Var]]":
+    self._max_z_constrs = {n: {} for n in self._nodes}
+    self._link_constrs = {k: {} for k in self._request_classes}
+    max_z_subvars = {n: {} for n in self._nodes}
     for n in self._nodes:
-      consumed_storage = xsum(self._services[s]["storage"]*self._max_z_subvars[n][s] for s in self._services)
-      relevant_rp = list(filter(lambda rp: rp["node"] == n in rp, self._resource_policies))
-      if len(relevant_rp) > 0:
-        min_storage = min([rp.get("max_storage", 100) for rp in (relevant_rp if len(relevant_rp) > 0 else [{}])])/100
-        self._model.add_constr(consumed_storage <= min_storage*self._nodes[n]["storage"], name=f'storage_limit_{n}')
-
-  def _allowed_developers_constraint(self):
-    for s in self._services:
-      idx = 0
-      for rp in self._resource_policies:
-        if "allowed_developers" in rp:
-          idx += 1
-          self._model.add_constr(self._max_z_subvars[rp["node"]][s] <= (1 if self._services["developer"] in rp["allowed_developers"] else 0), name=f'allowed_developers_{s}_{idx}')
+      for s in self._node_service_classes[n]:
+        self._create_max_z_subvar(max_z_subvars, n, s)
+    return max_z_subvars
 
-  def _allowed_requestors_constraint(self):
-    for r in self._requests:
-      idx = 0
-      for rp in self._resource_policies:
-        if "allowed_users" in rp:
-          idx += 1
-          self._model.add_constr(self._z_vars[r][rp["node"]] <= (1 if self._nodes[self._requests[r]["node"]]["owner"] in rp["allowed_users"] else 0), name=f'allowed_requestors_{r}_{idx}')
+  def _create_max_z_subvar(self, max_z_subvars: "dict[str, dict[str, mip.Var]]", n: str, s: str, obj: float = 0):
+    n_class_collect = self._node_service_classes[n][s]
+    max_z_subvars[n][s] = self._model.add_var(name=self._max_z_var_name(n, s) if self._variable_names else '', var_type=mip.BINARY, obj=obj)
+    self._max_z_constrs[n][s] = self._model.add_constr(max_z_subvars[n][s] <= xsum(self._z_vars[k][n] for k in n_class_collect), name=f'max_subvar_sum_{n}_{s}' if self._variable_names else '')
+    for k in n_class_collect:
+      self._create_link_constr(max_z_subvars, k, n, s)
 
-  def _maximum_distance_constraint(self):
-    for r in self._requests:
-      idx = 0
-      for rp in self._resource_policies:
-        if "max_distance" in rp:
-          idx += 1
-          self._model.add_constr(self._z_vars[r][rp["node"]]*self._nodes[rp["node"]]["location"].get(self._requests[r]["node"], 0) <= rp["max_distance"], name=f'max_distance_{r}_{idx}')
+  def _create_link_constr(self, max_z_subvars: "dict[str, dict[str, mip.Var]]", k: "Union[str, tuple[str, str]]", n: str, s: str):
+    self._link_constrs[k][n] = self._model.add_constr(self._class_size(k)*max_z_subvars[n][s] >= self._z_vars[k][n], name=f'max_subvar_{n}_{s}_{self._class_name(k)}' if self._variable_names else '')
 
-  def _maximum_latency_constraint(self):
-    for r in self._requests:
-      idx = 0
-      for rp in self._resource_policies:
-        if "max_latency" in rp:
-          idx += 1
-          self._model.add_constr(self._z_vars[r][rp["node"]]*self._nodes[rp["node"]]["latency"].get(self._requests[r]["node"], 0) <= rp["max_latency"], name=f'max_latency_{r}_{idx}')
-
-  def _forced_metadata_resource_constraint(self):
-    for s in self._services:
-      idx = 0
-      for rp in self._resource_policies:
-        if "forced_metadata" in rp:
-          idx += 1
-          meq = 1 if all([rp["forced_metadata"][k] == self._services[s]["metadata"].get(k) for k in rp["forced_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[rp["node"]][s] <= meq, name=f'forced_metadata_resource_{s}_{idx}')
-
-  def _upper_bound_metadata_resource_constraint(self):
-    for s in self._services:
-      idx = 0
-      for rp in self._resource_policies:
-        if "upper_bound_metadata" in rp:
-          idx += 1
-          mle = 1 if all([rp["upper_bound_metadata"][k] >= self._services[s]["metadata"].get(k) for k in rp["upper_bound_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[rp["node"]][s] <= mle, name=f'upper_bound_metadata_resource_{s}_{idx}')
-
-  def _lower_bound_metadata_resource_constraint(self):
+  def _create_constraints(self):
+    self._fulfillment_constrs = {}
+    self._limit_constrs = {n: [] for n in self._nodes}
+    self._profiled("request_fulfillment_constraint", self._request_fulfillment_constraint)
+    self._profiled("ram_limit_constraint", self._ram_limit_constraint)
+    self._profiled("cpu_limit_constraint", self._cpu_limit_constraint)
+    self._profiled("storage_limit_constraint", self._storage_limit_constraint)
+
+  def _resource_limit(self, resource: str, node_rps: "list[dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]]") -> float:
+    return min([rp.get(f'max_{resource}', 100) for rp in node_rps], default=100)/100
+
+  def _resource_capacity(self, n: str, resource: str) -> "Union[float, None]":
+    node_rps = self._node_resource_policies[n]
+    return self._resource_limit(resource, node_rps)*self._store.node_capacity(n, resource) if len(node_rps) > 0 else None
+
+  def _resource_limit_constraint(self, resource: str, nodes: "list[str]" = None):
+    for n in (nodes if nodes is not None else self._nodes):
+      capacity = self._resource_capacity(n, resource)
+      if capacity is not None and len(self._max_z_subvars[n]) > 0:
+        consumed = xsum(self._store.service_demand(s, resource)*self._max_z_subvars[n][s] for s in self._max_z_subvars[n])
+        self._limit_constrs[n].append(self._model.add_constr(consumed <= capacity, name=f'{resource}_limit_{n}' if self._variable_names else ''))
+
+  def _request_fulfillment_constraint(self, classes: "list[Union[str, tuple[str, str]]]" = None):
+    for k in (classes if classes is not None else self._request_classes):
+      self._fulfillment_constrs[k] = self._model.add_constr(xsum(self._z_vars[k].values()) == self._class_size(k), name=f'request_fulfillment_{self._class_name(k)}' if self._variable_names else '')
+
+  def _ram_limit_constraint(self, nodes: "list[str]" = None):
+    self._resource_limit_constraint("ram", nodes)
+
+  def _cpu_limit_constraint(self, nodes: "list[str]" = None):
+    self._resource_limit_constraint("cpu", nodes)
+
+  def _storage_limit_constraint(self, nodes: "list[str]" = None):
+    self._resource_limit_constraint("storage", nodes)
+
+  def _compute_objective_scales(self) -> "dict[str, dict[str, Union[int, float]]]":
+    scales = {"ub_resource": {}, "lb_resource": {}, "ub_service": {}, "lb_service": {}}
+    for rp in self._resource_policies_of_type("upper_bound_metadata"):
+      for k in rp["upper_bound_metadata"]:
+        scales["ub_resource"][k] = max(scales["ub_resource"].get(k, rp["upper_bound_metadata"][k]), rp["upper_bound_metadata"][k])
+    lb_keys = {k for rp in self._resource_policies_of_type("lower_bound_metadata") for k in rp["lower_bound_metadata"]}
     for s in self._services:
-      idx = 0
-      for rp in self._resource_policies:
-        if "lower_bound_metadata" in rp:
-          idx += 1
-          mge = 1 if all([rp["lower_bound_metadata"][k] <= self._services[s]["metadata"].get(k) for k in rp["lower_bound_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[rp["node"]][s] <= mge, name=f'lower_bound_metadata_resource_{s}_{idx}')
-
-  def _forced_metadata_service_constraint(self):
-    for n in self._nodes:
-      idx = 0
-      for sp in self._service_policies:
-        if "forced_metadata" in sp:
-          idx += 1
-          meq = 1 if all([sp["forced_metadata"][k] == self._nodes[n]["metadata"].get(k) for k in sp["forced_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[n][sp["service"]] <= meq, name=f'forced_metadata_service_{n}_{idx}')
-
-  def _upper_bound_metadata_service_constraint(self):
-    for n in self._nodes:
-      idx = 0
-      for sp in self._service_policies:
-        if "upper_bound_metadata" in sp:
-          idx += 1
-          mle = 1 if all([sp["upper_bound_metadata"][k] >= self._nodes[n]["metadata"].get(k) for k in sp["upper_bound_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[n][sp["service"]] <= mle, name=f'upper_bound_metadata_service_{n}_{idx}')
-
-  def _lower_bound_metadata_service_constraint(self):
-    for n in self._nodes:
-      idx = 0
-      for sp in self._service_policies:
-        if "lower_bound_metadata" in sp:
-          idx += 1
-          mge = 1 if all([sp["lower_bound_metadata"][k] <= self._nodes[n]["metadata"].get(k) for k in sp["lower_bound_metadata"]]) else 0
-          self._model.add_constr(self._max_z_subvars[n][sp["service"]] <= mge, name=f'lower_bound_metadataservice_{n}_{idx}')
-
-  def _allowed_owners_constraint(self):
+      if self._service_request_counts[s] > 0:
+        for k in lb_keys.intersection(self._store.service_metadata_of(s)):
+          scales["lb_resource"][k] = max(scales["lb_resource"].get(k, self._store.service_metadata_of(s)[k]), self._store.service_metadata_of(s)[k])
+    for sp in self._service_policies_of_type("upper_bound_metadata"):
+      for k in sp["upper_bound_metadata"]:
+        scales["ub_service"][k] = max(scales["ub_service"].get(k, sp["upper_bound_metadata"][k]), sp["upper_bound_metadata"][k])
+    lb_keys = {k for sp in self._service_policies_of_type("lower_bound_metadata") for k in sp["lower_bound_metadata"]}
+    for n in (self._nodes if len(lb_keys) > 0 else []):
+      for k in lb_keys.intersection(self._store.node_metadata_of(n)):
+        scales["lb_service"][k] = max(scales["lb_service"].get(k, self._store.node_metadata_of(n)[k]), self._store.node_metadata_of(n)[k])
+    return scales
+
+  def _cached_pair_terms(self, family: str, key: "tuple[str, str]", builder) -> "list[tuple[float, float]]":
+    if (family, key) not in self._pair_terms_cache:
+      self._pair_terms_cache[(family, key)] = builder(*key)
+    return self._pair_terms_cache[(family, key)]
+
+  def _upper_bound_resource_pair_terms(self, s: str, n: str) -> "list[tuple[float, float]]":
+    terms = []
+    for rp in self._node_resource_policies_of_type(n, "upper_bound_metadata"):
+      for k in rp["upper_bound_metadata"]:
+        if k in self._store.service_metadata_of(s):
+          dist_metric = np.interp((rp["upper_bound_metadata"][k] - self._store.service_metadata_of(s)[k]), [0, self._objective_scales["ub_resource"][k]], [0, 1])
+          terms.append((rp["upper_bound_metadata"][k], rp["upper_bound_metadata"][k] - dist_metric))
+    return terms
+
+  def _lower_bound_resource_pair_terms(self, s: str, n: str) -> "list[tuple[float, float]]":
+    terms = []
+    for rp in self._node_resource_policies_of_type(n, "lower_bound_metadata"):
+      for k in rp["lower_bound_metadata"]:
+        if k in self._store.service_metadata_of(s) and k in self._objective_scales["lb_resource"]:
+          dist_metric = np.interp((self._store.service_metadata_of(s)[k] - rp["lower_bound_metadata"][k]), [0, self._objective_scales["lb_resource"][k]], [0, 1])
+          terms.append((self._store.service_metadata_of(s)[k], self._store.service_metadata_of(s)[k] - dist_metric))
+    return terms
+
+  def _upper_bound_service_pair_terms(self, s: str, n: str) -> "list[tuple[float, float]]":
+    terms = []
+    for sp in self._service_service_policies_of_type(s, "upper_bound_metadata"):
+      for k in sp["upper_bound_metadata"]:
+        if k in self._store.node_metadata_of(n):
+          dist_metric = np.interp((sp["upper_bound_metadata"][k] - self._store.node_metadata_of(n)[k]), [0, self._objective_scales["ub_service"][k]], [0, 1])
+          terms.append((sp["upper_bound_metadata"][k], sp["upper_bound_metadata"][k] - dist_metric))
+    return terms
+
+  def _lower_bound_service_pair_terms(self, s: str, n: str) -> "list[tuple[float, float]]":
+    terms = []
+    for sp in self._service_service_policies_of_type(s, "lower_bound_metadata"):
+      for k in sp["lower_bound_metadata"]:
+        if k in self._store.node_metadata_of(n) and k in self._objective_scales["lb_service"]:
+          dist_metric = np.interp((self._store.node_metadata_of(n)[k] - sp["lower_bound_metadata"][k]), [0, self._objective_scales["lb_service"][k]], [0, 1])
+          terms.append((self._store.node_metadata_of(n)[k], self._store.node_metadata_of(n)[k] - dist_metric))
+    return terms
+
+  def _distance_pair_terms(self, requestor: str, n: str) -> "list[tuple[float, float]]":
+    distance = self._store.distance_between(n, requestor)
+    return [(1, distance/rp["max_distance"]) for rp in self._node_resource_policies_of_type(n, "max_distance")]
+
+  def _latency_pair_terms(self, requestor: str, n: str) -> "list[tuple[float, float]]":
+    latency = self._store.latency_between(n, requestor)
+    return [(1, latency/rp["max_latency"]) for rp in self._node_resource_policies_of_type(n, "max_latency")]
+
+  def _service_node_terms(self, family: str, builder, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return [(const, coef, k, n) for k in (classes if classes is not None else self._request_classes) for n in self._candidate_nodes[k] for const, coef in self._cached_pair_terms(family, (self._class_service(k), n), builder)]
+
+  def _requestor_node_terms(self, family: str, builder, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return [(const, coef, k, n) for k in (classes if classes is not None else self._request_classes) for n in self._candidate_nodes[k] for const, coef in self._cached_pair_terms(family, (self._class_requestor(k), n), builder)]
+
+  def _upper_bound_distances_resource(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._service_node_terms("ub_resource", self._upper_bound_resource_pair_terms, classes)
+
+  def _lower_bound_distances_resource(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._service_node_terms("lb_resource", self._lower_bound_resource_pair_terms, classes)
+
+  def _upper_bound_distances_service(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._service_node_terms("ub_service", self._upper_bound_service_pair_terms, classes)
+
+  def _lower_bound_distances_service(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._service_node_terms("lb_service", self._lower_bound_service_pair_terms, classes)
+
+  def _distance_distances(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._requestor_node_terms("distance", self._distance_pair_terms, classes)
+
+  def _distance_latencies(self, classes: "list[Union[str, tuple[str, str]]]" = None) -> "list[tuple[float, float, Union[str, tuple[str, str]], str]]":
+    return self._requestor_node_terms("latency", self._latency_pair_terms, classes)
+
+  def _metadata_column(self, metadata: "list[dict[str, Union[str, int, float]]]", k: str) -> "tuple[np.ndarray, np.ndarray]":
+    indexes = [ndx for ndx, entity_metadata in enumerate(metadata) if k in entity_metadata]
+    return np.array(indexes, dtype=np.intp), np.array([metadata[ndx][k] for ndx in indexes], dtype=np.float64)
+
+  def _empty_scores(self, num_rows: int) -> "tuple[np.ndarray, np.ndarray]":
+    return np.zeros((num_rows, self._store.num_nodes)), np.zeros((num_rows, self._store.num_nodes))
+
+  def _upper_bound_resource_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    for rp in self._resource_policies_of_type("upper_bound_metadata"):
+      n = self._store.node_index[rp["node"]]
+      for k in rp["upper_bound_metadata"]:
+        services, values = self._metadata_column(self._store.service_metadata, k)
+        bound = rp["upper_bound_metadata"][k]
+        consts[services, n] += bound
+        coefs[services, n] += bound - np.interp(bound - values, [0, self._objective_scales["ub_resource"][k]], [0, 1])
+
+  def _lower_bound_resource_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    for rp in self._resource_policies_of_type("lower_bound_metadata"):
+      n = self._store.node_index[rp["node"]]
+      for k in rp["lower_bound_metadata"]:
+        if k in self._objective_scales["lb_resource"]:
+          services, values = self._metadata_column(self._store.service_metadata, k)
+          consts[services, n] += values
+          coefs[services, n] += values - np.interp(values - rp["lower_bound_metadata"][k], [0, self._objective_scales["lb_resource"][k]], [0, 1])
+
+  def _upper_bound_service_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    for sp in self._service_policies_of_type("upper_bound_metadata"):
+      s = self._store.service_index[sp["service"]]
+      for k in sp["upper_bound_metadata"]:
+        nodes, values = self._metadata_column(self._store.node_metadata, k)
+        bound = sp["upper_bound_metadata"][k]
+        consts[s, nodes] += bound
+        coefs[s, nodes] += bound - np.interp(bound - values, [0, self._objective_scales["ub_service"][k]], [0, 1])
+
+  def _lower_bound_service_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    for sp in self._service_policies_of_type("lower_bound_metadata"):
+      s = self._store.service_index[sp["service"]]
+      for k in sp["lower_bound_metadata"]:
+        if k in self._objective_scales["lb_service"]:
+          nodes, values = self._metadata_column(self._store.node_metadata, k)
+          consts[s, nodes] += values
+          coefs[s, nodes] += values - np.interp(values - sp["lower_bound_metadata"][k], [0, self._objective_scales["lb_service"][k]], [0, 1])
+
+  def _requestor_scores(self, consts: np.ndarray, coefs: np.ndarray, policy_type: str, matrix: np.ndarray):
+    for rp in self._resource_policies_of_type(policy_type):
+      n = self._store.node_index[rp["node"]]
+      consts[:, n] += 1
+      coefs[:self._store.num_nodes, n] += matrix[n]/rp[policy_type]
+
+  def _distance_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    self._requestor_scores(consts, coefs, "max_distance", self._store.distance)
+
+  def _latency_scores(self, consts: np.ndarray, coefs: np.ndarray):
+    self._requestor_scores(consts, coefs, "max_latency", self._store.latency)
+
+  def _compute_scores(self) -> "dict[str, list[list[float]]]":
+    service_consts, service_coefs = self._empty_scores(len(self._store.service_ids))
+    self._profiled("ub_resource_objective", self._upper_bound_resource_scores, service_consts, service_coefs)
+    self._profiled("lb_resource_objective", self._lower_bound_resource_scores, service_consts, service_coefs)
+    self._profiled("ub_service_objective", self._upper_bound_service_scores, service_consts, service_coefs)
+    self._profiled("lb_service_objective", self._lower_bound_service_scores, service_consts, service_coefs)
+    requestor_consts, requestor_coefs = self._empty_scores(self._store.num_nodes + 1)
+    self._profiled("distance_objective", self._distance_scores, requestor_consts, requestor_coefs)
+    self._profiled("latency_objective", self._latency_scores, requestor_consts, requestor_coefs)
+    return {"service_consts": service_consts.tolist(), "service_coefs": service_coefs.tolist(), "requestor_consts": requestor_consts.tolist(), "requestor_coefs": requestor_coefs.tolist()}
+
+  def _score_rows(self, k: "Union[str, tuple[str, str]]") -> "tuple[list[float], list[float], list[float], list[float]]":
+    if self._scores is None:
+      self._scores = self._compute_scores()
+    s = self._store.service_index[self._class_service(k)]
+    requestor = min(self._store.node_index[self._class_requestor(k)], self._store.num_nodes)
+    return self._scores["service_consts"][s], self._scores["service_coefs"][s], self._scores["requestor_consts"][requestor], self._scores["requestor_coefs"][requestor]
+
+  def _resource_availables(self, resource: str) -> "list[mip.LinExpr]":
+    availables = []
     for n in self._nodes:
-      idx = 0
-      for sp in self._service_policies:
-        if "allowed_owners" in sp:
-          idx += 1
-          self._model.add_constr(self._max_z_subvars[n][sp["service"]] <= (1 if self._nodes["owner"] in sp["allowed_owners"] else 0), name=f'allowed_owners_{n}_{idx}')
-
-  def _upper_bound_distances_resource(self) -> "list[mip.LinExpr]":
-    ub_distances_list = []
-    for rp in self._resource_policies:
-      if "upper_bound_metadata" in rp:
-        for k in rp["upper_bound_metadata"]:
-          relevant_rps = list(filter(lambda x: k in x["upper_bound_metadata"], self._resource_policies))
-          if len(relevant_rps) > 0:
-            max_ub = max([rp_ub["upper_bound_metadata"][k] for rp_ub in relevant_rps])
-            for r in self._requests:
-              if k in self._services[self._requests[r]["service"]]["metadata"]:
-                dist_metric = np.interp((rp["upper_bound_metadata"][k] - self._services[self._requests[r]["service"]]["metadata"][k]), [0, max_ub], [0, 1])
-                linexpr = rp["upper_bound_metadata"][k] - ((rp["upper_bound_metadata"][k] - dist_metric)*self._z_vars[r][rp["node"]])
-                ub_distances_list.append(linexpr)
-    return ub_distances_list
-
-  def _lower_bound_distances_resource(self) -> "list[mip.LinExpr]":
-    lb_distances_list = []
-    for rp in self._resource_policies:
-      if "lower_bound_metadata" in rp:
-        for k in rp["lower_bound_metadata"]:
-          relevant_rps = list(filter(lambda x: k in self._requests[x]["metadata"], self._requests))
-          if len(relevant_rps) > 0:
-            max_meta = max([self._requests[r_lb]["metadata"][k] for r_lb in relevant_rps])
-            for r in self._requests:
-              if k in self._services[self._requests[r]["service"]]["metadata"]:
-                dist_metric = np.interp((self._services[self._requests[r]["service"]]["metadata"][k] - rp["lower_bound_metadata"][k]), [0, max_meta], [0, 1])
-                linexpr = self._services[self._requests[r]["service"]]["metadata"][k] - ((self._services[self._requests[r]["service"]]["metadata"][k] - dist_metric)*self._z_vars[r][rp["node"]])
-                lb_distances_list.append(linexpr)
-    return lb_distances_list
-
-  def _upper_bound_distances_service(self) -> "list[mip.LinExpr]":
-    ub_distances_list = []
-    for sp in self._service_policies:
-      if "upper_bound_metadata" in sp:
-        for k in sp["upper_bound_metadata"]:
-          relevant_sps = list(filter(lambda x: k in x["upper_bound_metadata"], self._service_policies))
-          if len(relevant_sps) > 0:
-            max_ub = max([sp_ub["upper_bound_metadata"][k] for sp_ub in relevant_sps])
-            for r in self._requests:
-              if self._requests[r]["service"] == sp["service"]:
-                for n in self._nodes:
-                  if k in self._nodes[n]["metadata"]:
-                    dist_metric = np.interp((sp["upper_bound_metadata"][k] - self._nodes[n]["metadata"][k]), [0, max_ub], [0, 1])
-                    linexpr = sp["upper_bound_metadata"][k] - ((sp["upper_bound_metadata"][k] - dist_metric)*self._z_vars[r][n])
-                    ub_distances_list.append(linexpr)
-    return ub_distances_list
-
-  def _lower_bound_distances_service(self) -> "list[mip.LinExpr]":
-    lb_distances_list = []
-    for sp in self._service_policies:
-      if "lower_bound_metadata" in sp:
-        for k in sp["lower_bound_metadata"]:
-          relevant_sps = list(filter(lambda x: k in self._nodes[x]["metadata"], self._nodes))
-          if len(relevant_sps) > 0:
-            max_lb = max([self._nodes[n_lb]["metadata"][k] for n_lb in relevant_sps])
-            for r in self._requests:
-              if self._requests[r]["service"] == sp["service"]:
-                for n in self._nodes:
-                  if k in self._nodes[n]["metadata"]:
-                    dist_metric = np.interp((self._nodes[n]["metadata"][k] - sp["lower_bound_metadata"][k]), [0, max_lb], [0, 1])
-                    linexpr = self._nodes[n]["metadata"][k] - ((self._nodes[n]["metadata"][k] - dist_metric)*self._z_vars[r][n])
-                    lb_distances_list.append(linexpr)
-    return lb_distances_list
-
-  def _distance_distances(self) -> "list[mip.LinExpr]":
-    distances = []
-    for rp in self._resource_policies:
-      if "max_distance" in rp:
-        for r in self._requests:
-          distances.append((rp["max_distance"] - self._z_vars[r][rp["node"]]*self._nodes[rp["node"]]["location"].get(self._requests[r]["node"], 0))/rp["max_distance"])
-    return distances
-
-  def _distance_latencies(self) -> "list[mip.LinExpr]":
-    latencies = []
-    for rp in self._resource_policies:
-      if "max_latency" in rp:
-        for r in self._requests:
-          latencies.append((rp["max_latency"] - self._z_vars[r][rp["node"]]*self._nodes[rp["node"]]["latency"].get(self._requests[r]["node"], 0))/rp["max_latency"])
-    return latencies
+      min_term = self._resource_limit(resource, self._node_resource_policies[n])/self._store.node_capacity(n, resource)
+      service_usage = xsum(self._store.usage_ratio(n, s, resource)*self._max_z_subvars[n][s] for s in self._max_z_subvars[n])
+      availables.append(min_term-service_usage)
+    return availables
 
   def _ram_availables(self) -> "list[mip.LinExpr]":
-    rams = []
-    for n in self._nodes:
-      node_rps = list(filter(lambda x: x["node"] == n, self._resource_policies))
-      if len(node_rps) > 0:
-        min_ram = min([rp.get("max_ram", 100) for rp in node_rps])
-      else:
-        min_ram = 100
-      min_ram = min_ram/100
-      min_ram_term = min_ram/self._nodes[n]["ram"]
-      service_ram = xsum((self._services[s]["ram"]/self._nodes[n]["ram"])*self._max_z_subvars[n][s] for s in self._services)
-      rams.append(min_ram_term-service_ram)
-    return rams
+    return self._resource_availables("ram")
 
   def _cpu_availables(self) -> "list[mip.LinExpr]":
-    cpus = []
-    for n in self._nodes:
-      node_rps = list(filter(lambda x: x["node"] == n, self._resource_policies))
-      if len(node_rps) > 0:
-        min_cpu = min([rp.get("max_cpu", 100) for rp in node_rps])
-      else:
-        min_cpu = 100
-      min_cpu = min_cpu/100
-      min_cpu_term = min_cpu/self._nodes[n]["cpu"]
-      service_cpu = xsum((self._services[s]["cpu"]/self._nodes[n]["cpu"])*self._max_z_subvars[n][s] for s in self._services)
-      cpus.append(min_cpu_term-service_cpu)
-    return cpus
+    return self._resource_availables("cpu")
 
   def _storage_availables(self) -> "list[mip.LinExpr]":
-    storages = []
-    for n in self._nodes:
-      node_rps = list(filter(lambda x: x["node"] == n, self._resource_policies))
-      if len(node_rps) > 0:
-        min_storage = min([rp.get("max_storage", 100) for rp in node_rps])
+    return self._resource_availables("storage")
+
+  def _node_objective_const(self, n: str) -> float:
+    return sum(self._resource_limit(resource, self._node_resource_policies[n])/self._store.node_capacity(n, resource) for resource in self.RESOURCES)
+
+  def _average_objective_const(self) -> float:
+    return sum(self._class_objective(k)[0] for k in self._request_classes) + sum(self._node_objective_const(n) for n in self._nodes)
+
+  def _max_z_objective_coef(self, n: str, s: str) -> float:
+    return -self._store.open_cost(n, s)
+
+  def _indicator_var(self, k: "Union[str, tuple[str, str]]", n: str, any_placed: bool) -> "mip.Var":
+    if self._class_size(k) == 1:
+      return self._z_vars[k][n]
+    if (k, n, any_placed) not in self._indicator_vars:
+      indicator = self._model.add_var(name=f'{"any" if any_placed else "all"}_z_{self._class_name(k)}_{n}' if self._variable_names else '', var_type=mip.BINARY)
+      if any_placed:
+        self._objective_constrs.append(self._model.add_constr(self._class_size(k)*indicator >= self._z_vars[k][n], name=f'any_z_{self._class_name(k)}_{n}' if self._variable_names else ''))
       else:
-        min_storage = 100
-      min_storage = min_storage/100
-      min_storage_term = min_storage/self._nodes[n]["storage"]
-      service_storage = xsum((self._services[s]["storage"]/self._nodes[n]["storage"])*self._max_z_subvars[n][s] for s in self._services)
-      storages.append(min_storage_term-service_storage)
-    return storages
+        self._objective_constrs.append(self._model.add_constr(self._class_size(k)*indicator <= self._z_vars[k][n], name=f'all_z_{self._class_name(k)}_{n}' if self._variable_names else ''))
+      self._indicator_vars[(k, n, any_placed)] = indicator
+    return self._indicator_vars[(k, n, any_placed)]
+
+  def _min_terms(self, terms: "list[tuple[float, float, Union[str, tuple[str, str]], str]]") -> "list[mip.LinExpr]":
+    return [const - coef*self._indicator_var(k, n, coef >= 0) for const, coef, k, n in terms]
+
+  def _class_objective(self, k: "Union[str, tuple[str, str]]") -> "tuple[float, dict[str, float]]":
+    service_consts, service_coefs, requestor_consts, requestor_coefs = self._score_rows(k)
+    node_index = self._store.node_index
+    const = 0
+    coefs = {}
+    for n in self._candidate_nodes[k]:
+      ndx = node_index[n]
+      const += service_consts[ndx] + requestor_consts[ndx]
+      coefs[n] = -(service_coefs[ndx] + requestor_coefs[ndx])
+    return self._class_size(k)*const, coefs
 
   def objective_average(self):
     if not self._objective_locked:
       self._objective_locked = True
-      obj = self._upper_bound_distances_resource() + self._lower_bound_distances_resource() + self._upper_bound_distances_service() + self._lower_bound_distances_service() + self._distance_distances() + self._distance_latencies() + self._ram_availables() + self._cpu_availables() + self._storage_availables()
-      self._model.objective=maximize(xsum(obj))
+      self._objective = self.AVERAGE_OBJ
+      self._set_objective_average()
+
+  def _average_objective(self) -> "mip.LinExpr":
+    variables, coefs = [], []
+    const = sum(self._node_objective_const(n) for n in self._nodes)
+    for k in self._request_classes:
+      class_const, class_coefs = self._class_objective(k)
+      const += class_const
+      for n in class_coefs:
+        if class_coefs[n] != 0:
+          variables.append(self._z_vars[k][n])
+          coefs.append(class_coefs[n])
+    for n in self._max_z_subvars:
+      for s in self._max_z_subvars[n]:
+        variables.append(self._max_z_subvars[n][s])
+        coefs.append(self._max_z_objective_coef(n, s))
+    return mip.LinExpr(variables, coefs, const)
+
+  def _set_objective_average(self):
+    obj = self._profiled("placement_objective", self._average_objective)
+    self._profiled("objective", self._set_objective, obj)
+
+  def _set_objective(self, obj: "mip.LinExpr"):
+    self._model.objective = maximize(obj)
 
   def objective_min_max(self):
     if not self._objective_locked:
       self._objective_locked = True
-      ub_rp_var = self._model.add_var(name="ub_rp")
-      for idx, ub_rp in enumerate(self._upper_bound_distances_resource()):
-        self._model.add_constr(ub_rp_var <= ub_rp, name=f'ub_rp_{idx}')
-      lb_rp_var = self._model.add_var(name="lb_rp")
-      for idx, lb_rp in enumerate(self._lower_bound_distances_resource()):
-        self._model.add_constr(lb_rp_var <= lb_rp, name=f'lb_rp_{idx}')
-      ub_sp_var = self._model.add_var(name="ub_sp")
-      for idx, ub_sp in enumerate(self._upper_bound_distances_resource()):
-        self._model.add_constr(ub_sp_var <= ub_sp, name=f'ub_sp_{idx}')
-      lb_sp_var = self._model.add_var(name="lb_sp")
-      for idx, lb_sp in enumerate(self._lower_bound_distances_resource()):
-        self._model.add_constr(lb_sp_var <= lb_sp, name=f'lb_sp_{idx}')
-      dist_var = self._model.add_var(name="dist")
-      for idx, dist in enumerate(self._distance_distances()):
-        self._model.add_constr(dist_var <= dist, name=f'dist_{idx}')
-      lat_var = self._model.add_var(name="lat")
-      for idx, lat in enumerate(self._distance_latencies()):
-        self._model.add_constr(lat_var <= lat, name=f'lat_{idx}')
-      ram_var = self._model.add_var(name='ram')
-      for idx, ram in enumerate(self._ram_availables()):
-        self._model.add_constr(ram_var <= ram, name=f'ram_{idx}')
-      cpu_var = self._model.add_var(name='cpu')
-      for idx, cpu in enumerate(self._cpu_availables()):
-        self._model.add_constr(cpu_var <= cpu, name=f'cpu_{idx}')
-      storage_var = self._model.add_var(name='storage')
-      for idx, storage in enumerate(self._storage_availables()):
-        self._model.add_constr(storage_var <= storage, name=f'storage_{idx}')
-      self._model.objective=maximize(ub_rp_var+lb_rp_var+ub_sp_var+lb_sp_var+dist_var+lat_var+ram_var+cpu_var+storage_var)
-
-  def optimize(self) -> bool:
+      self._objective = self.MIN_MAX_OBJ
+      self._set_objective_min_max()
+
+  def _add_objective_var(self, name: str) -> "mip.Var":
+    var = self._model.add_var(name=name if self._variable_names else '')
+    self._objective_vars.append(var)
+    return var
+
+  def _add_objective_constr(self, lin_expr: "mip.LinExpr", name: str):
+    self._objective_constrs.append(self._model.add_constr(lin_expr, name=name if self._variable_names else ''))
+
+  def _min_max_component(self, name: str, terms_builder) -> "mip.Var":
+    component_var = self._add_objective_var(name)
+    for idx, term in enumerate(terms_builder()):
+      self._add_objective_constr(component_var <= term, name=f'{name}_{idx}')
+    return component_var
+
+  def _set_objective_min_max(self):
+    components = [
+      ("ub_rp", lambda: self._min_terms(self._upper_bound_distances_resource())),
+      ("lb_rp", lambda: self._min_terms(self._lower_bound_distances_resource())),
+      ("ub_sp", lambda: self._min_terms(self._upper_bound_distances_service())),
+      ("lb_sp", lambda: self._min_terms(self._lower_bound_distances_service())),
+      ("dist", lambda: self._min_terms(self._distance_distances())),
+      ("lat", lambda: self._min_terms(self._distance_latencies())),
+      ("ram", self._ram_availables),
+      ("cpu", self._cpu_availables),
+      ("storage", self._storage_availables)
+    ]
+    component_vars = [self._profiled(f'{name}_objective', self._min_max_component, name, terms_builder) for name, terms_builder in components]
+    self._profiled("objective", self._set_objective, xsum(component_vars))
+
+  def add_requests(self, requests: "dict[str, dict[str, str]]"):
+    new_requestors = []
+    for request_id in requests:
+      if request_id in self._requests:
+        raise ValueError(f'Request {request_id} already exists')
+      self._store.add_request(request_id, requests[request_id])
+      if requests[request_id]["node"] not in self._requestor_classes:
+        new_requestors.append(requests[request_id]["node"])
+      self._dirty_classes.add(self._index_request(request_id))
+    self._compute_requestor_masks(new_requestors)
+
+  def remove_requests(self, request_ids: "list[str]"):
+    for request_id in request_ids:
+      self._dirty_classes.add(self._unindex_request(request_id))
+      self._store.remove_request(request_id)
+
+  def update_node_capacity(self, node: str, ram: float = None, cpu: float = None, storage: float = None):
+    for resource, capacity in zip(self.RESOURCES, [ram, cpu, storage]):
+      if capacity is not None:
+        self._store.set_capacity(node, resource, capacity)
+    self._dirty_nodes.add(node)
+
+  def add_resource_policy(self, policy: "dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]"):
+    if self._owns_resource_policy(policy):
+      self._resource_policies.append(policy)
+      self._dirty_nodes.add(policy["node"])
+      self._policies_changed = True
+
+  def remove_resource_policy(self, policy: "dict[str, Union[str, int, float, list[str], dict[str, Union[int, float, str]]]]"):
+    self._resource_policies.remove(policy)
+    self._dirty_nodes.add(policy["node"])
+    self._policies_changed = True
+
+  def add_service_policy(self, policy: "dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]"):
+    if self._owns_service_policy(policy):
+      self._service_policies.append(policy)
+      self._policies_changed = True
+
+  def remove_service_policy(self, policy: "dict[str, Union[str, list[str], dict[str, Union[int, float, str]]]]"):
+    self._service_policies.remove(policy)
+    self._policies_changed = True
+
+  def _apply_changes(self):
+    if self._policies_changed:
+      old_node_service_allowed = self._node_service_allowed
+      old_requestor_node_allowed = self._requestor_node_allowed
+      self._create_policy_indexes()
+      self._compute_placement_masks()
+      for n in self._nodes:
+        for s in self._services:
+          if old_node_service_allowed[n][s] != self._node_service_allowed[n][s]:
+            self._dirty_classes.update(self._service_classes[s])
+      for requestor in self._requestor_node_allowed:
+        if old_requestor_node_allowed.get(requestor) != self._requestor_node_allowed[requestor]:
+          self._dirty_classes.update(self._requestor_classes.get(requestor, {}))
+    removed = []
+    touched_groups = set()
+    for k in self._dirty_classes:
+      if k in self._z_vars:
+        removed.extend(self._z_vars[k].values())
+        removed.extend(self._link_constrs.pop(k).values())
+        removed.append(self._fulfillment_constrs.pop(k))
+        s = self._unplace_class(k)
+        touched_groups.update((n, s) for n in self._z_vars.pop(k))
+    limit_nodes = set(self._dirty_nodes)
+    for n, s in touched_groups:
+      if len(self._node_service_classes[n].get(s, {})) == 0 and s in self._max_z_subvars[n]:
+        removed.append(self._max_z_subvars[n].pop(s))
+        removed.append(self._max_z_constrs[n].pop(s))
+        self._node_service_classes[n].pop(s, None)
+        limit_nodes.add(n)
+    if self._objective == self.MIN_MAX_OBJ or self._policies_changed:
+      removed.extend(self._objective_vars + self._objective_constrs + list(self._indicator_vars.values()))
+      self._objective_vars, self._objective_constrs, self._indicator_vars = [], [], {}
+    for n in limit_nodes:
+      removed.extend(self._limit_constrs[n])
+      self._limit_constrs[n] = []
+    if len(removed) > 0:
+      self._model.remove(removed)
+    new_scales = self._compute_objective_scales()
+    rebuild_objective = self._objective == self.MIN_MAX_OBJ or self._policies_changed or new_scales != self._objective_scales
+    if self._policies_changed or new_scales != self._objective_scales:
+      self._objective_scales = new_scales
+      self._pair_terms_cache = {}
+      self._scores = None
+    incremental_objective = self._objective == self.AVERAGE_OBJ and not rebuild_objective
+    added_classes = [k for k in self._dirty_classes if k in self._request_classes]
+    new_groups = []
+    for k in added_classes:
+      self._place_class(k)
+      self._z_vars[k] = {}
+      self._link_constrs[k] = {}
+      __, obj_coefs = self._class_objective(k) if incremental_objective else (0, {})
+      s = self._class_service(k)
+      for n in self._candidate_nodes[k]:
+        if s in self._max_z_subvars[n]:
+          self._z_vars[k][n] = self._create_z_var(k, n, obj_coefs.get(n, 0), mip.Column([self._max_z_constrs[n][s]], [-1]))
+          self._create_link_constr(self._max_z_subvars, k, n, s)
+        else:
+          self._z_vars[k][n] = self._create_z_var(k, n, obj_coefs.get(n, 0))
+          if (n, s) not in new_groups:
+            new_groups.append((n, s))
+    self._request_fulfillment_constraint(added_classes)
+    for n, s in new_groups:
+      self._create_max_z_subvar(self._max_z_subvars, n, s, self._max_z_objective_coef(n, s) if incremental_objective else 0)
+      limit_nodes.add(n)
+    for resource in self.RESOURCES:
+      self._resource_limit_constraint(resource, list(limit_nodes))
+    if rebuild_objective:
+      if self._objective == self.AVERAGE_OBJ:
+        self._set_objective_average()
+      elif self._objective == self.MIN_MAX_OBJ:
+        self._set_objective_min_max()
+    elif incremental_objective:
+      for n in self._dirty_nodes:
+        for s in self._max_z_subvars[n]:
+          self._max_z_subvars[n][s].obj = self._max_z_objective_coef(n, s)
+      objective = self._model.objective
+      objective.add_const(self._average_objective_const() - objective.const)
+      self._model.objective = maximize(objective)
+    self._dirty_classes = set()
+    self._dirty_nodes = set()
+    self._policies_changed = False
+
+  def _start_values(self, assignment: "dict[Union[str, tuple[str, str]], dict[str, int]]") -> "list[tuple[mip.Var, float]]":
+    start = []
+    deployed = set()
+    for k in self._z_vars:
+      previous = assignment.get(k, {})
+      counts = {n: min(previous.get(n, 0), self._class_size(k)) for n in self._z_vars[k] if previous.get(n, 0) > 0}
+      missing = self._class_size(k) - sum(counts.values())
+      for n in list(counts):
+        if missing >= 0:
+          break
+        reduction = min(counts[n], -missing)
+        counts[n] -= reduction
+        missing += reduction
+      if missing > 0 and len(self._z_vars[k]) > 0:
+        s = self._class_service(k)
+        fallback = next((n for n in self._z_vars[k] if (n, s) in deployed or n in counts), next(iter(self._z_vars[k])))
+        counts[fallback] = counts.get(fallback, 0) + missing
+      for n in counts:
+        if counts[n] > 0:
+          start.append((self._z_vars[k][n], counts[n]))
+          deployed.add((n, self._class_service(k)))
+          if (k, n, True) in self._indicator_vars:
+            start.append((self._indicator_vars[(k, n, True)], 1))
+          if (k, n, False) in self._indicator_vars and counts[n] == self._class_size(k):
+            start.append((self._indicator_vars[(k, n, False)], 1))
+    start.extend((self._max_z_subvars[n][s], 1) for n, s in deployed)
+    return start
+
+  def configure_solver(self, threads: int = None, max_gap: float = None, emphasis: str = None):
+    if emphasis is not None and emphasis != 'default' and self._solver != self.CBC_SOLVER:
+      raise ValueError(f'The {self._solver} solver does not support search emphasis')
+    if threads is not None:
+      self._model.threads = threads
+    if max_gap is not None:
+      self._model.max_mip_gap = max_gap
+    if emphasis is not None and self._solver == self.CBC_SOLVER:
+      self._model.emphasis = self.EMPHASES[emphasis]
+    self._solver_settings.update({setting: value for setting, value in [("threads", threads), ("max_gap", max_gap), ("emphasis", emphasis)] if value is not None})
+
+  def get_solver_settings(self) -> "dict[str, Union[int, float, str]]":
+    return dict(self._solver_settings)
+
+  def set_verbose(self, verbose: int):
+    self._model.verbose = verbose
+
+  def _record_assignment(self):
+    self._last_assignment = {k: {n: int(round(self._z_vars[k][n].x)) for n in self._z_vars[k] if self._z_vars[k][n].x > 0.5} for k in self._z_vars}
+
+  def _solve(self, max_seconds: float = None) -> bool:
+    start = time.perf_counter()
+    opt_status = self._model.optimize() if max_seconds is None else self._model.optimize(max_seconds=max_seconds)
+    self._record_solve(opt_status, time.perf_counter() - start, max_seconds)
+    self._optimized = True
+    if opt_status == OptimizationStatus.INFEASIBLE:
+      print('Infeasible model!')
+    elif opt_status == OptimizationStatus.OPTIMAL:
+      print('Optimal solution found!')
+    elif opt_status == OptimizationStatus.FEASIBLE:
+      print('Feasible solution found!')
+    elif opt_status == OptimizationStatus.NO_SOLUTION_FOUND:
+      print('No solution found!')
+    optimization_ok = opt_status in [OptimizationStatus.OPTIMAL, OptimizationStatus.UNBOUNDED, OptimizationStatus.FEASIBLE]
+    if optimization_ok and self._model.num_solutions > 0:
+      self._record_assignment()
+    return optimization_ok
+
+  def solve_relaxation(self, max_seconds: float = None) -> bool:
+    start = time.perf_counter()
+    opt_status = self._model.optimize(relax=True) if max_seconds is None else self._model.optimize(max_seconds=max_seconds, relax=True)
+    self._record_solve(opt_status, time.perf_counter() - start, max_seconds, relax=True)
+    if opt_status != OptimizationStatus.OPTIMAL:
+      print('No LP relaxation solution found!')
+      return False
+    self._relaxation_bound = self._model.objective_value
+    self._relaxation_values = {k: {n: self._z_vars[k][n].x for n in self._z_vars[k]} for k in self._z_vars}
+    return True
+
+  def get_relaxation_bound(self) -> "Union[float, None]":
+    return self._relaxation_bound
+
+  def get_relaxation_values(self) -> "dict[Union[str, tuple[str, str]], dict[str, float]]":
+    return self._relaxation_values
+
+  def get_nodes(self) -> "list[str]":
+    return list(self._nodes)
+
+  def get_request_classes(self) -> "list[Union[str, tuple[str, str]]]":
+    return list(self._request_classes)
+
+  def get_class_size(self, k: "Union[str, tuple[str, str]]") -> int:
+    return self._class_size(k)
+
+  def get_class_service(self, k: "Union[str, tuple[str, str]]") -> str:
+    return self._class_service(k)
+
+  def get_candidate_nodes(self, k: "Union[str, tuple[str, str]]") -> "list[str]":
+    return list(self._candidate_nodes[k])
+
+  def get_placement_gains(self, k: "Union[str, tuple[str, str]]") -> "dict[str, float]":
+    return self._class_objective(k)[1]
+
+  def get_open_gain(self, n: str, s: str) -> float:
+    return self._max_z_objective_coef(n, s)
+
+  def get_average_objective_const(self) -> float:
+    return self._average_objective_const()
+
+  def get_resource_capacity(self, n: str, resource: str) -> "Union[float, None]":
+    return self._resource_capacity(n, resource)
+
+  def get_service_demand(self, s: str, resource: str) -> float:
+    return self._store.service_demand(s, resource)
+
+  def get_class_requests(self, k: "Union[str, tuple[str, str]]") -> "dict[str, dict[str, str]]":
+    return {r: self._store.request_dict(r) for r in self._request_classes[k]}
+
+  def get_node_objective_const(self, n: str) -> float:
+    return self._node_objective_const(n)
+
+  def get_objective(self) -> "Union[str, None]":
+    return self._objective
+
+  def get_objective_scales(self) -> "dict[str, dict[str, Union[int, float]]]":
+    return self._objective_scales
+
+  def get_solver(self) -> str:
+    return self._solver
+
+  def get_inputs(self) -> "dict[str, Union[dict, list, bool, str]]":
+    return {"nodes": self._store.node_dicts(), "services": self._services, "resource_policies": self._resource_policies, "service_policies": self._service_policies, "aggregate_requests": self._aggregate_requests, "solver": self._solver}
+
+  def _profiled(self, family: str, function, *args):
+    if self._profile is None:
+      return function(*args)
+    columns, rows, nonzeros = self._model.num_cols, self._model.num_rows, self._model.num_nz
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    family_profile = self._profile["families"].setdefault(family, {"calls": 0, "time": 0, "columns": 0, "rows": 0, "nonzeros": 0})
+    family_profile["calls"] += 1
+    family_profile["time"] += elapsed
+    family_profile["columns"] += self._model.num_cols - columns
+    family_profile["rows"] += self._model.num_rows - rows
+    family_profile["nonzeros"] += self._model.num_nz - nonzeros
+    return result
+
+  def _record_solve(self, opt_status: OptimizationStatus, elapsed: float, max_seconds: float = None, relax: bool = False):
+    solved = self._model.num_solutions > 0
+    self._solve_stats = {
+      "solver": self._solver,
+      "status": opt_status.name,
+      "relax": relax,
+      "max_seconds": max_seconds,
+      "settings": dict(self._solver_settings),
+      "time": elapsed,
+      "objective_value": self._model.objective_value if solved else None,
+      "objective_bound": self._model.objective_bound,
+      "gap": self._model.gap if solved else None,
+      "solutions": self._model.num_solutions,
+      "columns": self._model.num_cols,
+      "rows": self._model.num_rows,
+      "nonzeros": self._model.num_nz
+    }
+    if self._profile is not None:
+      self._profile["solves"].append(dict(self._solve_stats))
+
+  def record_placement(self, engine: str, status: str, elapsed: float, objective_value: float = None, objective_bound: float = None, max_seconds: float = None):
+    self._solve_stats = {
+      "solver": engine,
+      "status": status,
+      "relax": False,
+      "max_seconds": max_seconds,
+      "settings": dict(self._solver_settings),
+      "time": elapsed,
+      "objective_value": objective_value,
+      "objective_bound": objective_bound,
+      "gap": abs(objective_bound - objective_value)/max(abs(objective_value), 1e-10) if objective_value is not None and objective_bound is not None else None,
+      "solutions": int(objective_value is not None),
+      "columns": self._model.num_cols,
+      "rows": self._model.num_rows,
+      "nonzeros": self._model.num_nz
+    }
+    if self._profile is not None:
+      self._profile["solves"].append(dict(self._solve_stats))
+
+  def get_solve_stats(self) -> "Union[dict[str, Union[str, bool, int, float, dict, None]], None]":
+    return dict(self._solve_stats) if self._solve_stats is not None else None
+
+  def get_model_stats(self) -> "dict[str, int]":
+    return {"columns": self._model.num_cols, "rows": self._model.num_rows, "nonzeros": self._model.num_nz}
+
+  def get_status(self) -> str:
+    return self._model.status.name
+
+  def get_objective_value(self) -> "Union[float, None]":
+    return self._model.objective_value if self._model.num_solutions > 0 else None
+
+  def get_profile(self) -> "Union[dict[str, Union[dict, list]], None]":
+    if self._profile is None:
+      return None
+    return {"families": {family: dict(self._profile["families"][family]) for family in self._profile["families"]}, "solves": [dict(solve) for solve in self._profile["solves"]], "model": self.get_model_stats()}
+
+  def optimize(self, max_seconds: float = None) -> bool:
     if not self._optimized:
-      opt_status = self._model.optimize()
-      self._optimized = True
-      if opt_status == OptimizationStatus.INFEASIBLE:
-        print('Infeasible model!')
-      elif opt_status == OptimizationStatus.OPTIMAL:
-        print('Optimal solution found!')
-      return opt_status in [OptimizationStatus.OPTIMAL, OptimizationStatus.UNBOUNDED, OptimizationStatus.FEASIBLE]
+      return self._solve(max_seconds)
     else:
       print('Model already optimized!')
       return False
 
+  def reoptimize(self, max_seconds: float = None) -> bool:
+    self._apply_changes()
+    if len(self._last_assignment) > 0:
+      self.warm_start(self._last_assignment)
+    return self._solve(max_seconds)
+
+  def warm_start(self, assignment: "dict[Union[str, tuple[str, str]], dict[str, int]]"):
+    self._model.start = self._start_values(assignment)
+
+  def fix_assignment(self, assignment: "dict[Union[str, tuple[str, str]], dict[str, int]]") -> bool:
+    if any(n not in self._z_vars.get(k, {}) for k in assignment for n in assignment[k] if assignment[k][n] > 0):
+      return False
+    for k in self._z_vars:
+      for n in self._z_vars[k]:
+        self._z_vars[k][n].lb = self._z_vars[k][n].ub = assignment.get(k, {}).get(n, 0)
+    return True
+
+  def assignment_from_dataframe(self, sol_df: "pd.DataFrame") -> "dict[Union[str, tuple[str, str]], dict[str, int]]":
+    assignment = {}
+    for request_name, n in zip(sol_df["Request ID"].tolist(), sol_df["Deployment node"].tolist()):
+      if request_name in self._requests and n in self._nodes:
+        k = self._request_class_key(request_name)
+        assignment.setdefault(k, {})
+        assignment[k][n] = assignment[k].get(n, 0) + 1
+    return assignment
+
+  def accept_assignment(self, assignment: "dict[Union[str, tuple[str, str]], dict[str, int]]"):
+    self._last_assignment = assignment
+    self._optimized = True
+
+  def get_assignment(self) -> "dict[Union[str, tuple[str, str]], dict[str, int]]":
+    return self._last_assignment
+
   def debug(self, debug_path: str = "DebugModel.lp"):
     self._model.write(debug_path)
 
   def get_solution_dict(self) -> dict[str, int]:
     if self._optimized:
-      return {var.name: var.x for var in self._model.vars}
+      placed = {k: {n: count for n, count in self._last_assignment[k].items() if count > 0} for k in self._last_assignment if k in self._z_vars}
+      deployed = {(n, self._class_service(k)) for k in placed for n in placed[k]}
+      solution = {self._z_var_name(k, n): placed.get(k, {}).get(n, 0) for k in self._z_vars for n in self._z_vars[k]}
+      solution.update({self._max_z_var_name(n, s): int((n, s) in deployed) for n in self._max_z_subvars for s in self._max_z_subvars[n]})
+      return solution
     else:
       return None
 
   def get_summarized_solution(self) -> list[str]:
     if self._optimized:
-      return [var.name for var in list(filter(lambda x: x.x > 0.5 and x.name.startswith('z_'), self._model.vars))]
+      return [self._z_var_name(k, n) for k in self._last_assignment for n in self._last_assignment[k]]
     else:
       return None
 
-  def get_solution_dataframe(self) -> pd.DataFrame:
+  def get_assignment_array(self) -> "np.ndarray":
     if self._optimized:
-      initial_info = [var.name for var in list(filter(lambda x: x.x > 0.5 and x.name.startswith('z_'), self._model.vars))]
-      df_data = []
-      for var in initial_info:
-        __, request_name, node = var.split('_')
-        df_data.append({"Request ID": request_name, "Requestor": self._requests[request_name]["node"], "Service": self._requests[request_name]["service"], "Deployment node": node})
-      return pd.DataFrame(df_data)
+      request_index = {request_name: ndx for ndx, request_name in enumerate(self._requests)}
+      node_index = {n: ndx for ndx, n in enumerate(self._nodes)}
+      assignment = np.full(len(self._requests), -1, dtype=np.int32)
+      for k in self._last_assignment:
+        class_requests = self._request_classes[k]
+        placed = 0
+        for n in self._last_assignment[k]:
+          count = self._last_assignment[k][n]
+          assignment[[request_index[request_name] for request_name in class_requests[placed:placed + count]]] = node_index[n]
+          placed += count
+      return assignment
     else:
       return None
 
+  def get_solution_dataframe(self) -> "pd.DataFrame":
+    if self._optimized:
+      import pandas as pd
+      assignment = self.get_assignment_array()
+      placed = np.flatnonzero(assignment >= 0)
+      request_names = np.array(list(self._requests), dtype=object)[placed]
+      return pd.DataFrame({"Request ID": request_names, "Requestor": [self._store.request_node(request_name) for request_name in request_names], "Service": [self._store.request_service(request_name) for request_name in request_names], "Deployment node": np.array(list(self._nodes), dtype=object)[assignment[placed]]})
+    else:
+      return None
@@ -0,0 +1,175 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path: str, timeout: float = None) -> None:
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class CommandUI:
+
+    AVERAGE_OBJ = 'avg'
+    MIN_MAX_OBJ = 'minmax'
+
+    OBJECTIVES = [AVERAGE_OBJ, MIN_MAX_OBJ]
+
+    SOLVERS = ['cbc', 'highs']
+
+    EMPHASES = ['default', 'feasibility', 'optimality']
+
+    ARGUMENTS = {
+        "-n": {
+            "required": True,
+            "metavar": "Node config",
+            "help": "Case study nodes config in YAML or Mist scenario (.mist) format"
+        },
+        "-r": {
+            "required": False,
+            "metavar": "Requests config",
+            "help": "Case study requests config in YAML or Mist scenario (.mist) format"
+        },
+        "-rp": {
+            "required": False,
+            "metavar": "Resource policies",
+            "help": "Case study resource policies in YAML or Mist scenario (.mist) format"
+        },
+        "-sp": {
+            "required": False,
+            "metavar": "Service policies",
+            "help": "Case study service policies in YAML or Mist scenario (.mist) format"
+        },
+        "--obj": {
+            "required": False,
+            "help": "Optimization objective",
+            "choices": OBJECTIVES,
+            "default": AVERAGE_OBJ
+        },
+        "--aggregate": {
+            "required": False,
+            "action": "store_true",
+            "help": "Group interchangeable requests (same requestor and service) into integer count variables"
+        },
+        "--solver": {
+            "required": False,
+            "help": "MIP solver backend. highs requires the highspy package on the server",
+            "choices": SOLVERS
+        },
+        "--threads": {
+            "required": False,
+            "type": int,
+            "metavar": "threads",
+            "help": "Number of solver threads. 0 uses the solver default and -1 all cores"
+        },
+        "--max-seconds": {
+            "required": False,
+            "type": float,
+            "metavar": "seconds",
+            "help": "Wall-clock budget for the solver"
+        },
+        "--max-gap": {
+            "required": False,
+            "type": float,
+            "metavar": "gap",
+            "help": "Relative optimality gap at which the solver stops"
+        },
+        "--emphasis": {
+            "required": False,
+            "help": "CBC search emphasis",
+            "choices": EMPHASES
+        },
+        "--debug": {
+            "required": False,
+            "metavar": "debug model",
+            "help": "Output debug LP model"
+        },
+        "--dfo": {
+            "required": False,
+            "metavar": "Output CSV",
+            "help": "Output solution dataframe in CSV format"
+        },
+        "-o": {
+            "required": False,
+            "metavar": "Output K8s YAML",
+            "help": "Output solution in Kubernetes-YAML format"
+        },
+        "--socket": {
+            "required": False,
+            "metavar": "Unix socket path",
+            "help": "Optimizer server Unix socket. Defaults to localhost HTTP"
+        },
+        "--host": {
+            "required": False,
+            "default": "127.0.0.1",
+            "help": "Optimizer server HTTP address"
+        },
+        "--port": {
+            "required": False,
+            "type": int,
+            "default": 8750,
+            "help": "Optimizer server HTTP port"
+        },
+        "--timings": {
+            "required": False,
+            "action": "store_true",
+            "help": "Print the server-side timings of the job"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Client for the Mist Platform Optimizer server", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def _path(self, path: str) -> str:
+        return os.path.abspath(path) if path else None
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        job = {
+            "nodes": self._path(ui_args.n),
+            "requests": self._path(ui_args.r),
+            "resource_policies": self._path(ui_args.rp),
+            "service_policies": self._path(ui_args.sp),
+            "objective": ui_args.obj,
+            "aggregate": ui_args.aggregate,
+            "solver": ui_args.solver,
+            "threads": ui_args.threads,
+            "max_seconds": ui_args.max_seconds,
+            "max_gap": ui_args.max_gap,
+            "emphasis": ui_args.emphasis,
+            "debug": self._path(ui_args.debug),
+            "dfo": self._path(ui_args.dfo),
+            "output": self._path(ui_args.o)
+        }
+        if ui_args.socket:
+            connection = UnixHTTPConnection(ui_args.socket)
+        else:
+            connection = http.client.HTTPConnection(ui_args.host, ui_args.port)
+        connection.request("POST", "/jobs", body=json.dumps({k: v for k, v in job.items() if v is not None}), headers={"Content-Type": "application/json"})
+        result = json.loads(connection.getresponse().read())
+        connection.close()
+        if "error" in result:
+            raise ValueError(result["error"])
+        print('Placement found!' if result["ok"] else 'No placement found!')
+        if result.get("stats"):
+            print(f'Solver: {result["stats"]["solver"]} Status: {result["stats"]["status"]} Objective: {result["stats"]["objective_value"]} Gap: {result["stats"]["gap"]}')
+        if ui_args.timings:
+            for step, elapsed in result["timings"].items():
+                print(f'{step}: {elapsed:.4f} s')
+
+if __name__ == '__main__':
+    CommandUI().launch()
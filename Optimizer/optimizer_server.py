@@ -0,0 +1,279 @@
+from optimizer import MistPlatformOptimizer
+from sol2kube import SolutionToKubernetes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from typing import Any, Union
+import argparse
+import collections
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
+
+from scenario import load_yaml, load_nodes, load_services, load_requests, load_resource_policies, load_service_policies
+
+
+class PlacementJob:
+
+    def __init__(self, job_id: int, spec: "dict[str, Any]") -> None:
+        self.id = job_id
+        self.spec = spec
+        self.result = None
+        self.timings = {}
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+
+    def summary(self) -> "dict[str, Any]":
+        return {"id": self.id, "done": self.done.is_set(), "ok": self.result["ok"] if self.result else None, "timings": self.timings}
+
+
+class OptimizerService:
+
+    AVERAGE_OBJ = 'avg'
+    MIN_MAX_OBJ = 'minmax'
+
+    def __init__(self, services: "dict[str, dict[str, Any]]", container_specs: "dict[str, list[dict[str, Any]]]" = None, service_ports: "dict[str, int]" = None, service_metadata: "dict[str, dict[str, Any]]" = None, history: int = 100) -> None:
+        self._services = services
+        self._container_specs = container_specs
+        self._service_ports = service_ports
+        self._service_metadata = service_metadata if service_metadata is not None else {}
+        self._history = history
+        self._jobs = collections.OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def submit(self, spec: "dict[str, Any]") -> PlacementJob:
+        with self._jobs_lock:
+            job = PlacementJob(next(self._job_ids), spec)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.popitem(last=False)
+        self._queue.put(job)
+        return job
+
+    def job(self, job_id: int) -> "Union[PlacementJob, None]":
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> "list[PlacementJob]":
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.timings["queued"] = time.perf_counter() - job.submitted
+            try:
+                job.result = self._run(job)
+            except Exception as e:
+                job.result = {"ok": False, "error": f'{type(e).__name__}: {e}'}
+            job.timings["total"] = time.perf_counter() - job.submitted
+            job.result["id"] = job.id
+            job.result["timings"] = job.timings
+            job.done.set()
+
+    def _load(self, value: "Union[str, dict, list, None]", default: "Union[dict, list, None]", loader) -> "Union[dict, list, None]":
+        if value is None:
+            return default
+        if isinstance(value, str):
+            return loader(value)
+        return value
+
+    def _timed(self, job: PlacementJob, step: str, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        job.timings[step] = time.perf_counter() - start
+        return result
+
+    def _load_inputs(self, spec: "dict[str, Any]") -> tuple:
+        nodes = self._load(spec.get("nodes"), None, load_nodes)
+        if nodes is None:
+            raise ValueError("Nodes must be specified")
+        requests = self._load(spec.get("requests"), {}, load_requests)
+        resource_policies = self._load(spec.get("resource_policies"), [], load_resource_policies)
+        service_policies = self._load(spec.get("service_policies"), [], load_service_policies)
+        return nodes, requests, resource_policies, service_policies
+
+    def _build(self, spec: "dict[str, Any]", nodes, requests, resource_policies, service_policies) -> MistPlatformOptimizer:
+        optimizer = MistPlatformOptimizer(nodes, self._services, requests, resource_policies, service_policies, aggregate_requests=bool(spec.get("aggregate", False)), variable_names=bool(spec.get("debug")), solver=spec.get("solver", MistPlatformOptimizer.CBC_SOLVER))
+        optimizer.configure_solver(spec.get("threads"), spec.get("max_gap"), spec.get("emphasis"))
+        if spec.get("objective", self.AVERAGE_OBJ) == self.MIN_MAX_OBJ:
+            optimizer.objective_min_max()
+        else:
+            optimizer.objective_average()
+        return optimizer
+
+    def _convert(self, sol_df, out_yaml: str) -> None:
+        if self._container_specs is None:
+            raise ValueError("Container specs must be specified")
+        if self._service_ports is None:
+            raise ValueError("Service ports must be specified")
+        SolutionToKubernetes(sol_df, self._container_specs, self._service_ports, self._service_metadata).convert(out_yaml)
+
+    def _run(self, job: PlacementJob) -> "dict[str, Any]":
+        spec = job.spec
+        inputs = self._timed(job, "load", self._load_inputs, spec)
+        optimizer = self._timed(job, "build", self._build, spec, *inputs)
+        if spec.get("debug"):
+            optimizer.debug(spec["debug"])
+        optimization_ok = self._timed(job, "solve", optimizer.optimize, spec.get("max_seconds"))
+        if not optimization_ok:
+            return {"ok": False, "stats": optimizer.get_solve_stats()}
+        sol_df = self._timed(job, "extract", optimizer.get_solution_dataframe)
+        if spec.get("dfo"):
+            self._timed(job, "dfo", sol_df.to_csv, spec["dfo"], index=False)
+        if spec.get("output"):
+            self._timed(job, "kube", self._convert, sol_df, spec["output"])
+        return {"ok": True, "stats": optimizer.get_solve_stats(), "solution": sol_df.to_dict(orient="records")}
+
+
+class OptimizerRequestHandler(BaseHTTPRequestHandler):
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send(self, status: int, body: "Any") -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if self.path == '/jobs':
+            self._send(200, [job.summary() for job in self.server.service.jobs()])
+        elif self.path.startswith('/jobs/') and self.path[len('/jobs/'):].isdigit():
+            job = self.server.service.job(int(self.path[len('/jobs/'):]))
+            if job is None:
+                self._send(404, {"error": "Unknown job"})
+            else:
+                self._send(200, job.summary())
+        else:
+            self._send(404, {"error": "Unknown path"})
+
+    def do_POST(self) -> None:
+        if self.path != '/jobs':
+            self._send(404, {"error": "Unknown path"})
+            return
+        try:
+            spec = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f'Invalid JSON: {e}'})
+            return
+        if not isinstance(spec, dict):
+            self._send(400, {"error": "Job must be a JSON object"})
+            return
+        job = self.server.service.submit(spec)
+        job.done.wait()
+        self._send(500 if "error" in job.result else 200, job.result)
+
+
+class HTTPOptimizerServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address: "tuple[str, int]", service: OptimizerService) -> None:
+        super().__init__(address, OptimizerRequestHandler)
+        self.service = service
+
+
+class UnixOptimizerServer(ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: OptimizerService) -> None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, OptimizerRequestHandler)
+        self.service = service
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "-s": {
+            "required": True,
+            "metavar": "Services config",
+            "help": "Case study services config in YAML or Mist scenario (.mist) format"
+        },
+        "-cs": {
+            "required": False,
+            "metavar": "YAML container specs",
+            "help": "Container specs YAML configuration. Required for jobs with an output"
+        },
+        "-p": {
+            "required": False,
+            "metavar": "YAML service ports specification",
+            "help": "Service ports YAML configuration. Required for jobs with an output"
+        },
+        "-sm": {
+            "required": False,
+            "metavar": "YAML service metadata",
+            "help": "Service metadata YAML configuration. Defaults to no metadata"
+        },
+        "--socket": {
+            "required": False,
+            "metavar": "Unix socket path",
+            "help": "Listen on a Unix socket instead of localhost HTTP"
+        },
+        "--host": {
+            "required": False,
+            "default": "127.0.0.1",
+            "help": "HTTP listen address"
+        },
+        "--port": {
+            "required": False,
+            "type": int,
+            "default": 8750,
+            "help": "HTTP listen port"
+        },
+        "--history": {
+            "required": False,
+            "type": int,
+            "default": 100,
+            "help": "Number of finished jobs whose timings are kept"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="Server for the Mist Platform Optimizer", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def _load_optional(self, path: str) -> "Union[dict, None]":
+        if not path:
+            return None
+        return load_yaml(path)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        services = load_services(ui_args.s)
+        service = OptimizerService(services, self._load_optional(ui_args.cs), self._load_optional(ui_args.p), self._load_optional(ui_args.sm), ui_args.history)
+        if ui_args.socket:
+            server = UnixOptimizerServer(ui_args.socket, service)
+            print(f'Optimizer server listening on {ui_args.socket}')
+        else:
+            server = HTTPOptimizerServer((ui_args.host, ui_args.port), service)
+            print(f'Optimizer server listening on http://{ui_args.host}:{ui_args.port}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if ui_args.socket and os.path.exists(ui_args.socket):
+                os.remove(ui_args.socket)
+
+if __name__ == '__main__':
+    CommandUI().launch()
@@ -1,8 +1,14 @@
-from optimizer import MistPlatformOptimizer
-from sol2kube import SolutionToKubernetes
+import time
+_STARTED = time.perf_counter()
 import argparse
+import json
 import os
-import yaml
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "SituationGenerator"))
 
 
 class CommandUI:
@@ -12,31 +18,52 @@ class CommandUI:
 
     OBJECTIVES = [AVERAGE_OBJ, MIN_MAX_OBJ]
 
+    MIP_ENGINE = 'mip'
+    HEURISTIC_ENGINE = 'heuristic'
+    HYBRID_ENGINE = 'hybrid'
+    LP_ENGINE = 'lp'
+
+    ENGINES = [MIP_ENGINE, HEURISTIC_ENGINE, HYBRID_ENGINE, LP_ENGINE]
+
+    CBC_SOLVER = 'cbc'
+    HIGHS_SOLVER = 'highs'
+
+    SOLVERS = [CBC_SOLVER, HIGHS_SOLVER]
+
+    EMPHASES = ['default', 'feasibility', 'optimality']
+
     ARGUMENTS = {
         "-n": {
             "required": True,
-            "metavar": "YAML node config",
-            "help": "Case study nodes config in YAML format"
+            "metavar": "Node config",
+            "help": "Case study nodes config in YAML or Mist scenario (.mist) format"
         },
         "-r": {
             "required": False,
-            "metavar": "YAML requests config",
-            "help": "Case study requests config in YAML format"
+            "metavar": "Requests config",
+            "help": "Case study requests config in YAML or Mist scenario (.mist) format"
+        },
+        "--scale": {
+            "required": False,
+            "type": int,
+            "default": 1,
+            "metavar": "scale",
+            "help": "Scale of requests (2x original, 3x original, etc.), as generated by the Stable Situation Generator. Will be ignored if lower than 1"
         },
         "-s": {
             "required": True,
-            "metavar": "YAML services config",
-            "help": "Case study services config in YAML format"
+            "metavar": "Services config",
+            "help": "Case study services config in YAML or Mist scenario (.mist) format"
         },
         "-rp": {
             "required": False,
-            "metavar": "YAML resource policies",
-            "help": "Case study resource policies in YAML format"
+            "metavar": "Resource policies",
+            "help": "Case study resource policies in YAML or Mist scenario (.mist) format"
         },
         "-sp": {
             "required": False,
-            "metavar": "YAML service policies",
-            "help": "Case study resource policies in YAML format"
+            "metavar": "Service policies",
+            "help": "Case study service policies in YAML or Mist scenario (.mist) format"
         },
         "--obj": {
             "required": False,
@@ -44,6 +71,52 @@ class CommandUI:
             "choices": OBJECTIVES,
             "default": AVERAGE_OBJ
         },
+        "--engine": {
+            "required": False,
+            "help": "Placement engine. hybrid seeds the MIP with the heuristic placement. lp rounds the LP relaxation and reports its bound and the optimality gap",
+            "choices": ENGINES,
+            "default": MIP_ENGINE
+        },
+        "--max-seconds": {
+            "required": False,
+            "type": float,
+            "metavar": "seconds",
+            "help": "Wall-clock budget for the placement engine"
+        },
+        "--solver": {
+            "required": False,
+            "help": "MIP solver backend. highs requires the highspy package",
+            "choices": SOLVERS,
+            "default": CBC_SOLVER
+        },
+        "--threads": {
+            "required": False,
+            "type": int,
+            "metavar": "threads",
+            "help": "Number of solver threads. 0 uses the solver default and -1 all cores"
+        },
+        "--max-gap": {
+            "required": False,
+            "type": float,
+            "metavar": "gap",
+            "help": "Relative optimality gap at which the solver stops"
+        },
+        "--emphasis": {
+            "required": False,
+            "help": "CBC search emphasis",
+            "choices": EMPHASES
+        },
+        "--decompose": {
+            "required": False,
+            "action": "store_true",
+            "help": "Solve independent request/node components as separate models in a process pool. Requires the mip engine and the average objective"
+        },
+        "--workers": {
+            "required": False,
+            "type": int,
+            "metavar": "processes",
+            "help": "Number of worker processes used by --decompose. Defaults to the number of cores"
+        },
         "-cs": {
             "required": False,
             "metavar": "YAML container specs",
@@ -59,6 +132,11 @@ class CommandUI:
             "metavar": "YAML service metadata",
             "help": "Service metadata YAML configuration. Defaults to no metadata"
         },
+        "--aggregate": {
+            "required": False,
+            "action": "store_true",
+            "help": "Group interchangeable requests (same requestor and service) into integer count variables"
+        },
         "--debug": {
             "required": False,
             "metavar": "debug model",
@@ -73,6 +151,48 @@ class CommandUI:
             "required": False,
             "metavar": "Output K8s YAML",
             "help": "Output solution in Kubernetes-YAML format"
+        },
+        "--previous": {
+            "required": False,
+            "metavar": "Previous solution",
+            "help": "Previous solution CSV or Kubernetes-YAML output. -o always holds the full placement, and the objects changed since --previous are reported through --unchanged and --removed"
+        },
+        "--unchanged": {
+            "required": False,
+            "metavar": "Output list",
+            "help": "Output the kind/name of every object left unchanged since --previous, one per line"
+        },
+        "--removed": {
+            "required": False,
+            "metavar": "Output list",
+            "help": "Output the kind/name of every object of --previous that is no longer part of the placement, one per line"
+        },
+        "--profile": {
+            "required": False,
+            "metavar": "Output JSON",
+            "help": "Output per-family model build and solver statistics in JSON format"
+        },
+        "--stats": {
+            "required": False,
+            "metavar": "Output JSON",
+            "help": "Output the status, objective, bound, gap and time of the last solver run in JSON format"
+        },
+        "--cache": {
+            "required": False,
+            "metavar": "Cache directory",
+            "help": "Reuse solutions and Kubernetes-YAML outputs of identical scenarios, and warm-start the MIP from the last solution on the same infrastructure"
+        },
+        "--cache-size": {
+            "required": False,
+            "type": float,
+            "default": 512,
+            "metavar": "MiB",
+            "help": "Size bound of the --cache directory. Least recently used entries are evicted first"
+        },
+        "--timings": {
+            "required": False,
+            "action": "store_true",
+            "help": "Print the time spent in the startup, parse, build, solve and emit phases"
         }
     }
 
@@ -83,60 +203,147 @@ class CommandUI:
             arg_params = self.ARGUMENTS[argument]
             self.__ap.add_argument(argument, **arg_params)
     
+    def _phase(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.__timings[phase] = now - self.__phase_start
+        self.__phase_start = now
+
+    def _place(self, ui_args: argparse.Namespace, optimizer: "MistPlatformOptimizer") -> bool:
+        if ui_args.decompose:
+            from decomposition import ComponentDecomposition
+            return ComponentDecomposition(optimizer).optimize(ui_args.workers, ui_args.max_seconds)
+        if ui_args.engine == self.MIP_ENGINE:
+            return optimizer.optimize(ui_args.max_seconds)
+        if ui_args.engine == self.LP_ENGINE:
+            from rounding import RelaxationRoundingEngine
+            engine = RelaxationRoundingEngine(optimizer)
+            optimization_ok = engine.place(ui_args.max_seconds)
+            if optimization_ok:
+                optimizer.accept_assignment(engine.get_assignment())
+                print(f'LP bound: {engine.get_lp_bound():.4f} Rounded objective: {engine.get_objective_value():.4f} Gap: {100*engine.get_gap():.2f}%')
+            return optimization_ok
+        from heuristic import GreedyPlacementEngine
+        engine = GreedyPlacementEngine(optimizer)
+        optimization_ok = engine.place(ui_args.max_seconds)
+        if optimization_ok and ui_args.engine == self.HEURISTIC_ENGINE:
+            optimizer.accept_assignment(engine.get_assignment())
+        elif ui_args.engine == self.HYBRID_ENGINE:
+            if optimization_ok:
+                optimizer.warm_start(engine.get_assignment())
+            remaining = None if ui_args.max_seconds is None else max(ui_args.max_seconds - (time.perf_counter() - self.__phase_start), 1)
+            if optimizer.optimize(remaining):
+                optimization_ok = True
+            elif optimization_ok:
+                optimizer.accept_assignment(engine.get_assignment())
+                optimizer.record_placement(self.HEURISTIC_ENGINE, 'FEASIBLE', time.perf_counter() - self.__phase_start, engine.get_objective_value(), max_seconds=ui_args.max_seconds)
+        return optimization_ok
+
     def launch(self) -> None:
+        self.__timings = {}
+        self.__phase_start = _STARTED
         ui_args = self.__ap.parse_args()
-        with open(ui_args.n, 'r') as in_nodes:
-            nodes = yaml.safe_load(in_nodes)
-        with open(ui_args.s, 'r') as in_services:
-            services = yaml.safe_load(in_services)
-        if ui_args.r:
-            with open(ui_args.r, 'r') as in_requests:
-                requests = yaml.safe_load(in_requests)
-        else:
-            requests = {}
-        if ui_args.rp:
-            with open(ui_args.rp, 'r') as in_resource_policies:
-                resource_policies = yaml.safe_load(in_resource_policies)
+        if ui_args.engine in [self.HEURISTIC_ENGINE, self.LP_ENGINE] and ui_args.obj != self.AVERAGE_OBJ:
+            raise ValueError(f"The {ui_args.engine} engine only supports the average objective")
+        if ui_args.decompose and (ui_args.engine != self.MIP_ENGINE or ui_args.obj != self.AVERAGE_OBJ):
+            raise ValueError("Decomposition requires the mip engine and the average objective")
+        if ui_args.emphasis not in [None, 'default'] and ui_args.solver != self.CBC_SOLVER:
+            raise ValueError("Search emphasis is only supported by the cbc solver")
+        if ui_args.o and not ui_args.cs:
+            raise ValueError("Container specs must be specified")
+        if ui_args.o and not ui_args.p:
+            raise ValueError("Service ports must be specified")
+        if (ui_args.previous or ui_args.unchanged or ui_args.removed) and not ui_args.o:
+            raise ValueError("Output Kubernetes-YAML must be specified")
+        from optimizer import MistPlatformOptimizer
+        from scenario import load_yaml, load_nodes, load_services, load_requests, load_resource_policies, load_service_policies
+        self._phase("startup")
+        nodes = load_nodes(ui_args.n)
+        services = load_services(ui_args.s)
+        base_requests = load_requests(ui_args.r) if ui_args.r else {}
+        if ui_args.scale > 1:
+            from situationgen import ScaledSituation
+            requests = ScaledSituation(base_requests, ui_args.scale)
         else:
-            resource_policies = []
-        if ui_args.sp:
-            with open(ui_args.sp, 'r') as in_service_policies:
-                service_policies = yaml.safe_load(in_service_policies)
-        else:
-            service_policies = []
-        optimizer = MistPlatformOptimizer(nodes, services, requests, resource_policies, service_policies)
-        if ui_args.obj == self.AVERAGE_OBJ:
-            optimizer.objective_average()
-        elif ui_args.obj == self.MIN_MAX_OBJ:
-            optimizer.objective_min_max()
-        else:
-            print('Objective unsupported. Defaulting to average')
-            optimizer.objective_average()
-        if ui_args.debug:
-            optimizer.debug(ui_args.debug)
-        optimization_ok = optimizer.optimize()
-        if optimization_ok:
-            sol_df = optimizer.get_solution_dataframe()
+            requests = base_requests
+        resource_policies = load_resource_policies(ui_args.rp) if ui_args.rp else []
+        service_policies = load_service_policies(ui_args.sp) if ui_args.sp else []
+        self._phase("parse")
+        cache, solution_key, infrastructure_key, cached_solution, sol_df = None, None, None, None, None
+        if ui_args.cache:
+            from solution_cache import SolutionCache
+            cache = SolutionCache(ui_args.cache, int(ui_args.cache_size*2**20))
+            infrastructure_key = cache.key(nodes, services, resource_policies, service_policies, ui_args.obj, ui_args.aggregate)
+            solution_key = cache.key(infrastructure_key, [base_requests, ui_args.scale] if ui_args.scale > 1 else base_requests, ui_args.engine, ui_args.decompose, ui_args.max_seconds, ui_args.solver, ui_args.threads, ui_args.max_gap, ui_args.emphasis)
+            if not (ui_args.debug or ui_args.profile or ui_args.stats):
+                cached_solution = cache.get(solution_key, '.csv')
+                if cached_solution is not None:
+                    import pandas as pd
+                    sol_df = pd.read_csv(cached_solution, dtype=str)
+                    print('Cached solution found!')
+        if sol_df is None:
+            optimizer = MistPlatformOptimizer(nodes, services, requests, resource_policies, service_policies, aggregate_requests=ui_args.aggregate, profile=ui_args.profile is not None, variable_names=ui_args.debug is not None, solver=ui_args.solver)
+            optimizer.configure_solver(ui_args.threads, ui_args.max_gap, ui_args.emphasis)
+            if ui_args.obj == self.AVERAGE_OBJ:
+                optimizer.objective_average()
+            elif ui_args.obj == self.MIN_MAX_OBJ:
+                optimizer.objective_min_max()
+            else:
+                print('Objective unsupported. Defaulting to average')
+                optimizer.objective_average()
+            if ui_args.debug:
+                optimizer.debug(ui_args.debug)
+            self._phase("build")
+            if cache is not None and ui_args.engine == self.MIP_ENGINE:
+                previous_solution = cache.get(infrastructure_key, '.csv')
+                if previous_solution is not None:
+                    import pandas as pd
+                    optimizer.warm_start(optimizer.assignment_from_dataframe(pd.read_csv(previous_solution, dtype=str)))
+            if self._place(ui_args, optimizer):
+                sol_df = optimizer.get_solution_dataframe()
+            self._phase("solve")
+        if sol_df is not None:
             if ui_args.dfo:
                 sol_df.to_csv(ui_args.dfo, index=False)
+            if cache is not None and cached_solution is None:
+                with tempfile.NamedTemporaryFile('w', suffix='.csv') as out_csv:
+                    sol_df.to_csv(out_csv.name, index=False)
+                    cache.put(solution_key, '.csv', out_csv.name)
+                    cache.put(infrastructure_key, '.csv', out_csv.name)
             if ui_args.o:
-                if not ui_args.cs:
-                    raise ValueError("Container specs must be specified")
-                with open(ui_args.cs, 'r') as in_container_specs:
-                    container_specs = yaml.safe_load(in_container_specs)
-
-                if not ui_args.p:
-                    raise ValueError("Service ports must be specified")
-                with open(ui_args.p, 'r') as in_ports:
-                    service_ports = yaml.safe_load(in_ports)
-                
-                if ui_args.sm:
-                    with open(ui_args.sm, 'r') as in_service_meta:
-                        service_metadata  = yaml.safe_load(in_service_meta)
+                container_specs = load_yaml(ui_args.cs)
+                service_ports = load_yaml(ui_args.p)
+                service_metadata = load_yaml(ui_args.sm) if ui_args.sm else {}
+                manifest_key = cache.key(solution_key, container_specs, service_ports, service_metadata) if cache is not None and not (ui_args.previous or ui_args.unchanged or ui_args.removed) else None
+                cached_manifest = cache.get(manifest_key, '.yaml') if manifest_key is not None else None
+                if cached_manifest is not None:
+                    shutil.copyfile(cached_manifest, ui_args.o)
                 else:
-                    service_metadata = {}
-                s2k = SolutionToKubernetes(sol_df, container_specs, service_ports, service_metadata)
-                s2k.convert(ui_args.o)
+                    from sol2kube import SolutionToKubernetes
+                    if ui_args.previous and ui_args.previous.endswith('.csv'):
+                        import pandas as pd
+                        previous = pd.read_csv(ui_args.previous)
+                    else:
+                        previous = ui_args.previous
+                    s2k = SolutionToKubernetes(sol_df, container_specs, service_ports, service_metadata)
+                    changes = s2k.convert(ui_args.o, previous)
+                    if ui_args.unchanged:
+                        with open(ui_args.unchanged, 'w') as out_unchanged:
+                            out_unchanged.writelines(f'{name}\n' for name in changes["unchanged"])
+                    if ui_args.removed:
+                        with open(ui_args.removed, 'w') as out_removed:
+                            out_removed.writelines(f'{name}\n' for name in changes["removed"])
+                    if manifest_key is not None:
+                        cache.put(manifest_key, '.yaml', ui_args.o)
+            self._phase("emit")
+        if ui_args.profile:
+            with open(ui_args.profile, 'w') as out_profile:
+                json.dump(optimizer.get_profile(), out_profile, indent=2)
+        if ui_args.stats:
+            with open(ui_args.stats, 'w') as out_stats:
+                json.dump(optimizer.get_solve_stats(), out_stats, indent=2)
+        if ui_args.timings:
+            for phase, elapsed in self.__timings.items():
+                print(f'{phase}: {elapsed:.4f} s')
 
 if __name__ == '__main__':
     CommandUI().launch()
@@ -0,0 +1,74 @@
+from typing import Union
+from optimizer import MistPlatformOptimizer
+from heuristic import GreedyPlacementEngine
+import time
+
+class RelaxationRoundingEngine(GreedyPlacementEngine):
+
+  def __init__(self, optimizer: MistPlatformOptimizer):
+    super().__init__(optimizer)
+    self._lp_bound = None
+
+  def _reset(self):
+    self._usage = {n: {resource: 0 for resource in self._optimizer.RESOURCES} for n in self._capacities}
+    self._group_sizes = {}
+    self._placement = {}
+
+  def _ranked_nodes(self, values: "dict[str, float]") -> "list[str]":
+    return sorted(values, key=values.get, reverse=True)
+
+  def _repair(self, k: "Union[str, tuple[str, str]]", ranked_nodes: "list[str]") -> bool:
+    s = self._class_services[k]
+    for n in ranked_nodes:
+      moved = []
+      for blocker in [placed for placed in self._placement if self._placement[placed] == n and self._class_services[placed] != s]:
+        if self._fits(n, s):
+          break
+        self._unplace(blocker)
+        target, __ = self._best_node(blocker, n)
+        self._place(blocker, target if target is not None else n)
+        if target is not None:
+          moved.append(blocker)
+      if self._fits(n, s):
+        self._place(k, n)
+        return True
+      for blocker in moved:
+        self._unplace(blocker)
+        self._place(blocker, n)
+    return False
+
+  def _round(self, values: "dict[Union[str, tuple[str, str]], dict[str, float]]") -> bool:
+    for k in sorted(self._classes, key=lambda k: -max(values[k].values(), default=0)/self._sizes[k]):
+      ranked_nodes = self._ranked_nodes(values[k])
+      n = next((n for n in ranked_nodes if self._insert_gain(k, n) is not None), None)
+      if n is not None:
+        self._place(k, n)
+      elif not self._repair(k, ranked_nodes):
+        return False
+    return True
+
+  def place(self, max_seconds: float = None) -> bool:
+    start = time.perf_counter()
+    deadline = start + (max_seconds if max_seconds is not None else float('inf'))
+    if not self._optimizer.solve_relaxation(max_seconds):
+      return False
+    self._lp_bound = self._optimizer.get_relaxation_bound()
+    if not self._round(self._optimizer.get_relaxation_values()):
+      self._reset()
+      if not self._greedy():
+        print('No rounded placement found!')
+        self._optimizer.record_placement('lp', 'NO_SOLUTION_FOUND', time.perf_counter() - start, objective_bound=self._lp_bound, max_seconds=max_seconds)
+        return False
+    self._local_search(deadline)
+    self._objective_value = self._score()
+    print('Rounded placement found!')
+    self._optimizer.record_placement('lp', 'FEASIBLE', time.perf_counter() - start, self._objective_value, self._lp_bound, max_seconds)
+    return True
+
+  def get_lp_bound(self) -> "Union[float, None]":
+    return self._lp_bound
+
+  def get_gap(self) -> "Union[float, None]":
+    if self._lp_bound is None or self._objective_value is None:
+      return None
+    return abs(self._lp_bound - self._objective_value)/max(abs(self._objective_value), self.TOLERANCE)
@@ -1,6 +1,11 @@
+from typing import Union
 import yaml
 import copy
-import pandas as pd
+
+try:
+  from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+  from yaml import SafeLoader, SafeDumper
 
 class SolutionToKubernetes:
 
@@ -17,32 +22,85 @@ class SolutionToKubernetes:
       "kind": "Deployment"
   }
 
-  def __init__(self, solution: pd.DataFrame, container_specs: "dict[str, list[dict[str, Any]]]", service_ports: "dict[str, int]", service_meta: "dict[str, dict[str, Any]]" = {}):
+  DEPLOYMENT_SUFFIX = '-deployment'
+  SERVICE_SUFFIX = '-service'
+
+  @staticmethod
+  def service_nodes(solution: "pd.DataFrame") -> "dict[str, list[str]]":
+    grouped = solution.groupby("Service", sort=False)["Deployment node"].unique()
+    return {service: list(nodes) for service, nodes in grouped.items()}
+
+  @staticmethod
+  def manifest_service_nodes(in_yaml: str) -> "dict[str, list[str]]":
+    with open(in_yaml, 'r') as in_yaml_stream:
+      kube_files = [kube_file for kube_file in yaml.load_all(in_yaml_stream, Loader=SafeLoader) if kube_file is not None]
+    service_nodes = {}
+    for kube_file in kube_files:
+      if kube_file["kind"] != "Deployment" or kube_file["metadata"]["labels"].get('mist-type') != 'service':
+        continue
+      service = kube_file["metadata"]["name"][:-len(SolutionToKubernetes.DEPLOYMENT_SUFFIX)]
+      terms = kube_file["spec"]["template"]["spec"]["affinity"]["nodeAffinity"]["requiredDuringSchedulingIgnoredDuringExecution"]["nodeSelectorTerms"]
+      service_nodes[service] = [node for term in terms for expression in term["matchExpressions"] for node in expression["values"]]
+    return service_nodes
+
+  def __init__(self, solution: "pd.DataFrame", container_specs: "dict[str, list[dict[str, Any]]]", service_ports: "dict[str, int]", service_meta: "dict[str, dict[str, Any]]" = {}):
     self._solution = solution
     self._container_specs = container_specs
     self._service_ports = service_ports
     self._service_meta = service_meta
 
-  def convert(self, out_yaml: str):
+  def _service_kube_file(self, service: str) -> "dict[str, Any]":
+    service_kube_file = copy.deepcopy(self.BASIC_SERVICE)
+    service_kube_file['metadata'] = {"name": f'{service}{self.SERVICE_SUFFIX}', 'labels': {'mist-type': 'service'}}
+    service_kube_file["spec"]["selector"] = {"app": f'{service}-app'}
+    service_kube_file["spec"]["ports"] = [{"protocol": "TCP", "name": f"{service}-service-port", "port": self._service_ports[service], "targetPort": self._service_ports[service]}]
+    return service_kube_file
+
+  def _deployment_kube_file(self, service: str, nodes_to_replicate_in: "list[str]") -> "dict[str, Any]":
+    deployment_kube_file = self.BASIC_DEPLOYMENT.copy()
+    dep_labels = copy.deepcopy(self._service_meta.get(service, {}))
+    dep_labels["app"] = f'{service}-app'
+    dep_labels['mist-type'] = 'service'
+    deployment_kube_file["metadata"] = {"name": f'{service}{self.DEPLOYMENT_SUFFIX}', "labels": dep_labels}
+    dep_spec = {"replicas": len(nodes_to_replicate_in), "selector": {"matchLabels": {"app": f'{service}-app', 'mist-type': 'service'}}, "template": {"metadata": {"labels": {"app": f'{service}-app', 'mist-type': 'service'}}, "spec": {"affinity": {"nodeAffinity": {"requiredDuringSchedulingIgnoredDuringExecution": {"nodeSelectorTerms": []}}}, "containers": self._container_specs[service]}}}
+    for node in nodes_to_replicate_in:
+      matcher = {"matchExpressions": [{"key": "kubernetes.io/hostname", "operator": "In", "values": [node]}]}
+      dep_spec["template"]["spec"]["affinity"]["nodeAffinity"]["requiredDuringSchedulingIgnoredDuringExecution"]["nodeSelectorTerms"].append(matcher)
+    deployment_kube_file["spec"] = dep_spec
+    return deployment_kube_file
+
+  def convert(self, out_yaml: str, previous: "Union[pd.DataFrame, str, None]" = None, changed_yaml: str = None) -> "dict[str, list[str]]":
+    service_nodes = self.service_nodes(self._solution)
+    if previous is None:
+      previous_service_nodes = {}
+    elif isinstance(previous, str):
+      previous_service_nodes = self.manifest_service_nodes(previous)
+    else:
+      previous_service_nodes = self.service_nodes(previous)
     kube_files = []
-    services_to_deploy = list(self._solution["Service"].unique())
-    for service in services_to_deploy:
-      service_kube_file = self.BASIC_SERVICE.copy()
-      service_kube_file['metadata'] = {"name": f'{service}-service', 'labels': {'mist-type': 'service'}}
-      service_kube_file["spec"]["selector"] = {"app": f'{service}-app'}
-      service_kube_file["spec"]["ports"] = [{"protocol": "TCP", "name": f"{service}-service-port", "port": self._service_ports[service], "targetPort": self._service_ports[service]}]
-      nodes_to_replicate_in = list(self._solution.query('Service == @service')["Deployment node"].unique())
-      deployment_kube_file = self.BASIC_DEPLOYMENT.copy()
-      dep_labels = copy.deepcopy(self._service_meta.get(service, {}))
-      dep_labels["app"] = f'{service}-app'
-      dep_labels['mist-type'] = 'service'
-      deployment_kube_file["metadata"] = {"name": f'{service}-deployment', "labels": dep_labels}
-      dep_spec = {"replicas": len(nodes_to_replicate_in), "selector": {"matchLabels": {"app": f'{service}-app', 'mist-type': 'service'}}, "template": {"metadata": {"labels": {"app": f'{service}-app', 'mist-type': 'service'}}, "spec": {"affinity": {"nodeAffinity": {"requiredDuringSchedulingIgnoredDuringExecution": {"nodeSelectorTerms": []}}}, "containers": self._container_specs[service]}}}
-      for node in nodes_to_replicate_in:
-        matcher = {"matchExpressions": [{"key": "kubernetes.io/hostname", "operator": "In", "values": [node]}]}
-        dep_spec["template"]["spec"]["affinity"]["nodeAffinity"]["requiredDuringSchedulingIgnoredDuringExecution"]["nodeSelectorTerms"].append(matcher)
-      deployment_kube_file["spec"] = dep_spec
-      kube_files.append(deployment_kube_file)
-      kube_files.append(copy.deepcopy(service_kube_file))
+    changed_kube_files = []
+    changes = {"changed": [], "unchanged": [], "removed": []}
+    for service, nodes_to_replicate_in in service_nodes.items():
+      deployment_kube_file = self._deployment_kube_file(service, nodes_to_replicate_in)
+      service_kube_file = self._service_kube_file(service)
+      kube_files += [deployment_kube_file, service_kube_file]
+      deployment_name = f'deployment/{service}{self.DEPLOYMENT_SUFFIX}'
+      service_name = f'service/{service}{self.SERVICE_SUFFIX}'
+      if service not in previous_service_nodes:
+        changes["changed"] += [deployment_name, service_name]
+        changed_kube_files += [deployment_kube_file, service_kube_file]
+      elif set(previous_service_nodes[service]) == set(nodes_to_replicate_in):
+        changes["unchanged"] += [deployment_name, service_name]
+      else:
+        changes["changed"].append(deployment_name)
+        changes["unchanged"].append(service_name)
+        changed_kube_files.append(deployment_kube_file)
+    for service in previous_service_nodes:
+      if service not in service_nodes:
+        changes["removed"] += [f'deployment/{service}{self.DEPLOYMENT_SUFFIX}', f'service/{service}{self.SERVICE_SUFFIX}']
     with open(out_yaml, 'w') as out_yaml_stream:
-      yaml.safe_dump_all(kube_files, out_yaml_stream)
\ No newline at end of file
+      yaml.dump_all(kube_files, out_yaml_stream, Dumper=SafeDumper)
+    if changed_yaml is not None:
+      with open(changed_yaml, 'w') as changed_yaml_stream:
+        yaml.dump_all(changed_kube_files, changed_yaml_stream, Dumper=SafeDumper)
+    return changes
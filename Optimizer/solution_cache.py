@@ -0,0 +1,56 @@
+from typing import Any, Union
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+class SolutionCache:
+
+  def __init__(self, directory: str, max_bytes: int):
+    self._directory = directory
+    self._max_bytes = max_bytes
+    os.makedirs(directory, exist_ok=True)
+
+  def _normalize(self, value: "Any") -> "Any":
+    if isinstance(value, dict):
+      return {str(k): self._normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+      return [self._normalize(v) for v in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+      return float(value)
+    return value
+
+  def key(self, *parts: "Any") -> str:
+    return hashlib.blake2b(json.dumps(self._normalize(parts), sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+  def _path(self, key: str, suffix: str) -> str:
+    return os.path.join(self._directory, f'{key}{suffix}')
+
+  def get(self, key: str, suffix: str) -> "Union[str, None]":
+    path = self._path(key, suffix)
+    try:
+      os.utime(path)
+    except FileNotFoundError:
+      return None
+    return path
+
+  def put(self, key: str, suffix: str, source: str):
+    handle, tmp_path = tempfile.mkstemp(dir=self._directory, prefix='.tmp')
+    os.close(handle)
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, self._path(key, suffix))
+    self._evict()
+
+  def _evict(self):
+    entries = [entry for entry in os.scandir(self._directory) if entry.is_file() and not entry.name.startswith('.tmp')]
+    stats = {entry.path: entry.stat() for entry in entries}
+    total = sum(stat.st_size for stat in stats.values())
+    for path in sorted(stats, key=lambda path: stats[path].st_mtime):
+      if total <= self._max_bytes:
+        break
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+      total -= stats[path].st_size
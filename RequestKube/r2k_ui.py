@@ -1,25 +1,47 @@
-from req2kube import RequestsToKubernetes
 import argparse
-import yaml
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
 
 
 class CommandUI:
 
     ARGUMENTS = {
         "-r": {
-            "required": True,
-            "metavar": "YAML requests config",
-            "help": "Case study requests config in YAML format"
+            "required": False,
+            "metavar": "Requests config",
+            "help": "Case study requests config in YAML or Mist scenario (.mist) format"
         },
         "-cs": {
-            "required": True,
+            "required": False,
             "metavar": "YAML request container specs",
             "help": "Request container specs YAML configuration"
         },
         "-o": {
-            "required": True,
+            "required": False,
             "metavar": "Output K8s YAML",
             "help": "Output requests in Kubernetes-YAML format"
+        },
+        "--hashes": {
+            "required": False,
+            "metavar": "Hash file",
+            "help": "Content hashes of the last applied run. -o always holds every request, and the new hashes are kept pending until --commit"
+        },
+        "--changed": {
+            "required": False,
+            "metavar": "Output K8s YAML",
+            "help": "Output only the requests whose manifest changed since --hashes in Kubernetes-YAML format"
+        },
+        "--unchanged": {
+            "required": False,
+            "metavar": "Output list",
+            "help": "Output the name of every request whose manifest is unchanged since --hashes, one per line"
+        },
+        "--commit": {
+            "required": False,
+            "action": "store_true",
+            "help": "Replace --hashes with the pending hashes of the last run once its manifest was applied successfully, then exit"
         }
     }
 
@@ -32,12 +54,27 @@ class CommandUI:
     
     def launch(self) -> None:
         ui_args = self.__ap.parse_args()
-        with open(ui_args.r, 'r') as in_requests:
-            requests = yaml.safe_load(in_requests)
-        with open(ui_args.cs, 'r') as in_container_specs:
-            container_specs = yaml.safe_load(in_container_specs)
+        from req2kube import RequestsToKubernetes
+        if ui_args.commit:
+            if not ui_args.hashes:
+                self.__ap.error("--commit requires --hashes")
+            if not RequestsToKubernetes.commit_hashes(ui_args.hashes):
+                self.__ap.error(f'no pending hashes for {ui_args.hashes}')
+            return
+        if not ui_args.r or not ui_args.cs or not ui_args.o:
+            self.__ap.error("the following arguments are required: -r, -cs, -o")
+        if (ui_args.changed or ui_args.unchanged) and not ui_args.hashes:
+            self.__ap.error("--changed and --unchanged require --hashes")
+        from scenario import load_yaml, load_requests
+        requests = load_requests(ui_args.r)
+        container_specs = load_yaml(ui_args.cs)
         r2k = RequestsToKubernetes(requests, container_specs)
-        r2k.convert(ui_args.o)
+        changes = r2k.convert(ui_args.o, ui_args.hashes, ui_args.changed)
+        if ui_args.unchanged:
+            with open(ui_args.unchanged, 'w') as out_unchanged:
+                out_unchanged.writelines(f'{name}\n' for name in changes["unchanged"])
+        if ui_args.hashes:
+            print(f'{len(changes["changed"])} requests changed, {len(changes["unchanged"])} unchanged, {len(changes["removed"])} removed')
 
 if __name__ == '__main__':
     CommandUI().launch()
@@ -1,6 +1,14 @@
 import copy
+import hashlib
+import os
+import re
 import yaml
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 class RequestsToKubernetes:
 
     BASIC_DEPLOYMENT = {
@@ -22,32 +30,97 @@ class RequestsToKubernetes:
       }
     }
 
+    DOCUMENT_SEPARATOR = '---\n'
+    PENDING_SUFFIX = '.pending'
+    NAME_PLACEHOLDER = 'MISTREQUESTNAME'
+    NODE_PLACEHOLDER = 'MISTREQUESTNODE'
+    PLAIN_VALUE = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+    RESOLVER = yaml.resolver.Resolver()
+    STR_TAG = 'tag:yaml.org,2002:str'
+
     def __init__(self, requests: "dict[str, dict[str, str]]", request_specs: "dict[str, list[dict[str, Any]]]"):
       self._requests = requests
       self._request_specs = request_specs
+      self._templates = {}
 
-    def convert(self, out_yaml: str):
+    def _request_kube_files(self, req_name: str, node: str, service: str) -> "list[dict[str, Any]]":
       kube_files = []
-      request_pods = list(self._requests.keys())
-      for req_name in request_pods:
-        deployment_kube_file = self.BASIC_DEPLOYMENT.copy()
-        deployment_kube_file["metadata"] = {'name': f'{req_name}-deployment', "labels": {"app": f'{self._requests[req_name]["service"]}-request-app', 'mist-type': 'request'}} # type: ignore
-        dep_spec = {"replicas": 1, "selector": {"matchLabels": {"app": f'{self._requests[req_name]["service"]}-request-app', 'mist-type': 'request'}}, "template": {"metadata": {"labels": {"app": f'{self._requests[req_name]["service"]}-request-app', 'mist-type': 'request'}}, "spec": {"affinity": {"nodeAffinity": {"requiredDuringSchedulingIgnoredDuringExecution": {"nodeSelectorTerms": [{"matchExpressions": [{"key": "kubernetes.io/hostname", "operator": "In", "values": [self._requests[req_name]["node"]]}]}]}}}}}}
-        container_specs = []
-        volume_specs = []
-        base_container_specs = self._request_specs[self._requests[req_name]["service"]]
-        for idx, base_container in enumerate(base_container_specs):
-          peristent_container = copy.deepcopy(base_container)
-          peristent_container["volumeMounts"] = [{"name": f'{req_name}-{idx}-volume', 'mountPath': '/persistent/'}]
-          volume = {"name": f'{req_name}-{idx}-volume', "persistentVolumeClaim": {"claimName": f'{req_name}-{idx}-claim'}}
-          pvc = copy.deepcopy(self.BASIC_VOLUME_CLAIM)
-          pvc["metadata"] = {"name": f'{req_name}-{idx}-claim', "labels": {"app": f'{self._requests[req_name]["service"]}-request-app', 'mist-type': 'request'}}
-          volume_specs.append(volume)
-          container_specs.append(peristent_container)
-          kube_files.append(pvc)
-        dep_spec["template"]["spec"]["containers"] = container_specs
-        dep_spec["template"]["spec"]["volumes"] = volume_specs
-        deployment_kube_file["spec"] = dep_spec # type: ignore
-        kube_files.append(deployment_kube_file)
-      with open(out_yaml, 'w') as out_yaml_stream:
-        yaml.safe_dump_all(kube_files, out_yaml_stream)
\ No newline at end of file
+      deployment_kube_file = self.BASIC_DEPLOYMENT.copy()
+      deployment_kube_file["metadata"] = {'name': f'{req_name}-deployment', "labels": {"app": f'{service}-request-app', 'mist-type': 'request'}} # type: ignore
+      dep_spec = {"replicas": 1, "selector": {"matchLabels": {"app": f'{service}-request-app', 'mist-type': 'request'}}, "template": {"metadata": {"labels": {"app": f'{service}-request-app', 'mist-type': 'request'}}, "spec": {"affinity": {"nodeAffinity": {"requiredDuringSchedulingIgnoredDuringExecution": {"nodeSelectorTerms": [{"matchExpressions": [{"key": "kubernetes.io/hostname", "operator": "In", "values": [node]}]}]}}}}}}
+      container_specs = []
+      volume_specs = []
+      base_container_specs = self._request_specs[service]
+      for idx, base_container in enumerate(base_container_specs):
+        peristent_container = copy.deepcopy(base_container)
+        peristent_container["volumeMounts"] = [{"name": f'{req_name}-{idx}-volume', 'mountPath': '/persistent/'}]
+        volume = {"name": f'{req_name}-{idx}-volume', "persistentVolumeClaim": {"claimName": f'{req_name}-{idx}-claim'}}
+        pvc = copy.deepcopy(self.BASIC_VOLUME_CLAIM)
+        pvc["metadata"] = {"name": f'{req_name}-{idx}-claim', "labels": {"app": f'{service}-request-app', 'mist-type': 'request'}}
+        volume_specs.append(volume)
+        container_specs.append(peristent_container)
+        kube_files.append(pvc)
+      dep_spec["template"]["spec"]["containers"] = container_specs
+      dep_spec["template"]["spec"]["volumes"] = volume_specs
+      deployment_kube_file["spec"] = dep_spec # type: ignore
+      kube_files.append(deployment_kube_file)
+      return kube_files
+
+    def _dump(self, kube_files: "list[dict[str, Any]]") -> str:
+      return self.DOCUMENT_SEPARATOR.join(yaml.dump(kube_file, Dumper=SafeDumper) for kube_file in kube_files)
+
+    def _is_plain(self, value: str) -> bool:
+      return self.PLAIN_VALUE.fullmatch(value) is not None and self.NAME_PLACEHOLDER not in value and self.NODE_PLACEHOLDER not in value and self.RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == self.STR_TAG
+
+    def _render(self, req_name: str) -> str:
+      node, service = self._requests[req_name]["node"], self._requests[req_name]["service"]
+      if not self._is_plain(req_name) or not self._is_plain(node):
+        return self._dump(self._request_kube_files(req_name, node, service))
+      if service not in self._templates:
+        self._templates[service] = self._dump(self._request_kube_files(self.NAME_PLACEHOLDER, self.NODE_PLACEHOLDER, service))
+      return self._templates[service].replace(self.NAME_PLACEHOLDER, req_name).replace(self.NODE_PLACEHOLDER, node)
+
+    def _load_hashes(self, hash_file: str) -> "dict[str, str]":
+      if hash_file is None or not os.path.exists(hash_file):
+        return {}
+      with open(hash_file, 'r') as in_hashes:
+        return dict(line.split() for line in in_hashes if line.strip())
+
+    @staticmethod
+    def commit_hashes(hash_file: str) -> bool:
+      pending_file = f'{hash_file}{RequestsToKubernetes.PENDING_SUFFIX}'
+      if not os.path.exists(pending_file):
+        return False
+      os.replace(pending_file, hash_file)
+      return True
+
+    def convert(self, out_yaml: str, hash_file: str = None, changed_yaml: str = None) -> "dict[str, list[str]]":
+      previous_hashes = self._load_hashes(hash_file)
+      changes = {"changed": [], "unchanged": [], "removed": [req_name for req_name in previous_hashes if req_name not in self._requests]}
+      out_hashes = open(f'{hash_file}.tmp', 'w') if hash_file is not None else None
+      out_changed = open(changed_yaml, 'w') if changed_yaml is not None else None
+      try:
+        with open(out_yaml, 'w') as out_yaml_stream:
+          for req_name in self._requests:
+            request_yaml = self._render(req_name)
+            changed = True
+            if out_hashes is not None:
+              content_hash = hashlib.blake2b(request_yaml.encode(), digest_size=16).hexdigest()
+              out_hashes.write(f'{req_name} {content_hash}\n')
+              changed = previous_hashes.get(req_name) != content_hash
+            changes["changed" if changed else "unchanged"].append(req_name)
+            if len(changes["changed"]) + len(changes["unchanged"]) > 1:
+              out_yaml_stream.write(self.DOCUMENT_SEPARATOR)
+            out_yaml_stream.write(request_yaml)
+            if changed and out_changed is not None:
+              if len(changes["changed"]) > 1:
+                out_changed.write(self.DOCUMENT_SEPARATOR)
+              out_changed.write(request_yaml)
+      finally:
+        if out_hashes is not None:
+          out_hashes.close()
+        if out_changed is not None:
+          out_changed.close()
+      if hash_file is not None:
+        os.replace(f'{hash_file}.tmp', f'{hash_file}{self.PENDING_SUFFIX}')
+      return changes
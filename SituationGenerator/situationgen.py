@@ -1,7 +1,23 @@
+from collections.abc import Mapping
+from typing import Iterator, TextIO
+import hashlib
+import json
 import pickle
 import random
+import re
+import numpy as np
 import yaml
-import copy
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+_PLAIN_VALUE = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+_RESOLVER = yaml.resolver.Resolver()
+
+def _is_plain(value: str) -> bool:
+    return len(value) < 128 and _PLAIN_VALUE.fullmatch(value) is not None and _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == 'tag:yaml.org,2002:str'
 
 class UnstableSituationGenerator:
 
@@ -17,6 +33,11 @@ class UnstableSituationGenerator:
         self._rng = random.Random(rng_seed)
     
     def generate_situation(self, num_requests: int, out_yaml: str):
+        generated_requests = self.generate_requests(num_requests)
+        with open(out_yaml, 'w') as out_file:
+            yaml.dump(generated_requests, out_file, Dumper=SafeDumper)
+
+    def generate_requests(self, num_requests: int) -> "dict[str, dict[str, str]]":
         generated_requests = {}
         chosen_requestors = self._rng.choices(list(self._nodes.keys()), k=num_requests)
         chosen_services = self._rng.choices(list(self._services.keys()), k=num_requests)
@@ -25,26 +46,174 @@ class UnstableSituationGenerator:
             pair_ids[(requestor, service)] = pair_ids.get((requestor, service), 0) + 1
             req_id = f'{requestor}-{service}-{pair_ids[(requestor, service)]}'
             generated_requests[req_id] = {"node": requestor, "service": service}
-        with open(out_yaml, 'w') as out_file:
-            yaml.safe_dump(generated_requests, out_file)
+        return generated_requests
 
     def save_checkpoint(self, checkpoint_filename: str):
         with open(checkpoint_filename, 'wb') as out_pkl:
             pickle.dump(self, out_pkl)
 
+class StreamingSituationGenerator:
+
+    CHECKPOINT_VERSION = 1
+    CHUNK_SIZE = 65536
+
+    @staticmethod
+    def inputs_hash(services: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]", nodes: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]") -> str:
+        return hashlib.blake2b(json.dumps([list(nodes), list(services)]).encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def load_checkpoint(checkpoint_filename: str, services: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]", nodes: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]") -> "StreamingSituationGenerator":
+        with open(checkpoint_filename, 'r') as in_json:
+            checkpoint = json.load(in_json)
+        if checkpoint["version"] > StreamingSituationGenerator.CHECKPOINT_VERSION:
+            raise ValueError(f'Unsupported checkpoint version {checkpoint["version"]}')
+        if checkpoint["inputs"] != StreamingSituationGenerator.inputs_hash(services, nodes):
+            raise ValueError("Checkpoint was saved for a different set of nodes or services")
+        usg = StreamingSituationGenerator(services, nodes)
+        usg._rng.bit_generator.state = checkpoint["rng_state"]
+        return usg
+
+    def __init__(self, services: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]", nodes: "dict[str, dict[str, str|int|float|dict[str, str|int|float]]]", rng_seed: int = 0):
+        self._node_ids = list(nodes)
+        self._service_ids = list(services)
+        self._inputs_hash = self.inputs_hash(services, nodes)
+        self._rng = np.random.default_rng(int(rng_seed))
+        self._pair_templates = None
+
+    def node_ids(self) -> "list[str]":
+        return self._node_ids
+
+    def service_ids(self) -> "list[str]":
+        return self._service_ids
+
+    def iter_request_chunks(self, num_requests: int) -> "Iterator[tuple[list[str], np.ndarray, np.ndarray]]":
+        num_services = len(self._service_ids)
+        pair_counts = np.zeros(len(self._node_ids)*num_services, dtype=np.int64)
+        pair_prefixes = [f'{n}-{s}-' for n in self._node_ids for s in self._service_ids]
+        for chunk_start in range(0, num_requests, self.CHUNK_SIZE):
+            chunk_size = min(self.CHUNK_SIZE, num_requests - chunk_start)
+            draws = self._rng.integers(0, [len(self._node_ids), num_services], size=(chunk_size, 2))
+            pairs = draws[:, 0]*num_services + draws[:, 1]
+            order = np.argsort(pairs, kind='stable')
+            sorted_pairs = pairs[order]
+            positions = np.arange(chunk_size)
+            group_starts = np.maximum.accumulate(np.where(np.r_[True, sorted_pairs[1:] != sorted_pairs[:-1]], positions, 0))
+            counts = np.empty(chunk_size, dtype=np.int64)
+            counts[order] = positions - group_starts + 1 + pair_counts[sorted_pairs]
+            pair_counts += np.bincount(pairs, minlength=len(pair_counts))
+            request_ids = [f'{pair_prefixes[pair]}{count}' for pair, count in zip(pairs.tolist(), counts.tolist())]
+            yield request_ids, draws[:, 0], draws[:, 1]
+
+    def iter_requests(self, num_requests: int) -> "Iterator[tuple[str, dict[str, str]]]":
+        for request_ids, requestors, services in self.iter_request_chunks(num_requests):
+            for req_id, requestor, service in zip(request_ids, requestors.tolist(), services.tolist()):
+                yield req_id, {"node": self._node_ids[requestor], "service": self._service_ids[service]}
+
+    def generate_requests(self, num_requests: int) -> "dict[str, dict[str, str]]":
+        return dict(self.iter_requests(num_requests))
+
+    def generate_arrays(self, num_requests: int) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+        request_ids, requestors, services = [], [], []
+        for chunk_ids, chunk_requestors, chunk_services in self.iter_request_chunks(num_requests):
+            request_ids.extend(chunk_ids)
+            requestors.append(chunk_requestors)
+            services.append(chunk_services)
+        return np.array(request_ids, dtype=str), np.concatenate(requestors or [np.empty(0, dtype=np.int64)]).astype(np.int32), np.concatenate(services or [np.empty(0, dtype=np.int64)]).astype(np.int32)
+
+    def _create_pair_templates(self) -> "list[str|None]":
+        pair_templates = []
+        for n in self._node_ids:
+            for s in self._service_ids:
+                prefix = f'{n}-{s}'
+                if _is_plain(n) and _is_plain(s) and _is_plain(f'{prefix}-1') and re.search('[A-Za-z]', prefix):
+                    pair_templates.append(f':\n  node: {n}\n  service: {s}\n')
+                else:
+                    pair_templates.append(None)
+        return pair_templates
+
+    def write_situation(self, num_requests: int, out_file: "TextIO"):
+        if self._pair_templates is None:
+            self._pair_templates = self._create_pair_templates()
+        num_services = len(self._service_ids)
+        if num_requests == 0:
+            out_file.write('{}\n')
+        for request_ids, requestors, services in self.iter_request_chunks(num_requests):
+            lines = []
+            for req_id, requestor, service in zip(request_ids, requestors.tolist(), services.tolist()):
+                template = self._pair_templates[requestor*num_services + service]
+                if template is not None:
+                    lines.append(req_id + template)
+                else:
+                    lines.append(yaml.dump({req_id: {"node": self._node_ids[requestor], "service": self._service_ids[service]}}, Dumper=SafeDumper))
+            out_file.writelines(lines)
+
+    def generate_situation(self, num_requests: int, out_yaml: str):
+        with open(out_yaml, 'w') as out_file:
+            self.write_situation(num_requests, out_file)
+
+    def save_checkpoint(self, checkpoint_filename: str):
+        with open(checkpoint_filename, 'w') as out_json:
+            json.dump({"version": self.CHECKPOINT_VERSION, "inputs": self._inputs_hash, "rng_state": self._rng.bit_generator.state}, out_json)
+
+class ScaledSituation(Mapping):
+
+    def __init__(self, requests: "dict[str, dict[str, str]]", scale: int):
+        self._requests = requests
+        self._scale = max(scale, 1)
+        collisions = [request_name for request_name in requests if self._copy_of(request_name) is not None]
+        if len(collisions) > 0:
+            raise ValueError(f'Requests {", ".join(collisions[:5])} collide with the names of scaled copies')
+
+    def _copy_of(self, request_name: str) -> "str|None":
+        og_request_name, __, copy_ndx = request_name.rpartition('-')
+        if og_request_name in self._requests and copy_ndx.isdigit() and str(int(copy_ndx)) == copy_ndx and 1 <= int(copy_ndx) < self._scale:
+            return og_request_name
+        return None
+
+    def get_scale(self) -> int:
+        return self._scale
+
+    def base_requests(self) -> "dict[str, dict[str, str]]":
+        return self._requests
+
+    def __len__(self) -> int:
+        return len(self._requests)*self._scale
+
+    def __iter__(self) -> "Iterator[str]":
+        yield from self._requests
+        for copy_ndx in range(self._scale - 1, 0, -1):
+            for og_request_name in self._requests:
+                yield f'{og_request_name}-{copy_ndx}'
+
+    def __getitem__(self, request_name: str) -> "dict[str, str]":
+        if request_name in self._requests:
+            return self._requests[request_name]
+        og_request_name = self._copy_of(request_name)
+        if og_request_name is not None:
+            return self._requests[og_request_name]
+        raise KeyError(request_name)
+
+    def write_situation(self, out_file: "TextIO"):
+        if len(self._requests) == 0:
+            out_file.write('{}\n')
+        bodies = {r: yaml.dump({'': self._requests[r]}, Dumper=SafeDumper)[len("''"):] for r in self._requests}
+        plain_copies = {r: _is_plain(f'{r}-1') and re.search('[A-Za-z]', r) is not None for r in self._requests}
+        out_file.writelines(yaml.dump({r: self._requests[r]}, Dumper=SafeDumper) for r in self._requests)
+        for copy_ndx in range(self._scale - 1, 0, -1):
+            out_file.writelines(f'{r}-{copy_ndx}{bodies[r]}' if plain_copies[r] else yaml.dump({f'{r}-{copy_ndx}': self._requests[r]}, Dumper=SafeDumper) for r in self._requests)
+
+    def generate_situation(self, out_yaml: str):
+        with open(out_yaml, 'w') as out_file:
+            self.write_situation(out_file)
+
+
 class StableSituationGenerator:
 
     def __init__(self, requests: "dict[str, dict[str, str]]"):
         self._requests = requests
-    
+
+    def scaled_situation(self, scale: int) -> ScaledSituation:
+        return ScaledSituation(self._requests, scale)
+
     def generate_situation(self, scale: int, out_yaml: str):
-        generated_requests = copy.deepcopy(self._requests)
-        scale -= 1
-        while scale >= 1:
-            for og_request_name in self._requests:
-                additional_request = copy.deepcopy(self._requests[og_request_name])
-                additional_request_name = f'{og_request_name}-{scale}'
-                generated_requests[additional_request_name] = additional_request
-            scale -= 1
-        with open(out_yaml, 'w') as out_file:
-            yaml.safe_dump(generated_requests, out_file)
\ No newline at end of file
+        self.scaled_situation(scale).generate_situation(out_yaml)
\ No newline at end of file
@@ -1,6 +1,8 @@
-from situationgen import StableSituationGenerator
 import argparse
-import yaml
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
 
 
 class CommandUI:
@@ -8,8 +10,8 @@ class CommandUI:
     ARGUMENTS = {
         "-r": {
             "required": True,
-            "metavar": "YAML requests config",
-            "help": "Case study requests config in YAML format"
+            "metavar": "Requests config",
+            "help": "Case study requests config in YAML or Mist scenario (.mist) format"
         },
         "-s": {
             "required": True,
@@ -19,8 +21,8 @@ class CommandUI:
         },
         "-o": {
             "required": True,
-            "metavar": "Output requests YAML",
-            "help": "Output requests in YAML format"
+            "metavar": "Output requests",
+            "help": "Output requests in YAML format, or in the Mist scenario format if the path ends in .mist"
         }
     }
 
@@ -33,10 +35,13 @@ class CommandUI:
     
     def launch(self) -> None:
         ui_args = self.__ap.parse_args()
-        with open(ui_args.r, 'r') as in_requests:
-            requests = yaml.safe_load(in_requests)
-        ssg = StableSituationGenerator(requests)
-        ssg.generate_situation(ui_args.s, ui_args.o)
+        from situationgen import StableSituationGenerator
+        from scenario import load_requests, save_requests, is_scenario
+        ssg = StableSituationGenerator(load_requests(ui_args.r))
+        if is_scenario(ui_args.o):
+            save_requests(ssg.scaled_situation(ui_args.s), ui_args.o)
+        else:
+            ssg.generate_situation(ui_args.s, ui_args.o)
 
 if __name__ == '__main__':
     CommandUI().launch()
@@ -1,6 +1,8 @@
-from situationgen import UnstableSituationGenerator
 import argparse
-import yaml
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
 
 
 class CommandUI:
@@ -8,13 +10,13 @@ class CommandUI:
     ARGUMENTS = {
         "-n": {
             "required": False,
-            "metavar": "YAML nodes config",
-            "help": "Case study nodes config in YAML format. Required if no checkpoint is loaded"
+            "metavar": "Nodes config",
+            "help": "Case study nodes config in YAML or Mist scenario (.mist) format. Required if no checkpoint is loaded"
         },
         "-s": {
             "required": False,
-            "metavar": "YAML services config",
-            "help": "Case study services config YAML configuration. Required if no checkpoint is loaded"
+            "metavar": "Services config",
+            "help": "Case study services config in YAML or Mist scenario (.mist) format. Required if no checkpoint is loaded"
         },
         "-r": {
             "required": True,
@@ -28,20 +30,32 @@ class CommandUI:
             "help": "Seed for the random number generator",
             "default": 0
         },
+        "--streaming": {
+            "required": False,
+            "action": "store_true",
+            "help": "Draw requests in bulk with a numpy generator and stream them to the output. Checkpoints then only hold the generator state in JSON format, so -n and -s are also required when loading one"
+        },
+        "--steps": {
+            "required": False,
+            "type": int,
+            "default": 1,
+            "metavar": "situations",
+            "help": "Number of consecutive situations to generate. -o must contain {step} if greater than 1"
+        },
         "--checkpoint-save": {
             "required": False,
             "metavar": "PKL checkpoint",
-            "help": "Save the Unstable Situation Generator as a checkpoint in PKL format."
+            "help": "Save the Unstable Situation Generator as a checkpoint in PKL format, or in JSON format with --streaming"
         },
         "--checkpoint-load": {
             "required": False,
             "metavar": "PKL checkpoint",
-            "help": "Load the Unstable Situation Generator from a checkpoint in PKL format. Overrides all non-output arguments"
+            "help": "Load the Unstable Situation Generator from a checkpoint in PKL format, or in JSON format with --streaming. Overrides all non-output arguments"
         },
         "-o": {
             "required": True,
-            "metavar": "Output requests YAML",
-            "help": "Output requests in YAML format"
+            "metavar": "Output requests",
+            "help": "Output requests in YAML format, or in the Mist scenario format if the path ends in .mist. {step} is replaced by the situation number"
         }
     }
 
@@ -52,20 +66,43 @@ class CommandUI:
             arg_params = self.ARGUMENTS[argument]
             self.__ap.add_argument(argument, **arg_params)
     
+    def _save_streaming(self, usg: "StreamingSituationGenerator", num_requests: int, out_path: str) -> None:
+        from scenario import save_request_arrays, is_scenario
+        if is_scenario(out_path):
+            save_request_arrays(*usg.generate_arrays(num_requests), usg.node_ids(), usg.service_ids(), out_path)
+        else:
+            usg.generate_situation(num_requests, out_path)
+
     def launch(self) -> None:
         ui_args = self.__ap.parse_args()
-        if not ui_args.s or not ui_args.n:
+        if ui_args.steps > 1 and '{step}' not in ui_args.o:
+            raise ValueError("Output path must contain {step} when generating several situations")
+        from situationgen import UnstableSituationGenerator, StreamingSituationGenerator
+        from scenario import load_nodes, load_services, save_requests
+        if ui_args.streaming:
+            if not ui_args.s or not ui_args.n:
+                raise TypeError("Streaming generation requires node and service configurations")
+            services = load_services(ui_args.s)
+            nodes = load_nodes(ui_args.n)
+            if ui_args.checkpoint_load:
+                usg = StreamingSituationGenerator.load_checkpoint(ui_args.checkpoint_load, services, nodes)
+            else:
+                usg = StreamingSituationGenerator(services, nodes, ui_args.rng_seed)
+        elif not ui_args.s or not ui_args.n:
             if not ui_args.checkpoint_load:
                 raise TypeError("Must specify at least a checkpoint to load or YAML node and service configurations")
             else:
                 usg = UnstableSituationGenerator.load_checkpoint(ui_args.checkpoint_load)
         else:
-            with open(ui_args.s, 'r') as in_services:
-                services = yaml.safe_load(in_services)
-            with open(ui_args.n, 'r') as in_nodes:
-                nodes = yaml.safe_load(in_nodes)
+            services = load_services(ui_args.s)
+            nodes = load_nodes(ui_args.n)
             usg = UnstableSituationGenerator(services, nodes, ui_args.rng_seed)
-        usg.generate_situation(ui_args.r,  ui_args.o)
+        for step in range(ui_args.steps):
+            out_path = ui_args.o.replace('{step}', str(step))
+            if ui_args.streaming:
+                self._save_streaming(usg, ui_args.r, out_path)
+            else:
+                save_requests(usg.generate_requests(ui_args.r), out_path)
         if ui_args.checkpoint_save:
             usg.save_checkpoint(ui_args.checkpoint_save)
 
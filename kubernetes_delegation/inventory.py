@@ -0,0 +1,93 @@
+import csv
+import hashlib
+import json
+import math
+import os
+import subprocess
+import numpy as np
+
+class NodeInventoryCollector:
+
+    EARTH_RADIUS = 6371
+    BINARY_SUFFIXES = {"Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "Ti": 2**40, "Pi": 2**50}
+    DECIMAL_SUFFIXES = {"k": 10**3, "M": 10**6, "G": 10**9, "T": 10**12, "P": 10**15}
+
+    def __init__(self, owner_csv: str = "owner.csv", location_csv: str = "location.csv", cache_file: str = None):
+        self._owners = self._read_csv(owner_csv)
+        self._locations = {node: (float(latitude), float(longitude)) for node, (latitude, longitude) in self._read_csv(location_csv, 2).items()}
+        self._cache_file = cache_file
+
+    def _read_csv(self, path: str, num_values: int = 1) -> "dict[str, str|list[str]]":
+        with open(path, 'r', newline='', encoding='utf-8-sig') as in_csv:
+            reader = csv.reader(in_csv)
+            next(reader)
+            return {row[0]: row[1] if num_values == 1 else row[1:1+num_values] for row in reader if len(row) > num_values}
+
+    @staticmethod
+    def kubectl_nodes() -> "dict[str, Any]":
+        return json.loads(subprocess.run(["kubectl", "get", "nodes", "-o", "json"], capture_output=True, text=True, check=True).stdout)
+
+    @staticmethod
+    def _quantity(value: str) -> float:
+        for suffixes in [NodeInventoryCollector.BINARY_SUFFIXES, NodeInventoryCollector.DECIMAL_SUFFIXES]:
+            for suffix, multiplier in suffixes.items():
+                if value.endswith(suffix):
+                    return float(value[:-len(suffix)])*multiplier
+        return float(value)
+
+    @staticmethod
+    def _megabytes(value: str) -> float:
+        return math.floor(NodeInventoryCollector._quantity(value)/2**20*100)/100
+
+    @staticmethod
+    def _cpu(value: str) -> "int|float":
+        if value.endswith("m"):
+            return int(value[:-1])/1000
+        cpu = float(value)
+        return int(cpu) if cpu.is_integer() else cpu
+
+    @staticmethod
+    def distance_matrix(coordinates: np.ndarray) -> np.ndarray:
+        radians = np.radians(coordinates)
+        latitudes, longitudes = radians[:, 0], radians[:, 1]
+        dlat = latitudes[np.newaxis, :] - latitudes[:, np.newaxis]
+        dlon = longitudes[np.newaxis, :] - longitudes[:, np.newaxis]
+        a = np.sin(0.5*dlat)**2 + np.cos(latitudes)[:, np.newaxis]*np.cos(latitudes)[np.newaxis, :]*np.sin(0.5*dlon)**2
+        return np.round(NodeInventoryCollector.EARTH_RADIUS*2*np.arctan(np.sqrt(a)), 4)
+
+    def _cached_distance_matrix(self, located_nodes: "list[str]") -> np.ndarray:
+        coordinates = np.array([self._locations[n] for n in located_nodes], dtype=np.float64).reshape(len(located_nodes), 2)
+        key = hashlib.sha256(json.dumps([located_nodes, coordinates.tolist()]).encode()).hexdigest()
+        if self._cache_file is not None and os.path.exists(self._cache_file):
+            with np.load(self._cache_file) as cache:
+                if str(cache["key"]) == key:
+                    return cache["distances"]
+        distances = self.distance_matrix(coordinates)
+        if self._cache_file is not None:
+            with open(self._cache_file, 'wb') as out_cache:
+                np.savez(out_cache, key=np.array(key), distances=distances)
+        return distances
+
+    def collect(self, kube_nodes: "dict[str, Any]" = None) -> "dict[str, dict[str, Any]]":
+        if kube_nodes is None:
+            kube_nodes = self.kubectl_nodes()
+        names = [item["metadata"]["name"] for item in kube_nodes["items"]]
+        located_nodes = [n for n in names if n in self._locations]
+        located_index = {n: ndx for ndx, n in enumerate(located_nodes)}
+        distances = self._cached_distance_matrix(located_nodes).tolist()
+        nodes = {}
+        for item, n in zip(kube_nodes["items"], names):
+            allocatable = item["status"]["allocatable"]
+            location = {}
+            if n in located_index:
+                row = distances[located_index[n]]
+                location = {other: row[located_index[other]] for other in names if other != n and other in located_index}
+            nodes[n] = {
+                "cpu": self._cpu(allocatable["cpu"]),
+                "ram": self._megabytes(allocatable["memory"]),
+                "storage": self._megabytes(allocatable["ephemeral-storage"]),
+                "owner": self._owners.get(n, ""),
+                "latency": {},
+                "location": location
+            }
+        return nodes
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "MistScenario"))
+
+
+class CommandUI:
+
+    ARGUMENTS = {
+        "--kube-json": {
+            "required": False,
+            "metavar": "JSON nodes",
+            "help": "Output of kubectl get nodes -o json. kubectl is called if not given"
+        },
+        "--owners": {
+            "required": False,
+            "metavar": "Owner CSV",
+            "default": "owner.csv",
+            "help": "CSV mapping node names to owners"
+        },
+        "--locations": {
+            "required": False,
+            "metavar": "Location CSV",
+            "default": "location.csv",
+            "help": "CSV mapping node names to latitude and longitude"
+        },
+        "--cache": {
+            "required": False,
+            "metavar": "NPZ cache",
+            "help": "Distance matrix cache, reused while the located nodes and their coordinates are unchanged"
+        },
+        "-o": {
+            "required": False,
+            "metavar": "Output nodes",
+            "default": "nodes.yaml",
+            "help": "Output nodes config in YAML format, or in the Mist scenario format if the path ends in .mist"
+        }
+    }
+
+    def __init__(self) -> None:
+        self.__ap = argparse.ArgumentParser(
+            description="CLI for collecting the node inventory of the Kubernetes cluster", add_help=True)
+        for argument in self.ARGUMENTS:
+            arg_params = self.ARGUMENTS[argument]
+            self.__ap.add_argument(argument, **arg_params)
+
+    def launch(self) -> None:
+        ui_args = self.__ap.parse_args()
+        from inventory import NodeInventoryCollector
+        from scenario import MistScenario, dump_yaml, is_scenario
+        kube_nodes = None
+        if ui_args.kube_json:
+            with open(ui_args.kube_json, 'r') as in_json:
+                kube_nodes = json.load(in_json)
+        nodes = NodeInventoryCollector(ui_args.owners, ui_args.locations, ui_args.cache).collect(kube_nodes)
+        if is_scenario(ui_args.o):
+            MistScenario.from_dicts(nodes=nodes).save(ui_args.o)
+        else:
+            dump_yaml(nodes, ui_args.o)
+
+if __name__ == '__main__':
+    CommandUI().launch()